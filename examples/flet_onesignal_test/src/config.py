@@ -4,6 +4,10 @@
 ONESIGNAL_APP_ID = "your-onesignal-app-id"
 REST_API_KEY = "your-rest-api-key"
 
+# REST API base URL; point it at `python -m flet_onesignal emulator --host 0.0.0.0`
+# to run the REST steps against the local emulator
+ONESIGNAL_API_URL = "https://api.onesignal.com"
+
 # Test data
 TEST_EXTERNAL_ID = "flet-onesignal-test-user"
 TEST_TAG_KEY = "test_key"
@@ -14,6 +18,12 @@ TEST_EMAIL = "test@example.com"
 TEST_SMS = "+15551234567"
 TEST_LANGUAGE = "pt"
 
-# Timeouts and intervals
+# Timeouts
 PUSH_WAIT_TIMEOUT = 15
-EVENT_POLL_INTERVAL = 0.3
+
+# Push latency harness: pushes sent, send rate (per second), seconds to wait
+# for stragglers after the last send, and the highest loss the step accepts
+LATENCY_PUSH_COUNT = 10
+LATENCY_PUSH_RATE = 2.0
+LATENCY_WAIT_TIMEOUT = 30
+LATENCY_MAX_LOSS = 0.1
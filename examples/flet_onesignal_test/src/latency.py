@@ -0,0 +1,183 @@
+"""Push delivery round-trip latency harness.
+
+Sends N pushes at a fixed rate, each tagged with a probe id in its
+additional data, and matches foreground/click events back to the send to
+measure send→receive latency and loss.
+"""
+
+import asyncio
+import json
+import math
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+PROBE_KEY = "fos_probe"
+"""Additional data key carrying the probe id."""
+
+
+@dataclass
+class Probe:
+    id: str
+    sent_at: float
+    notification_id: str | None = None
+    send_error: str | None = None
+    received_at: float | None = None
+    clicked_at: float | None = None
+    duplicates: int = 0
+
+    @property
+    def latency_ms(self) -> float | None:
+        """Send→first event (foreground or click) in milliseconds."""
+        if self.received_at is None:
+            return None
+        return (self.received_at - self.sent_at) * 1000
+
+
+def probe_id(notification: object) -> str | None:
+    """Extract the probe id from a notification payload (dict or JSON string)."""
+    if isinstance(notification, str):
+        try:
+            notification = json.loads(notification)
+        except ValueError:
+            return None
+    if not isinstance(notification, dict):
+        return None
+
+    data = notification.get("additionalData") or notification.get("additional_data")
+    if data is None:
+        # Android raw payload: {"custom": {"a": {...additional data}}}
+        custom = notification.get("custom")
+        if isinstance(custom, str):
+            try:
+                custom = json.loads(custom)
+            except ValueError:
+                custom = None
+        data = custom.get("a") if isinstance(custom, dict) else None
+    if isinstance(data, dict) and data.get(PROBE_KEY):
+        return str(data[PROBE_KEY])
+    return None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted ``values`` (q in 0..100)."""
+    if not values:
+        return math.nan
+    rank = (len(values) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+@dataclass
+class LatencyReport:
+    sent: int
+    failed: int
+    received: int
+    clicked: int
+    duplicates: int
+    unmatched: int
+    latencies_ms: list[float] = field(default_factory=list)
+
+    @property
+    def loss(self) -> float:
+        """Fraction of successfully sent pushes that never arrived."""
+        delivered = self.sent - self.failed
+        return 1 - self.received / delivered if delivered else 0.0
+
+    def __str__(self) -> str:
+        latencies = sorted(self.latencies_ms)
+        p50, p90, p99 = (percentile(latencies, q) for q in (50, 90, 99))
+        worst = latencies[-1] if latencies else math.nan
+        return (
+            f"{self.received}/{self.sent - self.failed} received "
+            f"({self.loss:.0%} loss, {self.failed} send errors, {self.duplicates} duplicates) · "
+            f"p50 {p50:.0f}ms · p90 {p90:.0f}ms · p99 {p99:.0f}ms · max {worst:.0f}ms"
+        )
+
+
+class LatencyHarness:
+    """Send tagged pushes and correlate the resulting events.
+
+    Args:
+        send: Coroutine sending one push with the given additional data and
+            returning the REST API response.
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable[dict]]):
+        self.send = send
+        self.run_id = uuid.uuid4().hex[:8]
+        self.probes: dict[str, Probe] = {}
+        self.unmatched = 0
+        self._all_sent = False
+        self._done = asyncio.Event()
+
+    def on_event(self, kind: str, notification: object) -> None:
+        """Record a "foreground" or "click" event. Safe to call from event handlers."""
+        now = time.monotonic()
+        probe = self.probes.get(probe_id(notification) or "")
+        if probe is None:
+            self.unmatched += 1
+            return
+
+        if kind == "click":
+            probe.clicked_at = probe.clicked_at or now
+        elif probe.received_at is not None:
+            probe.duplicates += 1
+        if probe.received_at is None:
+            probe.received_at = now
+            self._check_done()
+
+    def _check_done(self) -> None:
+        if self._all_sent and all(
+            p.received_at is not None or p.send_error for p in self.probes.values()
+        ):
+            self._done.set()
+
+    async def _send_one(self, index: int) -> None:
+        probe = Probe(id=f"{self.run_id}-{index}", sent_at=time.monotonic())
+        self.probes[probe.id] = probe
+        try:
+            result = await self.send({PROBE_KEY: probe.id})
+            probe.notification_id = result.get("id")
+            if not probe.notification_id:
+                raise RuntimeError(f"REST API error: {result}")
+        except Exception as exc:
+            probe.send_error = str(exc)
+
+    async def run(self, count: int, rate: float, timeout: float) -> LatencyReport:
+        """Send ``count`` pushes at ``rate`` per second and wait for their events.
+
+        Waits up to ``timeout`` seconds after the last send; pushes not seen by
+        then are counted as lost.
+        """
+        started = time.monotonic()
+        sends = []
+        for index in range(count):
+            # Pace from the start time so slow sends do not shift the schedule
+            delay = started + index / rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sends.append(asyncio.create_task(self._send_one(index)))
+        await asyncio.gather(*sends)
+
+        self._all_sent = True
+        self._check_done()
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.report()
+
+    def report(self) -> LatencyReport:
+        probes = list(self.probes.values())
+        return LatencyReport(
+            sent=len(probes),
+            failed=sum(1 for p in probes if p.send_error),
+            received=sum(1 for p in probes if p.received_at is not None and not p.send_error),
+            clicked=sum(1 for p in probes if p.clicked_at is not None),
+            duplicates=sum(p.duplicates for p in probes),
+            unmatched=self.unmatched,
+            latencies_ms=[p.latency_ms for p in probes if p.latency_ms is not None],
+        )
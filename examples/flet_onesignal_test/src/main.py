@@ -25,25 +25,31 @@ logger = fos.setup_logging(level=logging.DEBUG)
 
 
 def _on_notification_foreground(state: TestState, e):
-    state.last_notification_foreground_id = e.notification_id
+    state.set_event("last_notification_foreground_id", e.notification_id)
+    state.notify_push("foreground", e.notification)
     state.add_log(f"[Event] Notification foreground: {e.notification_id}", "debug")
 
 
 def _on_permission_change(state: TestState, e):
-    state.last_permission_change = e.permission
+    state.set_event("last_permission_change", e.permission)
     state.add_log(f"[Event] Permission change: {e.permission}", "debug")
 
 
 def _on_user_change(state: TestState, e):
-    state.last_user_change_onesignal_id = e.onesignal_id
+    state.set_event("last_user_change_onesignal_id", e.onesignal_id)
     state.add_log(f"[Event] User change: OS ID={e.onesignal_id}", "debug")
 
 
 def _on_push_subscription_change(state: TestState, e):
-    state.last_push_subscription_opted_in = e.opted_in
+    state.set_event("last_push_subscription_opted_in", e.opted_in)
     state.add_log(f"[Event] Push sub change: opted_in={e.opted_in}", "debug")
 
 
+def _on_notification_click(state: TestState, e):
+    state.notify_push("click", e.notification)
+    state.add_log(f"[Event] Notification click: {e.notification}", "debug")
+
+
 # ── UI Components ────────────────────────────────────────────────────────
 
 
@@ -56,10 +62,10 @@ def InteractionBanner():
         return ft.Container(visible=False)
 
     def on_continue(e):
-        state.user_response = "continue"
+        state.set_event("user_response", "continue")
 
     def on_skip(e):
-        state.user_response = "skip"
+        state.set_event("user_response", "skip")
 
     return ft.Container(
         content=ft.Column(
@@ -303,9 +309,7 @@ def main(page: ft.Page):
         on_permission_change=lambda e: _on_permission_change(app_state, e),
         on_user_change=lambda e: _on_user_change(app_state, e),
         on_push_subscription_change=lambda e: _on_push_subscription_change(app_state, e),
-        on_notification_click=lambda e: app_state.add_log(
-            f"[Event] Notification click: {e.notification}", "debug"
-        ),
+        on_notification_click=lambda e: _on_notification_click(app_state, e),
         on_iam_click=lambda e: app_state.add_log(f"[Event] IAM click: {e.action_id}", "debug"),
         on_iam_will_display=lambda e: app_state.add_log("[Event] IAM will display", "debug"),
         on_iam_did_display=lambda e: app_state.add_log("[Event] IAM did display", "debug"),
@@ -4,6 +4,8 @@ import asyncio
 import json
 import urllib.request
 
+from config import ONESIGNAL_API_URL
+
 
 def _send_push_sync(
     app_id: str,
@@ -11,17 +13,19 @@ def _send_push_sync(
     onesignal_id: str,
     title: str,
     body: str,
+    additional_data: dict | None,
 ) -> dict:
-    url = "https://api.onesignal.com/notifications"
-    payload = json.dumps(
-        {
-            "app_id": app_id,
-            "target_channel": "push",
-            "include_aliases": {"onesignal_id": [onesignal_id]},
-            "contents": {"en": body},
-            "headings": {"en": title},
-        }
-    ).encode()
+    url = f"{ONESIGNAL_API_URL}/notifications"
+    notification = {
+        "app_id": app_id,
+        "target_channel": "push",
+        "include_aliases": {"onesignal_id": [onesignal_id]},
+        "contents": {"en": body},
+        "headings": {"en": title},
+    }
+    if additional_data:
+        notification["data"] = additional_data
+    payload = json.dumps(notification).encode()
 
     req = urllib.request.Request(
         url,
@@ -43,8 +47,12 @@ async def send_push_notification(
     onesignal_id: str,
     title: str = "Test Push",
     body: str = "Automated test notification",
+    additional_data: dict | None = None,
 ) -> dict:
-    return await asyncio.to_thread(_send_push_sync, app_id, rest_api_key, onesignal_id, title, body)
+    """Send a push; ``additional_data`` arrives as the notification's additional data."""
+    return await asyncio.to_thread(
+        _send_push_sync, app_id, rest_api_key, onesignal_id, title, body, additional_data
+    )
 
 
 def _delete_alias_sync(
@@ -54,7 +62,7 @@ def _delete_alias_sync(
     alias_label: str,
 ) -> int:
     url = (
-        f"https://api.onesignal.com/apps/{app_id}"
+        f"{ONESIGNAL_API_URL}/apps/{app_id}"
         f"/users/by/onesignal_id/{onesignal_id}/identity/{alias_label}"
     )
     req = urllib.request.Request(
@@ -4,7 +4,10 @@ import asyncio
 import time
 
 from config import (
-    EVENT_POLL_INTERVAL,
+    LATENCY_MAX_LOSS,
+    LATENCY_PUSH_COUNT,
+    LATENCY_PUSH_RATE,
+    LATENCY_WAIT_TIMEOUT,
     ONESIGNAL_APP_ID,
     PUSH_WAIT_TIMEOUT,
     REST_API_KEY,
@@ -18,6 +21,7 @@ from config import (
     TEST_TAG_VALUE,
 )
 from context import AppContext
+from latency import LatencyHarness
 from rest_api import delete_alias, send_push_notification
 from state import TestState, TestStatus
 from test_steps import TEST_STEPS
@@ -26,27 +30,17 @@ import flet_onesignal as fos
 
 
 async def wait_for_event(state: TestState, attr_name: str, timeout: float = 15) -> object:
-    """Poll a state attribute until it becomes non-None or timeout."""
-    elapsed = 0.0
-    while elapsed < timeout:
-        value = getattr(state, attr_name)
-        if value is not None:
-            return value
-        await asyncio.sleep(EVENT_POLL_INTERVAL)
-        elapsed += EVENT_POLL_INTERVAL
-    raise TimeoutError(f"Event '{attr_name}' not received within {timeout}s")
+    """Wait until the event handler for a state slot fires, or timeout."""
+    return await state.wait_event(attr_name, timeout)
 
 
 async def _wait_user_response(state: TestState) -> str:
-    """Poll until the user taps Continue or Skip."""
-    while True:
-        if state.user_response is not None:
-            response = state.user_response
-            state.user_response = None
-            state.waiting_for_user = False
-            state.waiting_message = ""
-            return response
-        await asyncio.sleep(EVENT_POLL_INTERVAL)
+    """Wait until the user taps Continue or Skip."""
+    response = await state.wait_event("user_response")
+    state.reset_event("user_response")
+    state.waiting_for_user = False
+    state.waiting_message = ""
+    return response
 
 
 async def run_all_tests(ctx: AppContext) -> None:
@@ -83,7 +77,7 @@ async def run_all_tests(ctx: AppContext) -> None:
         if step_def.needs_user_interaction:
             state.waiting_for_user = True
             state.waiting_message = step_def.interaction_message
-            state.user_response = None
+            state.reset_event("user_response")
             state.add_log(f"[WAIT] {step_def.name}: {step_def.interaction_message}", "warn")
 
             response = await _wait_user_response(state)
@@ -139,7 +133,7 @@ async def _execute_step(step_id: str, ctx: AppContext, data: dict) -> None:
 
     # ── Login ────────────────────────────────────────────────────────────
     elif step_id == "login":
-        state.last_user_change_onesignal_id = None
+        state.reset_event("last_user_change_onesignal_id")
         await os.login(TEST_EXTERNAL_ID)
         # Give the SDK a moment to propagate user state
         await asyncio.sleep(1)
@@ -220,7 +214,7 @@ async def _execute_step(step_id: str, ctx: AppContext, data: dict) -> None:
         data["can_request"] = result
 
     elif step_id == "request_permission":
-        state.last_permission_change = None
+        state.reset_event("last_permission_change")
         granted = await os.notifications.request_permission()
         data["permission_granted"] = granted
 
@@ -281,7 +275,7 @@ async def _execute_step(step_id: str, ctx: AppContext, data: dict) -> None:
 
     # ── Push REST ────────────────────────────────────────────────────────
     elif step_id == "send_push_api":
-        state.last_notification_foreground_id = None
+        state.reset_event("last_notification_foreground_id")
         oid = data.get("onesignal_id")
         assert oid, "No onesignal_id from earlier step"
         result = await send_push_notification(
@@ -300,6 +294,35 @@ async def _execute_step(step_id: str, ctx: AppContext, data: dict) -> None:
         )
         assert nid, "Foreground notification ID is None"
 
+    elif step_id == "push_latency":
+        oid = data.get("onesignal_id")
+        assert oid, "No onesignal_id from earlier step"
+
+        async def send(additional_data: dict) -> dict:
+            return await send_push_notification(
+                app_id=ONESIGNAL_APP_ID,
+                rest_api_key=REST_API_KEY,
+                onesignal_id=oid,
+                title="Latency Probe",
+                body=f"Latency probe {additional_data}",
+                additional_data=additional_data,
+            )
+
+        harness = LatencyHarness(send)
+        state.set_push_listener(harness.on_event)
+        try:
+            report = await harness.run(
+                LATENCY_PUSH_COUNT, LATENCY_PUSH_RATE, timeout=LATENCY_WAIT_TIMEOUT
+            )
+        finally:
+            state.set_push_listener(None)
+        state.add_log(f"[Latency] {report}", "info")
+        data["push_latency"] = report
+        assert report.failed < report.sent, "All latency probe sends failed"
+        assert report.loss <= LATENCY_MAX_LOSS, (
+            f"Push loss {report.loss:.0%} above {LATENCY_MAX_LOSS:.0%}"
+        )
+
     elif step_id == "clear_all":
         await os.notifications.clear_all()
 
@@ -377,7 +400,7 @@ async def _execute_step(step_id: str, ctx: AppContext, data: dict) -> None:
 
     # ── Cleanup ──────────────────────────────────────────────────────────
     elif step_id == "logout":
-        state.last_user_change_onesignal_id = None
+        state.reset_event("last_user_change_onesignal_id")
         await os.logout()
 
     elif step_id == "verify_user_change":
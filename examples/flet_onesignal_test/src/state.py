@@ -1,5 +1,7 @@
 """Observable test state for declarative UI."""
 
+import asyncio
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -50,6 +52,12 @@ class TestState:
     waiting_message: str = ""
     user_response: str | None = None  # "continue" or "skip"
 
+    # Waiters for the event slots and user_response (private: not observed by the UI)
+    _signals: dict[str, asyncio.Event] = field(default_factory=dict, repr=False)
+
+    # Receives foreground/click notifications while the latency harness runs
+    _push_listener: Callable[[str, object], None] | None = field(default=None, repr=False)
+
     # Warning dialog
     show_warning_dialog: bool = False
     warning_title: str = ""
@@ -69,10 +77,45 @@ class TestState:
         self.logs.clear()
 
     def clear_events(self):
-        self.last_permission_change = None
-        self.last_notification_foreground_id = None
-        self.last_user_change_onesignal_id = None
-        self.last_push_subscription_opted_in = None
+        for name in (
+            "last_permission_change",
+            "last_notification_foreground_id",
+            "last_user_change_onesignal_id",
+            "last_push_subscription_opted_in",
+        ):
+            self.reset_event(name)
+
+    def _signal(self, name: str) -> asyncio.Event:
+        if name not in self._signals:
+            self._signals[name] = asyncio.Event()
+        return self._signals[name]
+
+    def set_event(self, name: str, value: object):
+        """Store an event slot value and wake up anyone waiting for a non-None value."""
+        setattr(self, name, value)
+        if value is not None:
+            self._signal(name).set()
+
+    def reset_event(self, name: str):
+        """Clear an event slot so the next `wait_event` waits for a new value."""
+        setattr(self, name, None)
+        self._signal(name).clear()
+
+    async def wait_event(self, name: str, timeout: float | None = None) -> object:
+        """Wait until `set_event` is called for a slot and return its value."""
+        try:
+            await asyncio.wait_for(self._signal(name).wait(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Event '{name}' not received within {timeout}s") from None
+        return getattr(self, name)
+
+    def set_push_listener(self, listener: Callable[[str, object], None] | None):
+        self._push_listener = listener
+
+    def notify_push(self, kind: str, notification: object):
+        """Forward a "foreground" or "click" notification to the push listener."""
+        if self._push_listener:
+            self._push_listener(kind, notification)
 
     def set_step_status(self, step_id: str, status: TestStatus, error: str = ""):
         for i, step in enumerate(self.steps):
@@ -55,11 +55,12 @@ TEST_STEPS: list[StepDef] = [
     StepDef("push_opt_out", "Opt Out of Push", "Push Sub"),
     StepDef("push_verify_opt_out", "Verify Opted Out", "Push Sub"),
     StepDef("push_restore", "Restore Push (Opt In)", "Push Sub"),
-    # --- Push REST (28-30) ---
+    # --- Push REST (28-31) ---
     StepDef("send_push_api", "Send Push via REST API", "Push REST"),
     StepDef("verify_foreground_event", "Verify Foreground Event (15s)", "Push REST"),
+    StepDef("push_latency", "Push Round-Trip Latency", "Push REST"),
     StepDef("clear_all", "Clear All Notifications", "Push REST"),
-    # --- IAM (31-37) ---
+    # --- IAM (32-38) ---
     StepDef("iam_pause", "Pause In-App Messages", "IAM"),
     StepDef("iam_is_paused", "Verify IAM Paused", "IAM"),
     StepDef("iam_add_trigger", "Add Trigger", "IAM"),
@@ -67,11 +68,11 @@ TEST_STEPS: list[StepDef] = [
     StepDef("iam_clear_triggers", "Clear All Triggers", "IAM"),
     StepDef("iam_resume", "Resume In-App Messages", "IAM"),
     StepDef("iam_verify_not_paused", "Verify IAM Not Paused", "IAM"),
-    # --- Session (38-40) ---
+    # --- Session (39-41) ---
     StepDef("session_add_outcome", "Add Outcome", "Session"),
     StepDef("session_add_unique", "Add Unique Outcome", "Session"),
     StepDef("session_add_with_value", "Add Outcome with Value", "Session"),
-    # --- Location (41-45) - Android only ---
+    # --- Location (42-46) - Android only ---
     StepDef(
         "location_request_perm",
         "Request Location Permission",
@@ -104,17 +105,17 @@ TEST_STEPS: list[StepDef] = [
         "Location",
         platform="android",
     ),
-    # --- Live Activities (46) - iOS only ---
+    # --- Live Activities (47) - iOS only ---
     StepDef(
         "live_activities_setup",
         "Setup Default Live Activity",
         "Live Activities",
         platform="ios",
     ),
-    # --- Consent (47-48) ---
+    # --- Consent (48-49) ---
     StepDef("consent_give", "Give Consent", "Consent"),
     StepDef("consent_revoke", "Revoke Consent", "Consent"),
-    # --- Cleanup (49-50) ---
+    # --- Cleanup (50-51) ---
     StepDef("logout", "Logout", "Cleanup"),
     StepDef("verify_user_change", "Verify User Change Event", "Cleanup"),
 ]
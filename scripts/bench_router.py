@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Deep-link router benchmark.
+
+Registers N generated routes in `flet_onesignal.router.DeepLinkRouter` and
+times matching links against it, next to the equivalent hand-written
+approach: a list of precompiled regexes tried in order.
+
+Usage: python bench_router.py [--routes N [N ...]] [--links N] [--repeat N]
+Example: python bench_router.py --routes 10 100 1000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from flet_onesignal.router import DeepLinkRouter
+
+SECTIONS = ["orders", "products", "users", "chat", "promo", "news", "settings", "cart"]
+
+
+def generate_patterns(count: int, rng: random.Random) -> list[str]:
+    """Generate ``count`` distinct patterns like ``/orders/s12/{p0}/items``."""
+    patterns: list[str] = []
+    seen: set[str] = set()
+    while len(patterns) < count:
+        segments = [rng.choice(SECTIONS), f"s{rng.randrange(count)}"]
+        for index in range(rng.randrange(1, 4)):
+            segments.append(f"{{p{index}}}" if rng.random() < 0.5 else f"x{rng.randrange(10)}")
+        pattern = "/" + "/".join(segments)
+        shape = re.sub(r"\{\w+\}", "{}", pattern)
+        if shape not in seen:
+            seen.add(shape)
+            patterns.append(pattern)
+    return patterns
+
+
+def link_for(pattern: str, rng: random.Random) -> str:
+    """Build a link matching ``pattern``."""
+    return "myapp:/" + re.sub(r"\{\w+\}", lambda _: str(rng.randrange(10_000)), pattern)
+
+
+def compile_regexes(patterns: list[str]) -> list[re.Pattern]:
+    """The if/elif equivalent: one anchored regex per pattern."""
+    return [
+        re.compile("^" + re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(p)) + "$")
+        for p in patterns
+    ]
+
+
+def match_linear(regexes: list[re.Pattern], link: str):
+    path = "/" + link.split("://", 1)[1]
+    for regex in regexes:
+        found = regex.match(path)
+        if found:
+            return found.groupdict()
+    return None
+
+
+def time_per_call(fn, links: list[str], repeat: int) -> float:
+    """Best-of-``repeat`` time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for link in links:
+            fn(link)
+        best = min(best, time.perf_counter() - started)
+    return best / len(links) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DeepLinkRouter matching")
+    parser.add_argument("--routes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--links", type=int, default=2000, help="Links matched per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best kept)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'routes':>8} {'compile ms':>11} {'router us':>10} {'regex us':>10} {'speedup':>8}")
+    for count in args.routes:
+        rng = random.Random(args.seed)
+        patterns = generate_patterns(count, rng)
+        links = [link_for(rng.choice(patterns), rng) for _ in range(args.links)]
+
+        started = time.perf_counter()
+        router = DeepLinkRouter()
+        for pattern in patterns:
+            router.route(pattern, lambda match: None)
+        compile_ms = (time.perf_counter() - started) * 1000
+        regexes = compile_regexes(patterns)
+
+        # Sanity check: the router's choice agrees with that pattern's regex
+        by_pattern = dict(zip(patterns, regexes))
+        for link in links[:100]:
+            found = router.match(link)
+            assert found is not None, link
+            assert found.params == match_linear([by_pattern[found.pattern]], link), link
+
+        router_us = time_per_call(router.match, links, args.repeat)
+        regex_us = time_per_call(lambda link: match_linear(regexes, link), links, args.repeat)
+        print(
+            f"{count:>8} {compile_ms:>11.1f} {router_us:>10.2f} {regex_us:>10.2f} "
+            f"{regex_us / router_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
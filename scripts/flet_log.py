@@ -5,16 +5,49 @@ Flet Logcat - Android Studio Style
 A Python script for monitoring Android logcat with Flet/Flutter app filtering.
 Automatically detects the focused app and filters relevant logs.
 
-Usage: python flet_log.py [extra_filter]
+App focus and process restarts are followed from a single long-lived
+``adb logcat -b events`` stream, so PID switches are picked up as soon as
+the system logs them instead of by polling adb.
+
+With ``--devices`` several devices are captured concurrently, each with its
+own focus tracking and logcat thread; output lines are tagged with the
+device serial.
+
+With ``--record FILE`` every captured line is also appended to a compact
+on-disk capture (zlib-compressed blocks plus a time/level index), which
+``--replay FILE`` filters later by time range, tag, level or regex while
+only decompressing the blocks the index says can match.
+
+With ``--stats`` OneSignal bridge calls, their latency and error rate,
+event listener errors, and notification receive-to-display latency (from the
+native SDK's display lines) are computed from the stream (or a replayed
+capture) and printed as a summary table every few seconds.
+
+Usage: python flet_log.py [extra_filter] [--devices all|SERIAL[,SERIAL...]] [--record FILE]
+                          [--stats]
+       python flet_log.py --replay FILE [--since T] [--until T] [--tag TAG] [--level L] [--grep RE]
+                          [--stats]
 Example: python flet_log.py "OneSignal|Firebase"
+Example: python flet_log.py --devices all --record logs/qa.flog
+Example: python flet_log.py --replay logs/qa.flog --since "10-19 14:00" --tag OneSignal
+Example: python flet_log.py --stats "OneSignal"
 """
 
+import argparse
 import os
+import queue
 import re
+import struct
 import subprocess
 import sys
 import threading
 import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
 # Colors by log level (Android Studio style)
@@ -31,19 +64,125 @@ RESET = "\033[0m"
 BOLD = "\033[1m"
 DIM = "\033[2m"
 
+# Device tag colors, assigned in order when capturing several devices
+DEVICE_COLORS = [
+    "\033[0;35m",  # Magenta
+    "\033[0;34m",  # Blue
+    "\033[0;96m",  # Bright cyan
+    "\033[0;93m",  # Bright yellow
+    "\033[0;95m",  # Bright magenta
+    "\033[0;94m",  # Bright blue
+]
+
 # Default filter
 DEFAULT_FILTER = r"flutter|python|Error|Exception|Traceback"
 
+# logcat is read in large binary chunks and printed in batches
+READ_CHUNK_SIZE = 64 * 1024
+
+# Format: MM-DD HH:MM:SS.mmm PID TID LEVEL TAG: MESSAGE (fallback for the fast path)
+LOG_LINE_PATTERN = re.compile(
+    r"^(\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2}\.\d+)\s+(\d+)\s+(\d+)\s+([VDIWEFA])\s+([^:]+):\s+(.*)$"
+)
+
+TIMESTAMP_PATTERN = re.compile(r"^\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}$")
+
+# Event log tags that report the resumed/focused activity (varies by Android version)
+FOCUS_TAGS = {
+    "am_set_resumed_activity",
+    "wm_set_resumed_activity",
+    "am_resume_activity",
+    "am_focused_activity",
+}
+PROC_START_TAG = "am_proc_start"  # [User, PID, UID, Process Name, Type, Component]
+PROC_END_TAGS = {"am_proc_died", "am_kill"}  # [User, PID, Process Name, ...]
+
+EVENT_PATTERN = re.compile(r"\s([a-z_]+)\s*: \[(.*)\]\s*$")
+COMPONENT_PATTERN = re.compile(r"([a-zA-Z][a-zA-Z0-9_]*(?:\.[a-zA-Z0-9_]+)+)/")
+
+# Log levels from least to most severe
+LEVELS = "VDIWEFA"
+
+# Capture format: the data file is a sequence of zlib-compressed blocks of
+# tab-separated records (epoch, level, device, pid, tid, tag, message); the
+# ".idx" file next to it has one fixed-size entry per block:
+# offset, size, first epoch, last epoch, level bitmask, record count.
+INDEX_ENTRY = struct.Struct("<QIddHI")
+BLOCK_RECORDS = 1024  # Records per block before it is flushed
+BLOCK_SECONDS = 2.0  # Max age of a pending block before it is flushed
+
+# OneSignal analytics (--stats). Bridge lines are the plugin's debugPrint
+# output; receive/display lines are heuristics over the native OneSignal SDK
+# log, which needs log_level DEBUG or VERBOSE. The plugin's will-display
+# listener line is not a display marker: it fires before the SDK shows the
+# notification, and not at all for background ones. "ERROR in" lines name
+# either a bridge method or an event listener (e.g.
+# notification_click_listener); only names seen through _onInvokeMethod are
+# counted as method errors.
+INVOKE_START_PATTERN = re.compile(r"OneSignalService\._onInvokeMethod: method=(\w+), args=")
+INVOKE_DONE_PATTERN = re.compile(r"OneSignalService\._onInvokeMethod: method=(\w+) done in (\d+)us")
+INVOKE_ERROR_PATTERN = re.compile(r"OneSignalService ERROR in (\w+): ")
+NOTIFICATION_RECEIVED_PATTERN = re.compile(
+    r"(?i)(onMessageReceived|processBundleFromReceiver|processNotificationData|notification received)"
+)
+NOTIFICATION_DISPLAYED_PATTERN = re.compile(r"(?i)(displayNotification|NotificationDisplayer)")
+NOTIFICATION_ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+STATS_INTERVAL = 10.0  # Seconds between summary tables
+THROUGHPUT_INTERVAL = 30.0  # Seconds between lines/s reports of a logcat stream
+EPOCH_CACHE_SIZE = 256  # Distinct log seconds whose timestamps are cached (all devices)
+LATENCY_SAMPLES = 1000  # Latencies kept per method for percentiles
+RECEIVE_DEBOUNCE = 0.5  # Id-less receive lines closer than this are one notification
+
+# (device, package, pid) reported by focus threads
+FocusChange = tuple["Device", str, Optional[str]]
+
+
+@dataclass
+class Device:
+    """Capture state of one adb device."""
+
+    serial: Optional[str] = None
+    """adb serial, or None for the default device."""
+
+    tag: str = ""
+    """Prefix printed before each line (empty when capturing a single device)."""
+
+    package: str = ""
+    pid: str = ""
+    logcat_process: Optional[subprocess.Popen] = None
+    events_process: Optional[subprocess.Popen] = None
+    logcat_thread: Optional[threading.Thread] = None
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    last_seen: dict[str, str] = field(default_factory=dict)
+    """Timestamp of the last line read per PID, to resume without clearing logcat."""
+
+    def adb(self, *args: str) -> list[str]:
+        """Build an adb command line targeting this device."""
+        if self.serial:
+            return ["adb", "-s", self.serial, *args]
+        return ["adb", *args]
+
+    def stop_logcat(self) -> None:
+        """Stop the running logcat stream and wait for its thread."""
+        self.stop_event.set()
+        if self.logcat_process:
+            self.logcat_process.terminate()
+        if self.logcat_thread and self.logcat_thread.is_alive():
+            self.logcat_thread.join(timeout=1)
+        self.stop_event.clear()
+
+
 # Global state
-current_process: Optional[subprocess.Popen] = None
-stop_event = threading.Event()
+shutdown_event = threading.Event()
+output_lock = threading.Lock()
 
 
-def run_cmd(cmd: str) -> str:
-    """Run a shell command and return output."""
+def run_cmd(cmd: list[str]) -> str:
+    """Run a command and return output."""
     result = subprocess.run(
         cmd,
-        shell=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.DEVNULL,
         text=True,
@@ -51,9 +190,19 @@ def run_cmd(cmd: str) -> str:
     return result.stdout.strip()
 
 
-def get_current_package() -> Optional[str]:
+def list_devices() -> list[str]:
+    """Get the serials of all connected devices."""
+    serials = []
+    for line in run_cmd(["adb", "devices"]).splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
+
+
+def get_current_package(device: Device) -> Optional[str]:
     """Get the currently focused app package name."""
-    output = run_cmd("adb shell dumpsys activity activities 2>/dev/null")
+    output = run_cmd(device.adb("shell", "dumpsys", "activity", "activities"))
     for line in output.splitlines():
         if "mResumedActivity" in line or "mFocusedActivity" in line:
             match = re.search(r"[a-zA-Z][a-zA-Z0-9_]*(\.[a-zA-Z0-9_]+)+", line)
@@ -62,20 +211,167 @@ def get_current_package() -> Optional[str]:
     return None
 
 
-def get_pid(package: str) -> Optional[str]:
+def get_pid(device: Device, package: str) -> Optional[str]:
     """Get the PID of a package."""
-    pid = run_cmd(f"adb shell pidof {package} 2>/dev/null")
+    pid = run_cmd(device.adb("shell", "pidof", package))
     return pid.split()[0] if pid else None
 
 
-def format_log_line(line: str) -> Optional[str]:
-    """Format a log line in Android Studio style."""
-    # Format: MM-DD HH:MM:SS.mmm PID TID LEVEL TAG: MESSAGE
-    pattern = r"^(\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2}\.\d+)\s+(\d+)\s+(\d+)\s+([VDIWEFA])\s+([^:]+):\s+(.*)$"
-    match = re.match(pattern, line)
+def parse_event(line: str) -> Optional[tuple[str, list[str]]]:
+    """Parse an events buffer line into (tag, fields)."""
+    match = EVENT_PATTERN.search(line)
+    if not match:
+        return None
+    tag, fields = match.groups()
+    return tag, [field.strip() for field in fields.split(",")]
+
+
+def focused_package(tag: str, fields: list[str]) -> Optional[str]:
+    """Return the package an events buffer focus event moved to, if it is one."""
+    if tag not in FOCUS_TAGS:
+        return None
+    match = COMPONENT_PATTERN.search(",".join(fields))
+    return match.group(1) if match else None
+
+
+def track_process(tag: str, fields: list[str], pids: dict[str, str]) -> Optional[str]:
+    """Update ``pids`` (process name -> PID) from a process start or death event.
+
+    Returns the name of the process the event is about, if it is one.
+    """
+    if tag == PROC_START_TAG and len(fields) >= 4:
+        pids[fields[3]] = fields[1]
+        return fields[3]
+    if tag in PROC_END_TAGS and len(fields) >= 3:
+        if pids.get(fields[2]) == fields[1]:
+            del pids[fields[2]]
+        return fields[2]
+    return None
+
+
+def read_event_history(
+    device: Device,
+) -> tuple[Optional[str], dict[str, str], set[str], Optional[str]]:
+    """Replay the events buffer once.
+
+    Returns the last focused package, the PIDs of processes started in the
+    buffer and still alive, the names of all processes the buffer mentions,
+    and the timestamp of the last line (to resume the live stream from).
+    """
+    package: Optional[str] = None
+    pids: dict[str, str] = {}
+    seen: set[str] = set()
+    last: Optional[str] = None
+    output = run_cmd(device.adb("logcat", "-b", "events", "-v", "threadtime", "-d"))
+    for line in output.splitlines():
+        event = parse_event(line)
+        if not event:
+            continue
+        package = focused_package(*event) or package
+        name = track_process(*event, pids)
+        if name:
+            seen.add(name)
+        if TIMESTAMP_PATTERN.match(line[:18]):
+            last = line[:18]
+    return package, pids, seen, last
+
+
+def focus_thread(device: Device, changes: "queue.Queue[FocusChange]") -> None:
+    """Thread that follows app focus and process changes from the events buffer.
+
+    Puts ``(device, package, pid)`` on ``changes`` whenever the focused app or
+    its PID changes. ``pid`` is None while the focused app has no running
+    process.
+
+    Focus and PIDs come from the events buffer (focus events and
+    ``am_proc_start``/``am_proc_died``), replayed once at start and after a
+    reconnect. ``dumpsys`` and ``pidof`` are only asked, once each, about what
+    the buffer no longer holds: the focused app when no focus event is left,
+    and a focused process the buffer never mentions (started before its
+    oldest event).
+    """
+    package: Optional[str] = None
+    reported: Optional[tuple[Optional[str], Optional[str]]] = None
+    # Processes whose PID is known from events or was already asked for
+    probed: set[str] = set()
+    asked_focus = False
+    pids: dict[str, str] = {}
+
+    def report() -> None:
+        nonlocal reported
+        if package and package not in pids and package not in probed:
+            probed.add(package)
+            pid = get_pid(device, package)
+            if pid:
+                pids[package] = pid
+        current = (package, pids.get(package) if package else None)
+        if package and current != reported:
+            reported = current
+            changes.put((device, *current))
 
+    while not shutdown_event.is_set():
+        history_package, pids, seen, resume = read_event_history(device)
+        probed |= seen
+        if history_package:
+            package = history_package
+        elif package is None and not asked_focus:
+            asked_focus = True
+            package = get_current_package(device)
+        report()
+
+        # Resume right after the replayed history, or from now if it was empty
+        process = device.events_process = subprocess.Popen(
+            device.adb("logcat", "-b", "events", "-v", "threadtime", "-T", resume or "1"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        if process.stdout is None:
+            return
+
+        for line in process.stdout:
+            if shutdown_event.is_set():
+                break
+
+            event = parse_event(line)
+            if not event:
+                continue
+            package = focused_package(*event) or package
+            name = track_process(*event, pids)
+            if name:
+                probed.add(name)
+            report()
+
+        process.terminate()
+
+        # Stream ended (device disconnected or adb restarted): wait and resume
+        if not shutdown_event.is_set():
+            run_cmd(device.adb("wait-for-device"))
+
+
+def parse_log_line(line: str) -> Optional[tuple[str, str, str, str, str, str, str]]:
+    """Split a threadtime log line into (date, time, pid, tid, level, tag, message)."""
+    # Fast path: plain split, no regex
+    parts = line.split(None, 5)
+    if len(parts) == 6 and parts[4] in COLORS and parts[2].isdigit():
+        tag, sep, msg = parts[5].partition(": ")
+        if sep:
+            return parts[0], parts[1], parts[2], parts[3], parts[4], tag.rstrip(), msg
+
+    match = LOG_LINE_PATTERN.match(line)
     if match:
         date, time_str, pid, tid, level, tag, msg = match.groups()
+        return date, time_str, pid, tid, level, tag.rstrip(), msg
+    return None
+
+
+def format_log_line(line: str) -> Optional[str]:
+    """Format a log line in Android Studio style."""
+    parsed = parse_log_line(line)
+
+    if parsed:
+        _, time_str, pid, tid, level, tag, msg = parsed
         color = COLORS.get(level, RESET)
         # Format: TIME PID-TID TAG LEVEL: MESSAGE
         return f"{DIM}{time_str}{RESET} {DIM}{pid:>5}-{tid:<5}{RESET} {color}{tag:<20} {level}: {msg}{RESET}"
@@ -84,43 +380,421 @@ def format_log_line(line: str) -> Optional[str]:
         return f"{DIM}{line}{RESET}" if line.strip() else None
 
 
-def print_header(pkg: str, pid: Optional[str]) -> None:
+@lru_cache(maxsize=EPOCH_CACHE_SIZE)
+def _second_epoch(key: str) -> float:
+    """Unix timestamp of a logcat "MM-DD HH:MM:SS" second."""
+    now = datetime.now()
+    stamp = datetime.strptime(f"{now.year}-{key}", "%Y-%m-%d %H:%M:%S")
+    if stamp > now.replace(microsecond=0) and (stamp - now).days >= 1:
+        stamp = stamp.replace(year=now.year - 1)
+    return stamp.timestamp()
+
+
+def log_epoch(date: str, time_str: str) -> float:
+    """Convert a logcat "MM-DD" date and "HH:MM:SS.mmm" time to a Unix timestamp.
+
+    logcat omits the year; the current one is assumed unless that would put
+    the line in the future (a capture spanning New Year). Conversions are
+    cached per second, for the last ``EPOCH_CACHE_SIZE`` seconds seen.
+    """
+    return _second_epoch(f"{date} {time_str[:8]}") + float(time_str[8:] or 0)
+
+
+def level_mask(levels: str) -> int:
+    """Bitmask with one bit per level in ``levels``."""
+    mask = 0
+    for level in levels:
+        if level in LEVELS:
+            mask |= 1 << LEVELS.index(level)
+    return mask
+
+
+class Recorder:
+    """Append-only writer for the compressed, indexed capture format."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._data = open(path, "ab")
+        self._index = open(f"{path}.idx", "ab")
+        self._lock = threading.Lock()
+        self._pending: list[str] = []
+        self._first = self._last = 0.0
+        self._mask = 0
+        self._opened = time.monotonic()
+        self.records = 0
+
+    def add(self, device: str, lines: list[tuple[str, str, str, str, str, str, str]]) -> None:
+        """Append parsed log lines captured from ``device``."""
+        with self._lock:
+            for date, time_str, pid, tid, level, tag, msg in lines:
+                epoch = log_epoch(date, time_str)
+                if not self._pending:
+                    self._first = self._last = epoch
+                    self._opened = time.monotonic()
+                self._first = min(self._first, epoch)
+                self._last = max(self._last, epoch)
+                self._mask |= level_mask(level)
+                self._pending.append(
+                    f"{epoch:.3f}\t{level}\t{device}\t{pid}\t{tid}\t{tag.replace(chr(9), ' ')}\t{msg}"
+                )
+
+            if len(self._pending) >= BLOCK_RECORDS:
+                self._flush()
+
+        self.flush_stale()
+
+    def flush_stale(self) -> None:
+        """Flush the pending block if it is older than BLOCK_SECONDS."""
+        with self._lock:
+            if self._pending and time.monotonic() - self._opened >= BLOCK_SECONDS:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write the pending records as one block and index it (lock held)."""
+        if not self._pending:
+            return
+
+        block = zlib.compress("\n".join(self._pending).encode("utf-8"), 6)
+        offset = self._data.tell()
+        self._data.write(block)
+        self._data.flush()
+        # Index entry goes last so a crash never indexes a partial block
+        self._index.write(
+            INDEX_ENTRY.pack(
+                offset, len(block), self._first, self._last, self._mask, len(self._pending)
+            )
+        )
+        self._index.flush()
+
+        self.records += len(self._pending)
+        self._pending = []
+        self._mask = 0
+
+    def close(self) -> None:
+        """Flush pending records and close the capture."""
+        with self._lock:
+            self._flush()
+            self._data.close()
+            self._index.close()
+
+
+def percentile(values: "deque[float]", pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[round((len(ordered) - 1) * pct / 100)]
+
+
+class Analytics:
+    """Live statistics over OneSignal plugin and SDK log lines (--stats)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.calls: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.listener_errors: dict[str, int] = {}
+        self.durations: dict[str, deque[float]] = {}
+        self.received = 0
+        self.displayed = 0
+        self.delivery: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._pending_ids: dict[tuple[str, str], float] = {}
+        self._pending: dict[str, deque[float]] = {}
+
+    def feed(self, device: str, lines: list[tuple[float, str, str]]) -> None:
+        """Update statistics from ``(epoch, tag, message)`` lines of one device."""
+        with self._lock:
+            for epoch, tag, msg in lines:
+                if "OneSignal" not in msg and "OneSignal" not in tag:
+                    continue
+
+                if match := INVOKE_START_PATTERN.search(msg):
+                    method = match.group(1)
+                    self.calls[method] = self.calls.get(method, 0) + 1
+                elif match := INVOKE_DONE_PATTERN.search(msg):
+                    method, micros = match.groups()
+                    samples = self.durations.setdefault(method, deque(maxlen=LATENCY_SAMPLES))
+                    samples.append(int(micros) / 1000)
+                elif match := INVOKE_ERROR_PATTERN.search(msg):
+                    name = match.group(1)
+                    errors = self.errors if name in self.calls else self.listener_errors
+                    errors[name] = errors.get(name, 0) + 1
+                elif NOTIFICATION_DISPLAYED_PATTERN.search(msg):
+                    self._displayed(device, epoch, msg)
+                elif NOTIFICATION_RECEIVED_PATTERN.search(msg):
+                    self._received(device, epoch, msg)
+
+    def _received(self, device: str, epoch: float, msg: str) -> None:
+        """Record a notification arriving (lock held)."""
+        match = NOTIFICATION_ID_PATTERN.search(msg)
+        if match:
+            key = (device, match.group(0).lower())
+            if key not in self._pending_ids:
+                self._pending_ids[key] = epoch
+                self.received += 1
+            return
+
+        # The SDK logs several lines per notification; without an id they
+        # are grouped by time
+        pending = self._pending.setdefault(device, deque(maxlen=LATENCY_SAMPLES))
+        if not pending or epoch - pending[-1] > RECEIVE_DEBOUNCE:
+            pending.append(epoch)
+            self.received += 1
+
+    def _displayed(self, device: str, epoch: float, msg: str) -> None:
+        """Pair a notification display with its receive line (lock held)."""
+        match = NOTIFICATION_ID_PATTERN.search(msg)
+        received = None
+        if match:
+            received = self._pending_ids.pop((device, match.group(0).lower()), None)
+        if received is None and self._pending.get(device):
+            received = self._pending[device].popleft()
+        if received is not None:
+            self.displayed += 1
+            self.delivery.append(max(epoch - received, 0.0) * 1000)
+
+    def summary(self) -> list[str]:
+        """Render the statistics as table lines."""
+        with self._lock:
+            elapsed = int(time.monotonic() - self.started)
+            lines = [
+                f"{BOLD}━━━ OneSignal stats {DIM}({elapsed // 60}m {elapsed % 60:02d}s){RESET}",
+                f"{DIM}{'Method':<40} {'Calls':>6} {'Errors':>7} {'p50 ms':>8} "
+                f"{'p95 ms':>8} {'max ms':>8}{RESET}",
+            ]
+
+            def ms(value: Optional[float]) -> str:
+                return "—" if value is None else f"{value:.1f}"
+
+            methods = sorted(self.calls, key=lambda m: -self.calls[m])
+            for method in methods:
+                samples = self.durations.get(method, deque())
+                errors = self.errors.get(method, 0)
+                color = COLORS["E"] if errors else ""
+                lines.append(
+                    f"{color}{method:<40} {self.calls.get(method, 0):>6} {errors:>7} "
+                    f"{ms(percentile(samples, 50)):>8} {ms(percentile(samples, 95)):>8} "
+                    f"{ms(max(samples) if samples else None):>8}{RESET}"
+                )
+
+            calls = sum(self.calls.values())
+            errors = sum(self.errors.values())
+            rate = f"{errors * 100 / calls:.1f}%" if calls else "—"
+            lines.append(f"{DIM}{'Total':<40}{RESET} {calls:>6} {errors:>7}   error rate {rate}")
+            if self.listener_errors:
+                listeners = ", ".join(
+                    f"{name} {count}" for name, count in sorted(self.listener_errors.items())
+                )
+                lines.append(f"{COLORS['E']}Listener errors: {listeners}{RESET}")
+            lines.append(
+                f"Notifications: {self.received} received, {self.displayed} displayed, "
+                f"receive→display p50 {ms(percentile(self.delivery, 50))} ms, "
+                f"p95 {ms(percentile(self.delivery, 95))} ms"
+            )
+            return lines
+
+
+def print_stats(analytics: Analytics) -> None:
+    """Print the analytics summary table between log lines."""
+    with output_lock:
+        print()
+        print("\n".join(analytics.summary()))
+        print()
+
+
+def parse_time(value: str) -> float:
+    """Parse a --since/--until value into a Unix timestamp.
+
+    Accepts "YYYY-MM-DD HH:MM[:SS[.mmm]]", "MM-DD HH:MM[:SS[.mmm]]" or
+    "HH:MM[:SS[.mmm]]" (today).
+    """
+    now = datetime.now()
+    times = ("%H:%M:%S.%f", "%H:%M:%S", "%H:%M")
+    for fmt in [f"%Y-%m-%d{sep}{t}" for sep in (" ", "T") for t in times] + ["%Y-%m-%d"]:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            pass
+    for t in times:
+        try:
+            return datetime.strptime(f"{now.year}-{value}", f"%Y-%m-%d {t}").timestamp()
+        except ValueError:
+            pass
+    for t in times:
+        try:
+            parsed = datetime.strptime(value, t)
+            return datetime.combine(now.date(), parsed.time()).timestamp()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid time: {value!r}")
+
+
+def query_capture(
+    path: Path,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    tags: Optional[set[str]] = None,
+    min_level: str = "V",
+    pattern: Optional[re.Pattern] = None,
+):
+    """Yield matching records (epoch, level, device, pid, tid, tag, message).
+
+    Blocks whose index entry is outside the time range or has no line at or
+    above ``min_level`` are skipped without being read.
+    """
+    wanted = level_mask(LEVELS[LEVELS.index(min_level) :])
+    index = Path(f"{path}.idx").read_bytes()
+    data_size = path.stat().st_size
+
+    with open(path, "rb") as data:
+        for entry in INDEX_ENTRY.iter_unpack(index[: len(index) - len(index) % INDEX_ENTRY.size]):
+            offset, size, first, last, mask, _ = entry
+            if offset + size > data_size or not mask & wanted:
+                continue
+            if (since is not None and last < since) or (until is not None and first > until):
+                continue
+
+            data.seek(offset)
+            for record in zlib.decompress(data.read(size)).decode("utf-8").split("\n"):
+                fields = record.split("\t", 6)
+                if len(fields) != 7:
+                    continue
+                epoch = float(fields[0])
+                if since is not None and epoch < since:
+                    continue
+                if until is not None and epoch > until:
+                    continue
+                if not level_mask(fields[1]) & wanted:
+                    continue
+                if tags and fields[5] not in tags:
+                    continue
+                if pattern and not pattern.search(record):
+                    continue
+                yield (epoch, *fields[1:])
+
+
+def replay(args: argparse.Namespace) -> None:
+    """Print the records of a capture that match the query options."""
+    path = Path(args.replay)
+    if not path.exists() or not Path(f"{path}.idx").exists():
+        print(f"Capture not found: {path}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    regex = args.grep or args.extra_filter
+    pattern = re.compile(regex, re.IGNORECASE) if regex else None
+    tags = set(args.tag) if args.tag else None
+
+    analytics = Analytics() if args.stats else None
+    shown = 0
+    batch = []
+    for epoch, level, device, pid, tid, tag, msg in query_capture(
+        path, since, until, tags, args.level, pattern
+    ):
+        if analytics:
+            analytics.feed(device, [(epoch, tag, msg)])
+        stamp = datetime.fromtimestamp(epoch).strftime("%m-%d %H:%M:%S.%f")[:-3]
+        prefix = f"{DIM}{device}{RESET} " if device else ""
+        color = COLORS.get(level, RESET)
+        batch.append(
+            f"{prefix}{DIM}{stamp}{RESET} {DIM}{pid:>5}-{tid:<5}{RESET} "
+            f"{color}{tag:<20} {level}: {msg}{RESET}"
+        )
+        shown += 1
+        if len(batch) >= BLOCK_RECORDS:
+            sys.stdout.write("\n".join(batch) + "\n")
+            batch = []
+
+    if batch:
+        sys.stdout.write("\n".join(batch) + "\n")
+    print(f"{DIM}── {shown} matching lines{RESET}")
+    if analytics:
+        print_stats(analytics)
+
+
+def print_header(device: Device, pkg: str, pid: Optional[str]) -> None:
     """Print app header."""
-    print()
-    print(f"{BOLD}━━━ {pkg} {DIM}PID: {pid or '?'}{RESET}")
-    print()
+    with output_lock:
+        print()
+        print(f"{device.tag}{BOLD}━━━ {pkg} {DIM}PID: {pid or '?'}{RESET}")
+        print()
 
 
-def print_usage(extra_filter: Optional[str]) -> None:
+def print_usage(extra_filter: Optional[str], devices: list[Device]) -> None:
     """Print usage instructions."""
     os.system("clear" if os.name == "posix" else "cls")
     print(f"{BOLD}Logcat{RESET} {DIM}| Flet/Flutter{RESET}")
     print()
-    print(f"{DIM}Usage: python flet_log.py [extra_filter]{RESET}")
+    print(f"{DIM}Usage: python flet_log.py [extra_filter] [--devices all|SERIAL,...]{RESET}")
     print(f'{DIM}Example: python flet_log.py "OneSignal|Firebase"{RESET}')
     print()
     print(f"{DIM}Default filter: flutter, python, Error, Exception, Traceback{RESET}")
     if extra_filter:
         print(f"{DIM}Extra filter: {extra_filter}{RESET}")
+    if any(device.serial for device in devices):
+        print(f"{DIM}Devices: {', '.join(str(device.serial) for device in devices)}{RESET}")
     print(f"{DIM}Press Ctrl+C to exit{RESET}")
 
 
-def logcat_thread(pid: Optional[str], pkg: str, filter_pattern: str) -> None:
-    """Thread to read and display logcat output."""
-    global current_process
+def logcat_thread(
+    device: Device,
+    pid: Optional[str],
+    pkg: str,
+    filter_pattern: str,
+    recorder: Optional[Recorder] = None,
+    analytics: Optional[Analytics] = None,
+) -> None:
+    """Thread to read and display logcat output.
+
+    Reads logcat in large binary chunks, formats the complete lines of each
+    chunk and writes them with a single call. Throughput over the last
+    interval is reported every ``THROUGHPUT_INTERVAL`` seconds while lines
+    keep arriving, and for the whole run when the stream stops. Batches from different devices are
+    written under a shared lock so lines never interleave mid-line.
+
+    The stream resumes after the last line previously read for the same PID
+    (``-T``) instead of clearing the device buffer. With a ``recorder`` every
+    parsed line is recorded, not only the ones matching the display filter;
+    the same goes for ``analytics``.
+    """
+    lines_read = 0
+    lines_shown = 0
+    started = time.monotonic()
+    reported_at, reported_lines = started, 0
+    prefix = device.tag
+
+    def report(label: str, lines: int, elapsed: float, shown: str = "") -> None:
+        with output_lock:
+            print(
+                f"{prefix}{DIM}── {label}{lines} lines in {elapsed:.1f}s "
+                f"({lines / elapsed:.0f} lines/s{shown}){RESET}"
+            )
 
     try:
+        # A new PID's history is all fresh output; otherwise resume after the
+        # last line seen (or from now when nothing was seen yet)
+        resume = device.last_seen.get(pid or "")
         if pid:
-            cmd = ["adb", "logcat", "--pid", pid, "-v", "threadtime"]
+            cmd = device.adb("logcat", "--pid", pid, "-v", "threadtime")
         else:
-            cmd = ["adb", "logcat", "-v", "threadtime"]
+            cmd = device.adb("logcat", "-v", "threadtime")
+        if resume:
+            cmd += ["-T", resume]
+        elif not pid:
+            cmd += ["-T", "1"]
 
-        current_process = subprocess.Popen(
+        process = device.logcat_process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
-            text=True,
-            bufsize=1,
         )
 
         # Compile filter pattern
@@ -129,91 +803,222 @@ def logcat_thread(pid: Optional[str], pkg: str, filter_pattern: str) -> None:
         else:
             pattern = re.compile(f"{pkg}|{filter_pattern}", re.IGNORECASE)
 
-        if current_process.stdout is None:
+        if process.stdout is None:
             return
 
-        for line in current_process.stdout:
-            if stop_event.is_set():
+        fd = process.stdout.fileno()
+        pending = b""
+
+        while not device.stop_event.is_set():
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+            if not chunk:
                 break
 
-            line = line.rstrip()
-            if pattern.search(line):
-                formatted = format_log_line(line)
-                if formatted:
-                    print(formatted)
+            # Keep the trailing partial line for the next chunk
+            data = pending + chunk
+            cut = data.rfind(b"\n") + 1
+            pending = data[cut:]
+            if not cut:
+                continue
+
+            batch = []
+            records = []
+            for line in data[:cut].decode("utf-8", "replace").splitlines():
+                # -T replays lines at the resume timestamp that were already shown
+                if resume:
+                    if line[:18] <= resume:
+                        continue
+                    resume = None
+
+                lines_read += 1
+                if recorder or analytics:
+                    parsed = parse_log_line(line.rstrip())
+                    if parsed:
+                        records.append(parsed)
+                if pattern.search(line):
+                    formatted = format_log_line(line.rstrip())
+                    if formatted:
+                        batch.append(prefix + formatted)
+
+            last = data[:cut].rstrip(b"\n").rsplit(b"\n", 1)[-1][:18].decode("utf-8", "replace")
+            if TIMESTAMP_PATTERN.match(last):
+                device.last_seen[pid or ""] = last
+            if records and recorder:
+                recorder.add(device.serial or "", records)
+            if records and analytics:
+                analytics.feed(
+                    device.serial or "",
+                    [(log_epoch(r[0], r[1]), r[5], r[6]) for r in records],
+                )
+
+            if batch:
+                lines_shown += len(batch)
+                with output_lock:
+                    sys.stdout.write("\n".join(batch) + "\n")
+                    sys.stdout.flush()
+
+            now = time.monotonic()
+            if now - reported_at >= THROUGHPUT_INTERVAL:
+                report("last ", lines_read - reported_lines, now - reported_at)
+                reported_at, reported_lines = now, lines_read
 
     except Exception:
         pass
     finally:
-        if current_process:
-            current_process.terminate()
-            current_process = None
+        if device.logcat_process:
+            device.logcat_process.terminate()
+            device.logcat_process = None
+
+        elapsed = time.monotonic() - started
+        if lines_read and elapsed > 0:
+            report("", lines_read, elapsed, f", {lines_shown} shown")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Android logcat viewer for Flet/Flutter apps",
+    )
+    parser.add_argument("extra_filter", nargs="?", help='Extra regex filter (e.g. "OneSignal")')
+    parser.add_argument(
+        "--devices",
+        metavar="all|SERIAL[,SERIAL...]",
+        help="Capture several devices concurrently (default: the adb default device)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Also append every captured line to an indexed capture file",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Show OneSignal bridge call and notification delivery statistics",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=STATS_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between statistics tables (default: {STATS_INTERVAL:g})",
+    )
+
+    query = parser.add_argument_group("replay")
+    query.add_argument(
+        "--replay",
+        "--query",
+        dest="replay",
+        metavar="FILE",
+        help="Print lines from a capture recorded with --record instead of capturing",
+    )
+    query.add_argument("--since", help='Start time ("HH:MM[:SS]", "MM-DD HH:MM", ...)')
+    query.add_argument("--until", help="End time (same formats as --since)")
+    query.add_argument("--tag", action="append", help="Only this tag (repeatable)")
+    query.add_argument(
+        "--level", default="V", choices=list(LEVELS), help="Minimum level (default: V)"
+    )
+    query.add_argument("--grep", metavar="REGEX", help="Regex matched against the whole record")
+    return parser.parse_args(argv)
+
+
+def resolve_devices(spec: Optional[str]) -> list[Device]:
+    """Build the devices to capture from the --devices value."""
+    if not spec:
+        return [Device()]
+
+    if spec == "all":
+        serials = list_devices()
+    else:
+        serials = [serial.strip() for serial in spec.split(",") if serial.strip()]
+
+    if len(serials) == 1:
+        return [Device(serials[0])]
+
+    width = max((len(serial) for serial in serials), default=0)
+    return [
+        Device(serial, tag=f"{DEVICE_COLORS[i % len(DEVICE_COLORS)]}{serial:<{width}}{RESET} ")
+        for i, serial in enumerate(serials)
+    ]
 
 
 def main() -> None:
     """Main entry point."""
-    global current_process
+    args = parse_args()
+    if args.replay:
+        replay(args)
+        return
 
-    # Get extra filter from command line
-    extra_filter = sys.argv[1] if len(sys.argv) > 1 else None
+    extra_filter = args.extra_filter
 
     # Build filter pattern
     filter_pattern = DEFAULT_FILTER
     if extra_filter:
         filter_pattern = f"{filter_pattern}|{extra_filter}"
 
+    devices = resolve_devices(args.devices)
+    if not devices:
+        print("No devices connected (check `adb devices`)", file=sys.stderr)
+        sys.exit(1)
+
     # Print usage
-    print_usage(extra_filter)
+    print_usage(extra_filter, devices)
+
+    recorder = Recorder(Path(args.record)) if args.record else None
+    if recorder:
+        print(f"{DIM}Recording to: {recorder.path}{RESET}")
+
+    analytics = Analytics() if args.stats else None
+    last_stats = time.monotonic()
 
-    current_pkg = ""
-    current_pid = ""
-    logcat_thread_handle: Optional[threading.Thread] = None
+    changes: "queue.Queue[FocusChange]" = queue.Queue()
+    for device in devices:
+        threading.Thread(target=focus_thread, args=(device, changes), daemon=True).start()
 
     try:
         while True:
-            pkg = get_current_package()
-
-            if not pkg:
-                time.sleep(1)
+            # Timeout only keeps Ctrl+C responsive; changes arrive as events
+            try:
+                device, pkg, pid = changes.get(timeout=1)
+            except queue.Empty:
+                if recorder:
+                    recorder.flush_stale()
+                if analytics and time.monotonic() - last_stats >= args.stats_interval:
+                    print_stats(analytics)
+                    last_stats = time.monotonic()
                 continue
 
-            pid = get_pid(pkg)
-
-            if pkg != current_pkg or pid != current_pid:
+            if pkg != device.package or (pid or "") != device.pid:
                 # Stop current logcat
-                stop_event.set()
-                if current_process:
-                    current_process.terminate()
-                if logcat_thread_handle and logcat_thread_handle.is_alive():
-                    logcat_thread_handle.join(timeout=1)
-
-                stop_event.clear()
-                current_pkg = pkg
-                current_pid = pid or ""
+                device.stop_logcat()
+                device.package = pkg
+                device.pid = pid or ""
 
-                print_header(pkg, pid)
-
-                # Clear logcat
-                run_cmd("adb logcat -c 2>/dev/null")
+                print_header(device, pkg, pid)
 
                 # Start new logcat thread
-                logcat_thread_handle = threading.Thread(
+                device.logcat_thread = threading.Thread(
                     target=logcat_thread,
-                    args=(pid, pkg, filter_pattern),
+                    args=(device, pid, pkg, filter_pattern, recorder, analytics),
                     daemon=True,
                 )
-                logcat_thread_handle.start()
-
-            time.sleep(1)
+                device.logcat_thread.start()
 
     except KeyboardInterrupt:
         pass
     finally:
         print()
+        shutdown_event.set()
+        for device in devices:
+            device.stop_logcat()
+        if recorder:
+            recorder.close()
+            print(f"{DIM}Recorded {recorder.records} lines to {recorder.path}{RESET}")
+        if analytics:
+            print_stats(analytics)
         print(f"{DIM}Stopped{RESET}")
-        stop_event.set()
-        if current_process:
-            current_process.terminate()
+        for device in devices:
+            if device.events_process:
+                device.events_process.terminate()
 
 
 if __name__ == "__main__":
@@ -38,11 +38,36 @@ from flet_onesignal.live_activities import OneSignalLiveActivities
 from flet_onesignal.location import OneSignalLocation
 from flet_onesignal.notifications import OneSignalNotifications
 from flet_onesignal.onesignal import OneSignal
+
+# Bridge call policies and errors
+from flet_onesignal.policy import (
+    CallPolicy,
+    CircuitBreaker,
+    OneSignalArgumentError,
+    OneSignalBridgeError,
+    OneSignalCircuitOpenError,
+    OneSignalNativeError,
+    OneSignalQueueTimeoutError,
+    OneSignalTimeoutError,
+    OneSignalUnsupportedError,
+)
+
+# Deep-link routing for click events
+from flet_onesignal.router import DeepLinkRouter, RouteConflictError, RouteMatch
 from flet_onesignal.session import OneSignalSession
 
+# Bridge call tracing
+from flet_onesignal.tracing import BridgeSpan, BridgeTracer
+
 # Types, enums, and events
 from flet_onesignal.types import (
+    OSCallPriority,
+    OSCoalescePolicy,
     OSErrorEvent,
+    OSEventCoalescing,
+    OSEventReplay,
+    OSForegroundAction,
+    OSForegroundRule,
     OSInAppMessageClickEvent,
     OSInAppMessageClickResult,
     OSInAppMessageDidDismissEvent,
@@ -54,6 +79,7 @@ from flet_onesignal.types import (
     OSNotificationWillDisplayEvent,
     OSPermissionChangeEvent,
     OSPushSubscriptionChangedEvent,
+    OSStateSnapshot,
     OSUserChangedEvent,
     OSUserState,
 )
@@ -77,9 +103,16 @@ __all__ = [
     # Types and enums
     "OSLogLevel",
     "OSUserState",
+    "OSStateSnapshot",
+    "OSCallPriority",
+    "OSCoalescePolicy",
+    "OSEventCoalescing",
+    "OSEventReplay",
     # Notification events
     "OSNotificationClickEvent",
     "OSNotificationWillDisplayEvent",
+    "OSForegroundAction",
+    "OSForegroundRule",
     "OSPermissionChangeEvent",
     # User events
     "OSUserChangedEvent",
@@ -93,6 +126,23 @@ __all__ = [
     "OSInAppMessageDidDismissEvent",
     # Error event
     "OSErrorEvent",
+    # Bridge call policies and errors
+    "CallPolicy",
+    "CircuitBreaker",
+    "OneSignalBridgeError",
+    "OneSignalNativeError",
+    "OneSignalArgumentError",
+    "OneSignalUnsupportedError",
+    "OneSignalTimeoutError",
+    "OneSignalQueueTimeoutError",
+    "OneSignalCircuitOpenError",
+    # Bridge call tracing
+    "BridgeTracer",
+    "BridgeSpan",
+    # Deep-link routing
+    "DeepLinkRouter",
+    "RouteMatch",
+    "RouteConflictError",
     # Language
     "Language",
 ]
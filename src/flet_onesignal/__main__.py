@@ -14,14 +14,29 @@ Usage:
     fos-build apk
     fos-build web
     fos-build ipa --ios-team-id ABCDE12345
+
+    # Bulk user import through the REST API:
+    python -m flet_onesignal import users.csv --app-id APP_ID --rest-api-key KEY
+
+    # Local REST API emulator for load tests:
+    python -m flet_onesignal emulator --port 8080 --rate-limit 100
 """
 
 import sys
 
-from flet_onesignal.build import main
-
 if __name__ == "__main__":
-    # Remove 'build' from args if present (for `python -m flet_onesignal build apk`)
-    if len(sys.argv) > 1 and sys.argv[1] == "build":
-        sys.argv.pop(1)
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        from flet_onesignal.importer import main
+
+        main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "emulator":
+        from flet_onesignal.emulator import main
+
+        main(sys.argv[2:])
+    else:
+        from flet_onesignal.build import main
+
+        # Remove 'build' from args if present (for `python -m flet_onesignal build apk`)
+        if len(sys.argv) > 1 and sys.argv[1] == "build":
+            sys.argv.pop(1)
+        main()
@@ -0,0 +1,64 @@
+"""
+Android ABI helpers for fos-build.
+
+Maps native libraries (``.so`` files) to the Android ABI they were built for,
+either from an ABI directory in their path (``lib/arm64-v8a/...``) or from the
+CPython extension suffix (``*.cpython-312-aarch64-linux-android.so``), and
+measures how much of a built APK/AAB each ABI takes.
+"""
+
+import zipfile
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Iterable, Optional
+
+ANDROID_ABIS = ("arm64-v8a", "armeabi-v7a", "x86_64", "x86")
+"""ABIs supported by Flutter Android builds."""
+
+# CPython extension module platform triplets per ABI
+_ABI_TRIPLETS = {
+    "aarch64-linux-android": "arm64-v8a",
+    "arm-linux-androideabi": "armeabi-v7a",
+    "x86_64-linux-android": "x86_64",
+    "i686-linux-android": "x86",
+}
+
+
+def abi_of(path: PurePath) -> Optional[str]:
+    """Return the ABI a native library was built for, or None if unknown.
+
+    ``path`` must be relative to the package or archive root, so that
+    unrelated parent directories cannot be taken for an ABI.
+    """
+    for part in path.parts[:-1]:
+        if part in ANDROID_ABIS:
+            return part
+
+    for triplet, abi in _ABI_TRIPLETS.items():
+        if triplet in path.name:
+            return abi
+
+    return None
+
+
+def excluded_abis(targets: Iterable[str]) -> list[str]:
+    """Return the ABIs that are not in ``targets``."""
+    targets = set(targets)
+    return [abi for abi in ANDROID_ABIS if abi not in targets]
+
+
+def native_lib_sizes(artifact: Path) -> dict[str, int]:
+    """Uncompressed bytes of the ``.so`` files in an APK/AAB, per ABI.
+
+    ABIs are read from the entry names inside the archive (``lib/<abi>/`` or
+    ``base/lib/<abi>/``), never from where the archive itself is stored.
+    Libraries whose ABI cannot be determined are left out.
+    """
+    sizes: dict[str, int] = {}
+    with zipfile.ZipFile(artifact) as archive:
+        for info in archive.infolist():
+            if not info.filename.endswith(".so"):
+                continue
+            abi = abi_of(PurePosixPath(info.filename))
+            if abi is not None:
+                sizes[abi] = sizes.get(abi, 0) + info.file_size
+    return sizes
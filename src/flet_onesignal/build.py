@@ -12,6 +12,7 @@ Usage:
     fos-build apk
     fos-build aab --split-per-abi
     fos-build apk --location
+    fos-build apk --watch
     fos-build ipa
     fos-build web
 
@@ -20,21 +21,26 @@ Usage:
 """
 
 import argparse
+import importlib.util
 import re
 import shutil
 import subprocess
 import sys
+import zipfile
+from importlib import resources
 from pathlib import Path
+from typing import Optional
 
 try:
     import tomllib
 except ModuleNotFoundError:
     import tomli as tomllib
 
-from flet_onesignal import ui
+from flet_onesignal import abi, size, ui
 
 ALL_PLATFORMS = ["apk", "aab", "ipa", "web", "macos", "linux", "windows"]
 ANDROID_PLATFORMS = {"apk", "aab"}
+ARCHIVE_PLATFORMS = {"apk", "aab", "ipa"}
 
 NEXT_STEPS = {
     "apk": [
@@ -95,14 +101,43 @@ def _get_onesignal_config(project_root: Path) -> dict:
     return pyproject.get("tool", {}).get("flet", {}).get("onesignal", {}).get("android", {})
 
 
-# Map of optional OneSignal module names to their Maven coordinates + extra deps
-# Each entry: key -> list of (maven_coord, version_range) tuples
-_ONESIGNAL_MODULES = {
-    "location": [
-        ("com.onesignal:location", "[5.0.0, 5.99.99]"),
-        ("com.google.android.gms:play-services-location", "18.0.0"),
-    ],
-}
+_MODULES_RESOURCE = "onesignal_modules.toml"
+
+
+def _load_module_registry(overrides: Optional[dict] = None) -> dict[str, dict]:
+    """Load the registry of optional OneSignal modules.
+
+    Built-in modules come from the ``onesignal_modules.toml`` package data file.
+    ``overrides`` (the ``modules`` table of ``[tool.flet.onesignal.android]``)
+    replaces keys of built-in entries or declares new modules.
+    """
+    with resources.files("flet_onesignal").joinpath(_MODULES_RESOURCE).open("rb") as f:
+        registry = tomllib.load(f)
+
+    for name, spec in (overrides or {}).items():
+        registry[name] = {**registry.get(name, {}), **spec}
+
+    return registry
+
+
+def _module_enabled(name: str, spec: dict, config: dict) -> bool:
+    """Whether a module is enabled in config, falling back to its registry default."""
+    enabled = config.get(name)
+    return bool(spec.get("default", False) if enabled is None else enabled)
+
+
+def _enabled_modules(config: dict) -> dict[str, dict]:
+    """Return the registry entries of all OneSignal modules enabled in config."""
+    registry = _load_module_registry(config.get("modules"))
+    return {name: spec for name, spec in registry.items() if _module_enabled(name, spec, config)}
+
+
+def _disabled_modules(config: dict) -> dict[str, dict]:
+    """Return the registry entries of all OneSignal modules disabled in config."""
+    registry = _load_module_registry(config.get("modules"))
+    return {
+        name: spec for name, spec in registry.items() if not _module_enabled(name, spec, config)
+    }
 
 
 def _inject_dep_line(content: str, dep_line: str) -> str:
@@ -134,12 +169,33 @@ def _inject_dep_line(content: str, dep_line: str) -> str:
 def _collect_onesignal_deps(config: dict) -> list[tuple[str, str]]:
     """Collect all (maven_coord, version) pairs for enabled OneSignal modules."""
     deps = []
-    for key, dep_list in _ONESIGNAL_MODULES.items():
-        if config.get(key):
-            deps.extend(dep_list)
+    for spec in _enabled_modules(config).values():
+        for dep in spec.get("dependencies", []):
+            deps.append((dep["coord"], dep["version"]))
     return deps
 
 
+def _collect_onesignal_permissions(config: dict) -> list[str]:
+    """Collect the Android permissions required by enabled OneSignal modules."""
+    permissions = []
+    for spec in _enabled_modules(config).values():
+        for permission in spec.get("permissions", []):
+            if permission not in permissions:
+                permissions.append(permission)
+    return permissions
+
+
+def _collect_onesignal_excludes(config: dict) -> list[tuple[str, str]]:
+    """Collect the (group, module) Maven artifacts excluded for disabled OneSignal modules."""
+    excludes = []
+    for spec in _disabled_modules(config).values():
+        for artifact in spec.get("exclude", []):
+            pair = (artifact["group"], artifact["module"])
+            if pair not in excludes:
+                excludes.append(pair)
+    return excludes
+
+
 def _inject_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
     """Inject optional OneSignal module dependencies into app/build.gradle(.kts).
 
@@ -167,7 +223,11 @@ def _inject_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
             if maven_coord not in content:
                 dep_line = f'    implementation("{maven_coord}:{version}")'
                 content = _inject_dep_line(content, dep_line)
-                ui.modified(f"Injected: {maven_coord}:{version} into build.gradle.kts")
+                ui.modified(
+                    f"Injected: {maven_coord}:{version} into build.gradle.kts",
+                    dependency=f"{maven_coord}:{version}",
+                    file=str(app_kts),
+                )
                 modified = True
         if modified:
             app_kts.write_text(content)
@@ -178,18 +238,51 @@ def _inject_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
             if maven_coord not in content:
                 dep_line = f"    implementation '{maven_coord}:{version}'"
                 content = _inject_dep_line(content, dep_line)
-                ui.modified(f"Injected: {maven_coord}:{version} into build.gradle")
+                ui.modified(
+                    f"Injected: {maven_coord}:{version} into build.gradle",
+                    dependency=f"{maven_coord}:{version}",
+                    file=str(app_gradle),
+                )
                 modified = True
         if modified:
             app_gradle.write_text(content)
 
-    # Inject ProGuard rules to suppress R8 warnings
-    if modified:
-        _inject_proguard_rules(app_dir, location=bool(config.get("location")))
-
     return modified
 
 
+def _inject_manifest_permissions(app_dir: Path, config: dict) -> bool:
+    """Add permissions required by enabled OneSignal modules to AndroidManifest.xml.
+
+    Returns True if the manifest was modified.
+    """
+    manifest = app_dir / "src" / "main" / "AndroidManifest.xml"
+    if not manifest.exists():
+        return False
+
+    content = manifest.read_text()
+    missing = [p for p in _collect_onesignal_permissions(config) if f'"{p}"' not in content]
+    if not missing:
+        return False
+
+    lines = "".join(f'    <uses-permission android:name="{p}" />\n' for p in missing)
+
+    # Permissions go before <application>, or at the end of <manifest> if absent
+    content, count = re.subn(
+        r"^([ \t]*<application\b)", lambda m: lines + m.group(1), content, count=1, flags=re.M
+    )
+    if not count:
+        content = content.replace("</manifest>", lines + "</manifest>", 1)
+
+    manifest.write_text(content)
+    for permission in missing:
+        ui.modified(
+            f"Injected: {permission} into AndroidManifest.xml",
+            permission=permission,
+            file=str(manifest),
+        )
+    return True
+
+
 _ONESIGNAL_PROGUARD_RULES = """\
 # OneSignal SDK — suppress R8 warnings for transitive dependencies
 -dontwarn com.fasterxml.jackson.core.JsonFactory
@@ -197,18 +290,19 @@ _ONESIGNAL_PROGUARD_RULES = """\
 -dontwarn com.google.auto.value.AutoValue$CopyAnnotations
 """
 
-_ONESIGNAL_LOCATION_PROGUARD_RULES = """\
-# OneSignal Location module uses reflection on GoogleApiClient internals
--keep class com.google.android.gms.common.api.GoogleApiClient { *; }
--keep class com.google.android.gms.common.api.internal.zab* { *; }
-"""
-
 _PROGUARD_MARKER = "# OneSignal SDK"
-_PROGUARD_LOCATION_MARKER = "# OneSignal Location module"
 
 
-def _inject_proguard_rules(app_dir: Path, *, location: bool = False) -> None:
-    """Add ProGuard rules for OneSignal SDK and optional Location module."""
+def _proguard_marker(spec: dict) -> str:
+    """Return the text identifying a module's ProGuard rules in proguard-rules.pro."""
+    return spec.get("marker") or spec["proguard"].strip().splitlines()[0]
+
+
+def _inject_proguard_rules(app_dir: Path, config: Optional[dict] = None) -> bool:
+    """Add ProGuard rules for OneSignal SDK and enabled optional modules.
+
+    Returns True if the rules file was modified.
+    """
     proguard_file = app_dir / "proguard-rules.pro"
 
     if proguard_file.exists():
@@ -223,16 +317,18 @@ def _inject_proguard_rules(app_dir: Path, *, location: bool = False) -> None:
         content += "\n" + _ONESIGNAL_PROGUARD_RULES
         changed = True
 
-    # Inject Location module keep rules only when location is enabled
-    if location and _PROGUARD_LOCATION_MARKER not in content:
-        content += "\n" + _ONESIGNAL_LOCATION_PROGUARD_RULES
-        changed = True
+    # Inject module keep rules only for enabled modules
+    for spec in _enabled_modules(config or {}).values():
+        rules = spec.get("proguard")
+        if rules and _proguard_marker(spec) not in content:
+            content += "\n" + rules.strip() + "\n"
+            changed = True
 
     if not changed:
-        return
+        return False
 
     proguard_file.write_text(content.lstrip("\n"))
-    ui.modified("Injected: ProGuard rules for OneSignal SDK")
+    ui.modified("Injected: ProGuard rules for OneSignal SDK", file=str(proguard_file))
 
     # Ensure the build.gradle(.kts) references the proguard file in the release buildType
     app_kts = app_dir / "build.gradle.kts"
@@ -247,11 +343,35 @@ def _inject_proguard_rules(app_dir: Path, *, location: bool = False) -> None:
                 f"{proguard_ref}\n            signingConfig = signingConfigs",
             )
             app_kts.write_text(content)
-            ui.modified("Modified: build.gradle.kts (added proguardFiles reference)")
+            ui.modified(
+                "Modified: build.gradle.kts (added proguardFiles reference)", file=str(app_kts)
+            )
+
+    return True
+
+
+def _apply_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
+    """Apply the OneSignal configuration to the Flutter Android project in one pass.
+
+    Injects Gradle dependencies, ProGuard rules (base SDK rules are always added)
+    and manifest permissions for every enabled module, and Gradle excludes for
+    disabled modules the SDK ships by default.
+
+    Returns True if any file was modified.
+    """
+    app_dir = flutter_dir / "android" / "app"
+    if not app_dir.exists():
+        return False
+
+    modified = _inject_onesignal_modules(flutter_dir, config)
+    modified |= _inject_module_excludes(app_dir, config)
+    modified |= _inject_proguard_rules(app_dir, config)
+    modified |= _inject_manifest_permissions(app_dir, config)
+    return modified
 
 
 def _check_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
-    """Check if all enabled OneSignal modules are already in the gradle file."""
+    """Check if all enabled OneSignal modules are already applied to the Android project."""
     app_dir = flutter_dir / "android" / "app"
     if not app_dir.exists():
         return True  # Nothing to check
@@ -269,18 +389,247 @@ def _check_onesignal_modules(flutter_dir: Path, config: dict) -> bool:
         if maven_coord not in content:
             return False
 
+    if not _check_module_excludes(app_dir, config):
+        return False
+
     # Check base ProGuard rules (always required)
     proguard_file = app_dir / "proguard-rules.pro"
     if not proguard_file.exists() or _PROGUARD_MARKER not in proguard_file.read_text():
         return False
 
-    # Check location-specific ProGuard rules
-    if config.get("location") and _PROGUARD_LOCATION_MARKER not in proguard_file.read_text():
+    # Check module-specific ProGuard rules
+    proguard_content = proguard_file.read_text()
+    for spec in _enabled_modules(config).values():
+        rules = spec.get("proguard")
+        if rules and _proguard_marker(spec) not in proguard_content:
+            return False
+
+    # Check module permissions
+    manifest = app_dir / "src" / "main" / "AndroidManifest.xml"
+    if manifest.exists():
+        manifest_content = manifest.read_text()
+        for permission in _collect_onesignal_permissions(config):
+            if f'"{permission}"' not in manifest_content:
+                return False
+
+    return True
+
+
+_ABI_FILTER_BEGIN = "// fos-build: ABI filter"
+_ABI_FILTER_END = "// fos-build: end ABI filter"
+
+
+def _abi_filter_block(abis: list[str], kts: bool) -> str:
+    """Build the gradle block excluding native libraries of non-targeted ABIs."""
+    patterns = [f"lib/{name}/**" for name in abi.excluded_abis(abis)]
+    if not abis or not patterns:
+        return ""
+
+    if kts:
+        items = ", ".join(f'"{p}"' for p in patterns)
+        body = (
+            "    packaging {\n"
+            "        jniLibs {\n"
+            f"            excludes += setOf({items})\n"
+            "        }\n"
+            "    }\n"
+        )
+    else:
+        items = ", ".join(f"'{p}'" for p in patterns)
+        body = (
+            "    packagingOptions {\n"
+            "        jniLibs {\n"
+            f"            excludes += [{items}]\n"
+            "        }\n"
+            "    }\n"
+        )
+    return f"    {_ABI_FILTER_BEGIN}\n{body}    {_ABI_FILTER_END}\n"
+
+
+def _app_gradle_file(app_dir: Path) -> Optional[Path]:
+    """Return app/build.gradle.kts or app/build.gradle, whichever exists."""
+    for name in ("build.gradle.kts", "build.gradle"):
+        if (app_dir / name).exists():
+            return app_dir / name
+    return None
+
+
+def _inject_abi_filter(app_dir: Path, abis: list[str]) -> bool:
+    """Exclude native libraries of non-targeted ABIs from the packaged app.
+
+    Covers every ``lib/<abi>/*.so`` that ends up in the APK/AAB, including
+    those pulled in by OneSignal and other native dependencies. An empty
+    ``abis`` list removes a filter left by a previous build.
+
+    Returns True if the gradle file was modified.
+    """
+    gradle_file = _app_gradle_file(app_dir)
+    if not gradle_file:
+        return False
+
+    content = gradle_file.read_text()
+    block = _abi_filter_block(abis, gradle_file.suffix == ".kts")
+    if block and block in content:
+        return False
+
+    # Drop a filter written by a previous build with a different ABI selection
+    original = content
+    content = re.sub(
+        rf"[ \t]*{re.escape(_ABI_FILTER_BEGIN)}.*?{re.escape(_ABI_FILTER_END)}\n",
+        "",
+        content,
+        flags=re.DOTALL,
+    )
+
+    if block:
+        content = re.sub(
+            r"^(android\s*\{[^\n]*\n)",
+            lambda m: m.group(1) + block,
+            content,
+            count=1,
+            flags=re.MULTILINE,
+        )
+
+    if content == original:
+        return False
+
+    gradle_file.write_text(content)
+    if block:
+        excluded = ", ".join(abi.excluded_abis(abis))
+        ui.modified(
+            f"Injected: jniLibs excludes for {excluded} into {gradle_file.name}",
+            file=str(gradle_file),
+        )
+    else:
+        ui.modified(f"Removed: ABI filter from {gradle_file.name}", file=str(gradle_file))
+    return True
+
+
+def _check_abi_filter(app_dir: Path, abis: list[str]) -> bool:
+    """Check if the gradle ABI filter matches the targeted ABIs."""
+    gradle_file = _app_gradle_file(app_dir)
+    if not gradle_file:
+        return True  # Nothing to check
+
+    content = gradle_file.read_text()
+    block = _abi_filter_block(abis, gradle_file.suffix == ".kts")
+    return block in content if block else _ABI_FILTER_BEGIN not in content
+
+
+_EXCLUDES_BEGIN = "// fos-build: OneSignal module excludes"
+_EXCLUDES_END = "// fos-build: end OneSignal module excludes"
+
+
+def _module_excludes_block(excludes: list[tuple[str, str]], kts: bool) -> str:
+    """Build the gradle block excluding artifacts of disabled OneSignal modules."""
+    if not excludes:
+        return ""
+
+    if kts:
+        lines = "".join(
+            f'    exclude(group = "{group}", module = "{module}")\n' for group, module in excludes
+        )
+    else:
+        lines = "".join(
+            f"    exclude group: '{group}', module: '{module}'\n" for group, module in excludes
+        )
+    return f"{_EXCLUDES_BEGIN}\nconfigurations.all {{\n{lines}}}\n{_EXCLUDES_END}\n"
+
+
+def _inject_module_excludes(app_dir: Path, config: dict) -> bool:
+    """Exclude the artifacts of disabled OneSignal modules from every gradle configuration.
+
+    This strips modules that the OneSignal SDK pulls in by default (e.g.
+    in-app messages) from the packaged app. A block left by a previous build
+    is replaced or, when nothing is excluded any more, removed.
+
+    Returns True if the gradle file was modified.
+    """
+    gradle_file = _app_gradle_file(app_dir)
+    if not gradle_file:
+        return False
+
+    content = gradle_file.read_text()
+    excludes = _collect_onesignal_excludes(config)
+    block = _module_excludes_block(excludes, gradle_file.suffix == ".kts")
+    if block and block in content:
+        return False
+
+    original = content
+    content = re.sub(
+        rf"\n?{re.escape(_EXCLUDES_BEGIN)}.*?{re.escape(_EXCLUDES_END)}\n",
+        "",
+        content,
+        flags=re.DOTALL,
+    )
+    if block:
+        content = content.rstrip("\n") + "\n\n" + block
+
+    if content == original:
         return False
 
+    gradle_file.write_text(content)
+    for group, module in excludes:
+        ui.modified(
+            f"Excluded: {group}:{module} from {gradle_file.name}",
+            exclude=f"{group}:{module}",
+            file=str(gradle_file),
+        )
+    if not excludes:
+        ui.modified(
+            f"Removed: OneSignal module excludes from {gradle_file.name}", file=str(gradle_file)
+        )
     return True
 
 
+def _check_module_excludes(app_dir: Path, config: dict) -> bool:
+    """Check if the gradle excludes match the disabled OneSignal modules."""
+    gradle_file = _app_gradle_file(app_dir)
+    if not gradle_file:
+        return True  # Nothing to check
+
+    content = gradle_file.read_text()
+    excludes = _collect_onesignal_excludes(config)
+    block = _module_excludes_block(excludes, gradle_file.suffix == ".kts")
+    return block in content if block else _EXCLUDES_BEGIN not in content
+
+
+def _report_native_libs(build_type: str, project_root: Path, abis: list[str]) -> None:
+    """Report the native libraries per ABI in the final APK/AAB.
+
+    Warns when libraries of ABIs that were not targeted are still packaged.
+    """
+    excluded = set(abi.excluded_abis(abis))
+    for artifact in size.find_artifacts(project_root, build_type):
+        try:
+            sizes = abi.native_lib_sizes(artifact)
+        except (OSError, zipfile.BadZipFile) as e:
+            ui.warning(f"Could not analyze {artifact.name}: {e}")
+            continue
+
+        for name, nbytes in sizes.items():
+            ui.info(f"Native libraries ({name})", f"{artifact.name}: {ui.format_bytes(nbytes)}")
+        leftover = {name: nbytes for name, nbytes in sizes.items() if name in excluded}
+        if leftover:
+            names = ", ".join(sorted(leftover))
+            ui.warning(
+                f"{artifact.name} still contains {ui.format_bytes(sum(leftover.values()))} "
+                f"of native libraries for non-targeted ABIs ({names})"
+            )
+
+
+def _arch_args(args: list[str]) -> list[str]:
+    """Return the values of the ``--arch`` option in flet build arguments."""
+    if "--arch" not in args:
+        return []
+    values = []
+    for value in args[args.index("--arch") + 1 :]:
+        if value.startswith("-"):
+            break
+        values.append(value)
+    return values
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -303,10 +652,21 @@ Examples:
     fos-build web --no-wasm --no-cdn
     fos-build ipa --ios-team-id ABCDE12345
     fos-build apk --clean      Clean build directory first
+    fos-build apk --split-per-abi --abi arm64-v8a --abi armeabi-v7a
+    fos-build apk --watch      Run a full rebuild on every change to the Python sources
+    fos-build apk --output ndjson   Stream machine-readable build events (CI)
 
 Notes:
     For Android, optional OneSignal modules (e.g. location) can be enabled
-    via --location flag or [tool.flet.onesignal.android] in pyproject.toml.
+    via --<module> flags or [tool.flet.onesignal.android] in pyproject.toml,
+    and disabled for a single build with --no-<module>; modules the SDK ships
+    by default (e.g. --no-in-app-messages) are then excluded from the
+    packaged app. Modules are declared
+    in a registry that can be extended under
+    [tool.flet.onesignal.android.modules.<name>].
+    --abi (or abis = [...] in [tool.flet.onesignal.android]) keeps native
+    libraries of other ABIs out of the packaged app and reports what each
+    ABI takes in the final APK/AAB.
     All other options (including -v) are passed directly to flet build.
         """,
     )
@@ -319,19 +679,79 @@ Notes:
         "--clean", action="store_true", help="Clean build directory before building"
     )
     parser.add_argument(
-        "--location",
+        "--abi",
+        action="append",
+        choices=abi.ANDROID_ABIS,
+        help="Android ABI to ship (repeatable); native libraries for other ABIs are dropped",
+    )
+    parser.add_argument(
+        "--size-threshold",
+        type=float,
+        default=size.DEFAULT_GROWTH_THRESHOLD,
+        metavar="PERCENT",
+        help="Warn when an artifact component grows more than PERCENT since the last build",
+    )
+    parser.add_argument(
+        "--no-size-report",
+        dest="size_threshold",
+        action="store_const",
+        const=None,
+        help="Skip the artifact size breakdown after apk/aab/ipa builds",
+    )
+    parser.add_argument(
+        "--output",
+        choices=ui.OUTPUT_FORMATS,
+        default="text",
+        help="Output format: text (default), json (one document at exit) or "
+        "ndjson (events streamed during the build; the only machine-readable "
+        "format allowed with --watch)",
+    )
+    parser.add_argument(
+        "--watch",
         action="store_true",
-        help="Enable OneSignal Location module (injects gradle dependencies)",
+        help="Run a full flet build again when Python sources or pyproject.toml change "
+        "(requires watchdog)",
     )
 
+    # Find project root (module flags depend on the project's registry overrides)
+    project_root = find_project_root()
+    onesignal_config = _get_onesignal_config(project_root)
+    registry = _load_module_registry(onesignal_config.get("modules"))
+
+    for name, spec in registry.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            dest=name,
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help=spec.get("description", f"Enable OneSignal {name} module"),
+        )
+
     args, extra = parser.parse_known_args()
+    if args.watch and args.output == "json":
+        # json prints one document at exit; rebuild results would only show on Ctrl+C
+        parser.error("--watch cannot be combined with --output json; use --output ndjson")
+    ui.set_output(args.output)
+    onesignal_config = _merge_module_flags(args, registry, onesignal_config)
+
+    # Targeted ABIs (--abi or pyproject.toml) are forwarded as flet's own --arch,
+    # so flet installs Python wheels only for them
+    abis = args.abi or onesignal_config.get("abis")
+    if abis and not _arch_args(extra) and args.build_type in ANDROID_PLATFORMS:
+        extra += ["--arch", *abis]
 
     ui.header()
-
-    # Find project root
-    project_root = find_project_root()
     ui.info("Project root", str(project_root))
 
+    # Fail fast instead of after a full build
+    if args.watch and importlib.util.find_spec("watchdog") is None:
+        ui.error_panel(
+            "watchdog is not installed",
+            "  Watch mode requires the 'cli' extra:\n  pip install flet-onesignal[cli]",
+        )
+        ui.finish(1)
+        sys.exit(1)
+
     # Clean if requested
     if args.clean:
         build_dir = project_root / "build"
@@ -343,101 +763,168 @@ Notes:
     cmd = ["flet", "build", args.build_type] + extra
 
     if args.build_type in ANDROID_PLATFORMS:
-        _build_android(args, cmd, project_root)
+        returncode = _build_android(args, cmd, project_root, onesignal_config)
+    else:
+        returncode = _build_non_android(args, cmd, project_root)
+
+    if args.watch:
+        _watch(args, cmd, project_root, registry)
+
+    ui.finish(returncode)
+    sys.exit(returncode)
+
+
+def _merge_module_flags(args: argparse.Namespace, registry: dict, config: dict) -> dict:
+    """Merge --<module>/--no-<module> CLI flags over the pyproject.toml config."""
+    config = dict(config)
+    for name in registry:
+        enabled = getattr(args, name, None)
+        if enabled is not None:
+            config[name] = enabled
+    return config
+
+
+def _run_flet_build(args: argparse.Namespace, cmd: list[str], project_root: Path) -> int:
+    """Run flet build and report the outcome. Returns the process exit code."""
+    result = subprocess.run(cmd, cwd=project_root, stdout=ui.subprocess_stdout())
+
+    if result.returncode == 0:
+        _handle_success(args.build_type, project_root, args.size_threshold)
+        abis = _arch_args(cmd)
+        if abis and args.build_type in ANDROID_PLATFORMS:
+            _report_native_libs(args.build_type, project_root, abis)
     else:
-        _build_non_android(args, cmd, project_root)
+        ui.failure_panel(FAILURE_TIPS)
+
+    return result.returncode
 
 
 def _build_android(
     args: argparse.Namespace,
     cmd: list[str],
     project_root: Path,
-) -> None:
-    """Build Android APK/AAB, injecting optional OneSignal modules if enabled."""
-    # Merge config: pyproject.toml + CLI flags
-    onesignal_config = _get_onesignal_config(project_root)
-    if args.location:
-        onesignal_config["location"] = True
+    onesignal_config: dict,
+) -> int:
+    """Build Android APK/AAB, applying enabled OneSignal modules.
 
+    Returns the exit code of the build.
+    """
     flutter_dir = project_root / "build" / "flutter"
     android_dir = flutter_dir / "android"
     app_dir = android_dir / "app"
-    has_optional_modules = bool(_collect_onesignal_deps(onesignal_config))
-    location_enabled = bool(onesignal_config.get("location"))
-
-    # Check if everything is already configured (ProGuard + optional modules)
-    if android_dir.exists() and _check_onesignal_modules(flutter_dir, onesignal_config):
-        # Also check that base ProGuard rules are present
-        proguard_file = app_dir / "proguard-rules.pro"
-        proguard_ok = proguard_file.exists() and _PROGUARD_MARKER in proguard_file.read_text()
-
-        if proguard_ok:
-            ui.build_info(f"Building {args.build_type.upper()} (OneSignal already configured)...")
-            result = subprocess.run(cmd, cwd=project_root)
-
-            if result.returncode == 0:
-                _handle_success(args.build_type, project_root)
-            else:
-                ui.failure_panel(FAILURE_TIPS)
-
-            sys.exit(result.returncode)
+    # Modules on by default that add nothing to the project are not worth listing
+    enabled_modules = [
+        name
+        for name, spec in _enabled_modules(onesignal_config).items()
+        if spec.get("dependencies") or spec.get("proguard") or spec.get("permissions")
+    ]
+    excluded = [f"{g}:{m}" for g, m in _collect_onesignal_excludes(onesignal_config)]
+    abis = _arch_args(cmd)
+
+    # Check if everything is already configured (ProGuard, optional modules, ABIs)
+    if (
+        android_dir.exists()
+        and _check_onesignal_modules(flutter_dir, onesignal_config)
+        and _check_abi_filter(app_dir, abis)
+    ):
+        ui.build_info(f"Building {args.build_type.upper()} (OneSignal already configured)...")
+        return _run_flet_build(args, cmd, project_root)
 
     # First pass: create Flutter project so we can inject into gradle files
-    if has_optional_modules:
+    if enabled_modules:
         ui.build_info(f"Building {args.build_type.upper()} with OneSignal modules...")
     else:
         ui.build_info(f"Building {args.build_type.upper()}...")
     ui.step(1, "Creating Flutter project...")
 
-    result = subprocess.run(cmd, cwd=project_root)
+    subprocess.run(cmd, cwd=project_root, stdout=ui.subprocess_stdout())
 
     if not android_dir.exists():
         ui.error_panel(
             "Flutter project not created",
             "  The Flutter project was not created. Check errors above.",
         )
-        sys.exit(1)
-
-    # Inject optional module dependencies (location, etc.)
-    if has_optional_modules:
-        ui.step(2, "Injecting OneSignal module dependencies...")
-        _inject_onesignal_modules(flutter_dir, onesignal_config)
+        return 1
 
-    # Always inject base ProGuard rules for OneSignal SDK
-    _inject_proguard_rules(app_dir, location=location_enabled)
+    step = 2
 
-    ui.step(3 if has_optional_modules else 2, "Rebuilding with OneSignal configuration...")
+    # Apply base ProGuard rules and all enabled modules (deps, rules, permissions)
+    if enabled_modules:
+        ui.step(step, f"Applying OneSignal modules: {', '.join(enabled_modules)}...")
+        step += 1
+    if excluded:
+        ui.step(step, f"Stripping disabled OneSignal modules: {', '.join(excluded)}...")
+        step += 1
+    _apply_onesignal_modules(flutter_dir, onesignal_config)
 
-    result = subprocess.run(cmd, cwd=project_root)
+    # Keep native libraries of other ABIs out of the package (flet build --arch
+    # already limits the Python wheels to the targeted ABIs)
+    if abis:
+        ui.step(step, f"Restricting native libraries to {', '.join(abis)}...")
+        step += 1
+    _inject_abi_filter(app_dir, abis)
 
-    if result.returncode == 0:
-        _handle_success(args.build_type, project_root)
-    else:
-        ui.failure_panel(FAILURE_TIPS)
+    ui.step(step, "Rebuilding with OneSignal configuration...")
 
-    sys.exit(result.returncode)
+    return _run_flet_build(args, cmd, project_root)
 
 
 def _build_non_android(
     args: argparse.Namespace,
     cmd: list[str],
     project_root: Path,
-) -> None:
-    """Build for non-Android platforms (ipa, web, macos, linux, windows)."""
+) -> int:
+    """Build for non-Android platforms (ipa, web, macos, linux, windows).
+
+    Returns the exit code of the build.
+    """
     ui.build_info(f"Building {args.build_type.upper()}...")
+    return _run_flet_build(args, cmd, project_root)
 
-    result = subprocess.run(cmd, cwd=project_root)
 
-    if result.returncode == 0:
-        _handle_success(args.build_type, project_root)
-    else:
-        ui.failure_panel(FAILURE_TIPS)
+def _watch(
+    args: argparse.Namespace,
+    cmd: list[str],
+    project_root: Path,
+    registry: dict,
+) -> None:
+    """Rebuild on every change, redoing the OneSignal configuration only when needed.
+
+    Each rebuild runs the full ``flet build`` (Flutter and Gradle included);
+    only the OneSignal configuration pass is skipped for Python-only edits.
+    """
+    from flet_onesignal.watch import needs_reconfigure, watch_project
+
+    def rebuild(changed: set[Path]) -> None:
+        names = sorted(str(p.relative_to(project_root)) for p in changed)
+        ui.info("Changed", ", ".join(names))
 
-    sys.exit(result.returncode)
+        if args.build_type in ANDROID_PLATFORMS and needs_reconfigure(changed, project_root):
+            config = _merge_module_flags(args, registry, _get_onesignal_config(project_root))
+            returncode = _build_android(args, cmd, project_root, config)
+        else:
+            # Python-only edit: the OneSignal configuration is unchanged, so a
+            # single flet build pass is enough
+            ui.build_info(f"Rebuilding {args.build_type.upper()}...")
+            returncode = _run_flet_build(args, cmd, project_root)
+        ui.rebuild(returncode, names)
 
+        ui.info("Watching", f"{project_root} (Ctrl+C to stop)")
 
-def _handle_success(build_type: str, project_root: Path):
-    """Handle successful build output."""
+    ui.info("Watching", f"{project_root} (Ctrl+C to stop)")
+    watch_project(project_root, rebuild)
+
+
+def _handle_success(
+    build_type: str,
+    project_root: Path,
+    size_threshold: Optional[float] = size.DEFAULT_GROWTH_THRESHOLD,
+):
+    """Handle successful build output.
+
+    For archive targets (apk/aab/ipa) a size breakdown is printed unless
+    ``size_threshold`` is None.
+    """
     output_dir = project_root / "build" / build_type
     ui.success_panel(
         build_type,
@@ -445,6 +932,30 @@ def _handle_success(build_type: str, project_root: Path):
         NEXT_STEPS.get(build_type, []),
     )
 
+    for artifact in size.find_artifacts(project_root, build_type):
+        ui.artifact(str(artifact), artifact.stat().st_size)
+
+    if build_type in ARCHIVE_PLATFORMS and size_threshold is not None:
+        _report_sizes(build_type, project_root, size_threshold)
+
+
+def _report_sizes(build_type: str, project_root: Path, threshold: float) -> None:
+    """Print the size breakdown of each artifact and warn about components that grew."""
+    for artifact in size.find_artifacts(project_root, build_type):
+        try:
+            components = size.compare_with_previous(project_root, artifact)
+        except (OSError, zipfile.BadZipFile) as e:
+            ui.warning(f"Could not analyze {artifact.name}: {e}")
+            continue
+
+        ui.size_report(artifact.name, components, threshold)
+        for c in components:
+            if c.grew_over(threshold):
+                ui.warning(
+                    f"{c.name} grew by {c.delta:,} bytes in {artifact.name} "
+                    f"(threshold: {threshold:g}%)"
+                )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,553 @@
+"""
+Local OneSignal REST API emulator for flet-onesignal.
+
+An asyncio HTTP/1.1 server (keep-alive, stdlib only) implementing the subset
+of the OneSignal REST API used by `flet_onesignal.rest`: notifications,
+users, aliases (identity), tags (user properties) and subscriptions. State
+lives in memory.
+
+For load testing it can add latency, enforce a rate limit (429 with
+``Retry-After``), inject server errors, and it records every request.
+
+Example:
+    ```python
+    from flet_onesignal.emulator import OneSignalEmulator
+    from flet_onesignal.rest import OneSignalClient
+
+    async with OneSignalEmulator(latency=0.02, rate_limit=100) as emulator:
+        async with OneSignalClient("app", "key", base_url=emulator.url) as client:
+            await client.send_push("Hi", include_aliases={"external_id": ["u1"]})
+        print(len(emulator.requests))
+    ```
+
+Usage:
+    python -m flet_onesignal emulator --port 8080 --latency 0.05 --rate-limit 100
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from flet_onesignal.rest import MAX_ALIASES_PER_REQUEST, TokenBucket
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+_USER_PATH = r"/apps/(?P<app>[^/]+)/users/by/(?P<label>[^/]+)/(?P<id>[^/]+)"
+_SUBSCRIPTION_PATH = r"/apps/(?P<app>[^/]+)/subscriptions/(?P<sub>[^/]+)"
+
+
+@dataclass
+class RecordedRequest:
+    """A request received by the emulator."""
+
+    time: float
+    """Unix timestamp when the request arrived."""
+
+    method: str
+    path: str
+    query: dict[str, str]
+    body: Any
+    status: int
+    """Status the emulator answered with."""
+
+    duration: float
+    """Seconds spent answering, including simulated latency."""
+
+
+@dataclass
+class _User:
+    onesignal_id: str
+    identity: dict[str, str]
+    properties: dict[str, Any] = field(default_factory=dict)
+    subscriptions: list[str] = field(default_factory=list)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, errors: Any):
+        self.status = status
+        self.errors = errors
+
+
+class OneSignalEmulator:
+    """
+    In-memory OneSignal REST API server.
+
+    Args:
+        app_id: Only accept requests for this app (any app if None).
+        api_key: Only accept ``Authorization: Key <api_key>`` (any key if None).
+        latency: Seconds added to every response.
+        jitter: Random extra latency, up to this many seconds.
+        rate_limit: Requests per second before answering 429 (unlimited if None).
+        burst: Requests allowed in a burst (defaults to ``rate_limit``).
+        error_rate: Fraction of requests answered with ``error_status``.
+        error_status: Status used for injected errors.
+        seed: Seed for jitter and error injection, for reproducible runs.
+        record_path: Also append every request as NDJSON to this file.
+    """
+
+    def __init__(
+        self,
+        *,
+        app_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = None,
+        record_path: Optional[Path] = None,
+    ):
+        self.app_id = app_id
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.record_path = record_path
+        self._bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._record_file = None
+        self.url = ""
+
+        self.requests: list[RecordedRequest] = []
+        self.notifications: dict[str, dict] = {}
+        self.users: dict[str, _User] = {}
+        self.subscriptions: dict[str, dict] = {}
+        self._aliases: dict[tuple[str, str], str] = {}
+        self._idempotency: dict[str, str] = {}
+
+        self._routes = [
+            ("POST", r"/notifications", self._create_notification),
+            ("GET", r"/notifications/(?P<nid>[^/]+)", self._get_notification),
+            ("DELETE", r"/notifications/(?P<nid>[^/]+)", self._cancel_notification),
+            ("POST", r"/apps/(?P<app>[^/]+)/users", self._create_user),
+            ("GET", _USER_PATH, self._get_user),
+            ("PATCH", _USER_PATH, self._update_user),
+            ("DELETE", _USER_PATH, self._delete_user),
+            ("GET", _USER_PATH + "/identity", self._get_identity),
+            ("PATCH", _USER_PATH + "/identity", self._add_identity),
+            ("DELETE", _USER_PATH + r"/identity/(?P<alias>[^/]+)", self._delete_identity),
+            ("POST", _USER_PATH + "/subscriptions", self._create_subscription),
+            ("PATCH", _SUBSCRIPTION_PATH, self._update_subscription),
+            ("DELETE", _SUBSCRIPTION_PATH, self._delete_subscription),
+            ("PATCH", _SUBSCRIPTION_PATH + "/owner", self._transfer_subscription),
+        ]
+        self._routes = [(m, re.compile(f"^{p}$"), h) for m, p, h in self._routes]
+
+    # -------------------------------------------------------------------------
+    # Server lifecycle
+    # -------------------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the base URL."""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        bound = self._server.sockets[0].getsockname()
+        self.url = f"http://{bound[0]}:{bound[1]}"
+        if self.record_path:
+            self._record_file = open(self.record_path, "a", encoding="utf-8")
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._record_file:
+            self._record_file.close()
+            self._record_file = None
+
+    async def __aenter__(self) -> "OneSignalEmulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def serve_forever(self) -> None:
+        """Block serving requests (call `start` first)."""
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    # -------------------------------------------------------------------------
+    # HTTP
+    # -------------------------------------------------------------------------
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                status, payload, extra = await self._respond(method, target, headers, raw)
+
+                data = b"" if payload is None else json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+                head.append("Content-Type: application/json")
+                head.append(f"Content-Length: {len(data)}")
+                head.extend(f"{name}: {value}" for name, value in extra.items())
+                writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + data)
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, method: str, target: str, headers: dict[str, str], raw: bytes
+    ) -> tuple[int, Any, dict[str, str]]:
+        """Answer one request and record it."""
+        started = time.monotonic()
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        invalid_json = False
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body, invalid_json = raw.decode("utf-8", "replace"), True
+
+        extra: dict[str, str] = {}
+        try:
+            if self._bucket and (wait := self._bucket.try_acquire()) > 0:
+                extra["Retry-After"] = f"{wait:.3f}"
+                raise _HTTPError(429, ["API rate limit exceeded"])
+
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                await asyncio.sleep(delay)
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise _HTTPError(self.error_status, ["Injected error"])
+
+            key = headers.get("authorization", "")
+            if self.api_key is not None and key != f"Key {self.api_key}":
+                raise _HTTPError(403, ["Access denied. Invalid REST API key."])
+            if invalid_json:
+                raise _HTTPError(400, ["Invalid JSON body"])
+            if body is not None and not isinstance(body, dict):
+                raise _HTTPError(400, ["Request body must be a JSON object"])
+
+            status, payload = self._dispatch(method, url.path, query, body or {})
+        except _HTTPError as e:
+            status, payload = e.status, {"errors": e.errors}
+        except Exception as e:
+            # A handler bug must still answer, or the client sees a dropped connection
+            status, payload = 500, {"errors": [f"Internal error: {type(e).__name__}: {e}"]}
+
+        record = RecordedRequest(
+            time=time.time(),
+            method=method,
+            path=url.path,
+            query=query,
+            body=body,
+            status=status,
+            duration=time.monotonic() - started,
+        )
+        self.requests.append(record)
+        if self._record_file:
+            self._record_file.write(json.dumps(asdict(record)) + "\n")
+            self._record_file.flush()
+
+        return status, payload, extra
+
+    def _dispatch(self, method: str, path: str, query: dict, body: dict) -> tuple[int, Any]:
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            params = {k: unquote(v) for k, v in match.groupdict().items()}
+            if "app" in params:
+                self._check_app(params.pop("app"))
+            return handler(query=query, body=body, **params)
+
+        if path_matched:
+            raise _HTTPError(405, [f"Method {method} not allowed"])
+        raise _HTTPError(404, [f"Unknown endpoint {path}"])
+
+    def _check_app(self, app_id: Optional[str]) -> None:
+        if self.app_id is not None and app_id != self.app_id:
+            raise _HTTPError(400, [f"App {app_id} not found"])
+
+    # -------------------------------------------------------------------------
+    # Notifications
+    # -------------------------------------------------------------------------
+
+    def _create_notification(self, query: dict, body: dict) -> tuple[int, Any]:
+        self._check_app(body.get("app_id"))
+        if not body.get("contents") and not body.get("template_id"):
+            raise _HTTPError(400, ["Message Notifications must have English language content"])
+
+        key = body.get("idempotency_key")
+        if key and key in self._idempotency:
+            return 200, {"id": self._idempotency[key], "external_id": None}
+
+        aliases = body.get("include_aliases") or {}
+        if sum(len(ids) for ids in aliases.values()) > MAX_ALIASES_PER_REQUEST:
+            raise _HTTPError(
+                400, [f"include_aliases is limited to {MAX_ALIASES_PER_REQUEST} entries"]
+            )
+
+        invalid = {
+            label: [i for i in ids if self._find_user(label, str(i)) is None]
+            for label, ids in aliases.items()
+        }
+        invalid = {label: ids for label, ids in invalid.items() if ids}
+        recipients = sum(len(ids) for ids in aliases.values()) - sum(map(len, invalid.values()))
+
+        notification_id = str(uuid.uuid4())
+        self.notifications[notification_id] = {
+            "id": notification_id,
+            "successful": recipients,
+            "canceled": False,
+            **body,
+        }
+        if key:
+            self._idempotency[key] = notification_id
+
+        response: dict[str, Any] = {"id": notification_id, "external_id": None}
+        if invalid:
+            response["errors"] = {"invalid_aliases": invalid}
+        return 200, response
+
+    def _notification(self, nid: str) -> dict:
+        notification = self.notifications.get(nid)
+        if notification is None:
+            raise _HTTPError(404, ["Notification not found"])
+        return notification
+
+    def _get_notification(self, query: dict, body: dict, nid: str) -> tuple[int, Any]:
+        self._check_app(query.get("app_id"))
+        return 200, self._notification(nid)
+
+    def _cancel_notification(self, query: dict, body: dict, nid: str) -> tuple[int, Any]:
+        self._check_app(query.get("app_id"))
+        self._notification(nid)["canceled"] = True
+        return 200, {"success": True}
+
+    # -------------------------------------------------------------------------
+    # Users and aliases
+    # -------------------------------------------------------------------------
+
+    def _find_user(self, label: str, alias_id: str) -> Optional[_User]:
+        onesignal_id = alias_id if label == "onesignal_id" else self._aliases.get((label, alias_id))
+        return self.users.get(onesignal_id or "")
+
+    def _user(self, label: str, alias_id: str) -> _User:
+        user = self._find_user(label, alias_id)
+        if user is None:
+            raise _HTTPError(404, ["User not found"])
+        return user
+
+    def _user_view(self, user: _User) -> dict:
+        return {
+            "identity": {**user.identity, "onesignal_id": user.onesignal_id},
+            "properties": user.properties,
+            "subscriptions": [self.subscriptions[s] for s in user.subscriptions],
+        }
+
+    def _claim_aliases(self, user: _User, aliases: dict[str, str]) -> None:
+        for label, alias_id in aliases.items():
+            owner = self._aliases.get((label, str(alias_id)))
+            if owner is not None and owner != user.onesignal_id:
+                raise _HTTPError(409, [f"Alias {label}={alias_id} belongs to another user"])
+        for label, alias_id in aliases.items():
+            previous = user.identity.get(label)
+            if previous is not None:
+                self._aliases.pop((label, previous), None)
+            user.identity[label] = str(alias_id)
+            self._aliases[(label, str(alias_id))] = user.onesignal_id
+
+    def _add_subscription(self, user: _User, subscription: dict) -> dict:
+        stored = {"id": str(uuid.uuid4()), "enabled": True, **subscription}
+        self.subscriptions[stored["id"]] = stored
+        user.subscriptions.append(stored["id"])
+        return stored
+
+    def _create_user(self, query: dict, body: dict) -> tuple[int, Any]:
+        identity = {k: str(v) for k, v in (body.get("identity") or {}).items()}
+        for label, alias_id in identity.items():
+            existing = self._aliases.get((label, alias_id))
+            if existing:
+                return 200, self._user_view(self.users[existing])
+
+        user = _User(onesignal_id=str(uuid.uuid4()), identity={})
+        self.users[user.onesignal_id] = user
+        self._claim_aliases(user, identity)
+        self._update_properties(user, body.get("properties") or {})
+        for subscription in body.get("subscriptions") or []:
+            self._add_subscription(user, subscription)
+        return 201, self._user_view(user)
+
+    def _get_user(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        return 200, self._user_view(self._user(label, id))
+
+    @staticmethod
+    def _update_properties(user: _User, properties: dict) -> None:
+        properties = dict(properties)
+        tags = properties.pop("tags", None)
+        user.properties.update(properties)
+        if tags:
+            merged = {**user.properties.get("tags", {}), **tags}
+            # An empty value deletes the tag, as in the OneSignal API
+            user.properties["tags"] = {k: str(v) for k, v in merged.items() if v not in ("", None)}
+
+    def _update_user(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        user = self._user(label, id)
+        self._update_properties(user, body.get("properties") or {})
+        return 202, {"properties": user.properties}
+
+    def _delete_user(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        user = self._user(label, id)
+        for alias in user.identity.items():
+            self._aliases.pop(alias, None)
+        for subscription_id in user.subscriptions:
+            self.subscriptions.pop(subscription_id, None)
+        del self.users[user.onesignal_id]
+        return 200, None
+
+    def _get_identity(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        user = self._user(label, id)
+        return 200, {"identity": {**user.identity, "onesignal_id": user.onesignal_id}}
+
+    def _add_identity(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        user = self._user(label, id)
+        self._claim_aliases(user, body.get("identity") or {})
+        return 200, {"identity": {**user.identity, "onesignal_id": user.onesignal_id}}
+
+    def _delete_identity(
+        self, query: dict, body: dict, label: str, id: str, alias: str
+    ) -> tuple[int, Any]:
+        user = self._user(label, id)
+        alias_id = user.identity.pop(alias, None)
+        if alias_id is None:
+            raise _HTTPError(404, [f"Alias {alias} not found"])
+        self._aliases.pop((alias, alias_id), None)
+        return 200, {"identity": {**user.identity, "onesignal_id": user.onesignal_id}}
+
+    # -------------------------------------------------------------------------
+    # Subscriptions
+    # -------------------------------------------------------------------------
+
+    def _subscription(self, sub: str) -> dict:
+        subscription = self.subscriptions.get(sub)
+        if subscription is None:
+            raise _HTTPError(404, ["Subscription not found"])
+        return subscription
+
+    def _owner(self, sub: str) -> _User:
+        return next(u for u in self.users.values() if sub in u.subscriptions)
+
+    def _create_subscription(self, query: dict, body: dict, label: str, id: str) -> tuple[int, Any]:
+        user = self._user(label, id)
+        return 201, {"subscription": self._add_subscription(user, body.get("subscription") or {})}
+
+    def _update_subscription(self, query: dict, body: dict, sub: str) -> tuple[int, Any]:
+        subscription = self._subscription(sub)
+        subscription.update(body.get("subscription") or {})
+        subscription["id"] = sub
+        return 200, {"subscription": subscription}
+
+    def _delete_subscription(self, query: dict, body: dict, sub: str) -> tuple[int, Any]:
+        self._subscription(sub)
+        self._owner(sub).subscriptions.remove(sub)
+        del self.subscriptions[sub]
+        return 202, None
+
+    def _transfer_subscription(self, query: dict, body: dict, sub: str) -> tuple[int, Any]:
+        self._subscription(sub)
+        identity = body.get("identity") or {}
+        if len(identity) != 1:
+            raise _HTTPError(400, ["identity must contain exactly one alias"])
+        ((label, alias_id),) = identity.items()
+        target = self._user(label, str(alias_id))
+        self._owner(sub).subscriptions.remove(sub)
+        target.subscriptions.append(sub)
+        return 200, {"identity": {**target.identity, "onesignal_id": target.onesignal_id}}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Command line entry point (``python -m flet_onesignal emulator``)."""
+    parser = argparse.ArgumentParser(
+        prog="python -m flet_onesignal emulator",
+        description="Run a local OneSignal REST API emulator",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--app-id", help="Only accept this app ID")
+    parser.add_argument("--api-key", help="Only accept this REST API key")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency (s)")
+    parser.add_argument("--rate-limit", type=float, help="Requests/s before answering 429")
+    parser.add_argument("--burst", type=float, help="Burst size for --rate-limit")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 5xx answers")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, help="Seed for jitter and error injection")
+    parser.add_argument("--record", type=Path, help="Append every request to this NDJSON file")
+    args = parser.parse_args(argv)
+
+    emulator = OneSignalEmulator(
+        app_id=args.app_id,
+        api_key=args.api_key,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        record_path=args.record,
+    )
+
+    async def run() -> None:
+        url = await emulator.start(args.host, args.port)
+        print(f"OneSignal emulator listening on {url}", flush=True)
+        try:
+            await emulator.serve_forever()
+        finally:
+            await emulator.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"Stopped after {len(emulator.requests)} requests")
@@ -0,0 +1,414 @@
+"""
+Bulk user import for flet-onesignal.
+
+Streams user records from a CSV or NDJSON file into OneSignal through
+`flet_onesignal.rest.OneSignalClient`. Records are read lazily into a bounded
+queue (the reader waits while workers are busy), each user's operations run
+in order while up to ``concurrency`` users are imported at once, and progress
+is checkpointed to disk so an interrupted import resumes where it stopped.
+
+Record format (CSV columns or NDJSON keys):
+
+    external_id     Required. The user's external ID.
+    language        Optional language code.
+    email, sms      Optional email address / phone number subscriptions.
+    tag:<key>       Tag values (NDJSON may use a "tags" object instead).
+    alias:<label>   Extra aliases (NDJSON may use an "aliases" object instead).
+    subscriptions   NDJSON only: list of raw subscription objects.
+
+Usage:
+    python -m flet_onesignal import users.csv --app-id APP_ID --rest-api-key KEY
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from flet_onesignal.rest import RETRY_STATUSES, OneSignalAPIError, OneSignalClient, TokenBucket
+
+PROGRESS_INTERVAL = 5.0
+"""Seconds between progress reports."""
+
+CHECKPOINT_EVERY = 100
+"""Completed records between checkpoint writes."""
+
+
+@dataclass
+class UserRecord:
+    """One user to import."""
+
+    external_id: str
+    aliases: dict[str, str] = field(default_factory=dict)
+    tags: dict[str, str] = field(default_factory=dict)
+    language: Optional[str] = None
+    subscriptions: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "UserRecord":
+        """Build a record from a CSV row or NDJSON object.
+
+        Raises:
+            ValueError: If ``external_id`` is missing.
+        """
+        external_id = str(data.get("external_id") or "").strip()
+        if not external_id:
+            raise ValueError("missing external_id")
+
+        aliases = {k: str(v) for k, v in (data.get("aliases") or {}).items()}
+        tags = {k: str(v) for k, v in (data.get("tags") or {}).items()}
+        for key, value in data.items():
+            if value in (None, ""):
+                continue
+            if key.startswith("tag:"):
+                tags[key[4:]] = str(value)
+            elif key.startswith("alias:"):
+                aliases[key[6:]] = str(value)
+
+        subscriptions = list(data.get("subscriptions") or [])
+        if data.get("email"):
+            subscriptions.append({"type": "Email", "token": str(data["email"])})
+        if data.get("sms"):
+            subscriptions.append({"type": "SMS", "token": str(data["sms"])})
+
+        return cls(
+            external_id=external_id,
+            aliases=aliases,
+            tags=tags,
+            language=data.get("language") or None,
+            subscriptions=subscriptions,
+        )
+
+
+def read_records(path: Path) -> Iterator[tuple[int, UserRecord | ValueError]]:
+    """Lazily yield ``(index, record)`` from a CSV or NDJSON file.
+
+    Invalid rows are yielded as a ``ValueError`` in place of the record so
+    they can be reported without stopping the import.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                try:
+                    yield index, UserRecord.from_dict(row)
+                except ValueError as e:
+                    yield index, e
+            return
+
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield index, UserRecord.from_dict(json.loads(line))
+            except (ValueError, AttributeError) as e:
+                yield index, ValueError(str(e))
+            index += 1
+
+
+async def apply_user(
+    client: OneSignalClient,
+    record: UserRecord,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> int:
+    """
+    Create or update one user, in order.
+
+    Creating a user whose ``external_id`` already exists returns the existing
+    user without changing it, so aliases and properties are applied with
+    separate calls that work for both new and existing users.
+
+    Returns:
+        The number of requests made.
+    """
+    calls: list[tuple[Callable, tuple]] = [
+        (
+            client.create_user,
+            ({"external_id": record.external_id}, None, record.subscriptions or None),
+        )
+    ]
+    if record.aliases:
+        calls.append((client.add_aliases, ("external_id", record.external_id, record.aliases)))
+
+    properties: dict[str, Any] = {}
+    if record.tags:
+        properties["tags"] = record.tags
+    if record.language:
+        properties["language"] = record.language
+    if properties:
+        calls.append((client.update_user, ("external_id", record.external_id, properties)))
+
+    for call, args in calls:
+        if rate_limiter:
+            await rate_limiter.acquire()
+        await call(*args)
+    return len(calls)
+
+
+@dataclass
+class ImportStats:
+    """Running totals of an import."""
+
+    read: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    """Records already completed by a previous run (from the checkpoint)."""
+
+    requests: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the import started."""
+        return time.monotonic() - self.started
+
+    @property
+    def users_per_second(self) -> float:
+        """Users processed (succeeded or failed) per second."""
+        elapsed = self.elapsed
+        return (self.succeeded + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of processed users that failed."""
+        processed = self.succeeded + self.failed
+        return self.failed / processed if processed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.succeeded} imported, {self.failed} failed, {self.skipped} skipped · "
+            f"{self.users_per_second:.1f} users/s · {self.error_rate:.1%} errors · "
+            f"{self.requests} requests in {self.elapsed:.1f}s"
+        )
+
+
+class Checkpoint:
+    """
+    Import progress persisted to a JSON file.
+
+    Records complete out of order, so the checkpoint stores a watermark (every
+    record below it is done) plus the done records above it.
+    """
+
+    def __init__(self, path: Optional[Path], source: Path):
+        self.path = path
+        self.source = str(source.resolve())
+        self.watermark = 0
+        self.done: set[int] = set()
+
+    def load(self) -> "Checkpoint":
+        """Load a previous run's progress for the same source file, if any."""
+        if self.path is None or not self.path.exists():
+            return self
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return self
+        if data.get("source") == self.source:
+            self.watermark = int(data.get("watermark", 0))
+            self.done = set(data.get("done", []))
+        return self
+
+    def is_done(self, index: int) -> bool:
+        """Check if a record was completed by this or a previous run."""
+        return index < self.watermark or index in self.done
+
+    def mark(self, index: int) -> None:
+        """Mark a record as completed."""
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"source": self.source, "watermark": self.watermark, "done": sorted(self.done)}
+            )
+        )
+        os.replace(tmp, self.path)
+
+
+def _is_transient(error: OneSignalAPIError) -> bool:
+    """Whether a failed record may succeed if imported again (no response, 429 or 5xx)."""
+    return error.status == 0 or error.status in RETRY_STATUSES
+
+
+async def import_users(
+    client: OneSignalClient,
+    path: Path,
+    *,
+    concurrency: int = 8,
+    checkpoint_path: Optional[Path] = None,
+    failures_path: Optional[Path] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    progress: Optional[Callable[[ImportStats], None]] = None,
+    progress_interval: float = PROGRESS_INTERVAL,
+) -> ImportStats:
+    """
+    Import users from a CSV or NDJSON file.
+
+    Args:
+        client: REST client to use.
+        path: ``.csv`` file, or NDJSON (one JSON object per line) for any other suffix.
+        concurrency: Users imported at the same time.
+        checkpoint_path: Progress file; records it marks as done are skipped.
+            Successful and permanently invalid records are marked; records that
+            failed with no response, 429 or 5xx are not, so a resumed import
+            retries them.
+        failures_path: NDJSON file that failed records are appended to (``retry``
+            tells whether a resumed import will try the record again).
+        rate_limiter: Bucket paced per request.
+        progress: Called with the running `ImportStats` every ``progress_interval``
+            seconds and once at the end.
+        progress_interval: Seconds between ``progress`` calls.
+
+    Returns:
+        The final statistics.
+    """
+    stats = ImportStats()
+    checkpoint = Checkpoint(checkpoint_path, path).load()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    failures = open(failures_path, "a", encoding="utf-8") if failures_path else None
+    completed = 0
+    requests_before = client.requests_sent
+
+    def fail(index: int, record: Any, error: Exception) -> None:
+        stats.failed += 1
+        if failures:
+            failures.write(
+                json.dumps(
+                    {
+                        "index": index,
+                        "external_id": getattr(record, "external_id", None),
+                        "status": getattr(error, "status", None),
+                        "retry": isinstance(error, OneSignalAPIError) and _is_transient(error),
+                        "error": str(error),
+                    }
+                )
+                + "\n"
+            )
+            failures.flush()
+
+    async def produce() -> None:
+        for index, record in read_records(path):
+            stats.read += 1
+            if checkpoint.is_done(index):
+                stats.skipped += 1
+                continue
+            # Blocks while the queue is full: backpressure on the reader
+            await queue.put((index, record))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        nonlocal completed
+        while (job := await queue.get()) is not None:
+            index, record = job
+            transient = False
+            if isinstance(record, ValueError):
+                fail(index, None, record)
+            else:
+                try:
+                    await apply_user(client, record, rate_limiter)
+                    stats.succeeded += 1
+                except OneSignalAPIError as e:
+                    fail(index, record, e)
+                    if _is_transient(e):
+                        # Left out of the checkpoint so that a resumed import retries it
+                        transient = True
+            # Counted by the client, so retried attempts are included
+            stats.requests = client.requests_sent - requests_before
+
+            if not transient:
+                checkpoint.mark(index)
+            completed += 1
+            if completed % CHECKPOINT_EVERY == 0:
+                checkpoint.save()
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            progress(stats)
+
+    reporter = asyncio.create_task(report()) if progress else None
+    try:
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    finally:
+        if reporter:
+            reporter.cancel()
+        checkpoint.save()
+        if failures:
+            failures.close()
+
+    if progress:
+        progress(stats)
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Command line entry point (``python -m flet_onesignal import``)."""
+    parser = argparse.ArgumentParser(
+        prog="python -m flet_onesignal import",
+        description="Import users into OneSignal from a CSV or NDJSON file",
+    )
+    parser.add_argument("file", type=Path, help="Users file (.csv, or NDJSON)")
+    parser.add_argument("--app-id", default=os.environ.get("ONESIGNAL_APP_ID"))
+    parser.add_argument("--rest-api-key", default=os.environ.get("ONESIGNAL_REST_API_KEY"))
+    parser.add_argument("--base-url", help="API base URL (e.g. a local emulator)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Users in flight (default: 8)")
+    parser.add_argument("--rate", type=float, help="Maximum requests per second")
+    parser.add_argument(
+        "--checkpoint", type=Path, help="Progress file (default: <file>.checkpoint.json)"
+    )
+    parser.add_argument(
+        "--failures", type=Path, help="Failed records file (default: <file>.failures.ndjson)"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.app_id or not args.rest_api_key:
+        parser.error("--app-id and --rest-api-key (or ONESIGNAL_APP_ID / ONESIGNAL_REST_API_KEY)")
+    if not args.file.exists():
+        parser.error(f"file not found: {args.file}")
+
+    checkpoint = args.checkpoint or args.file.with_name(args.file.name + ".checkpoint.json")
+    failures = args.failures or args.file.with_name(args.file.name + ".failures.ndjson")
+
+    async def run() -> ImportStats:
+        options = {"base_url": args.base_url} if args.base_url else {}
+        async with OneSignalClient(
+            args.app_id,
+            args.rest_api_key,
+            max_connections=args.concurrency,
+            **options,
+        ) as client:
+            return await import_users(
+                client,
+                args.file,
+                concurrency=args.concurrency,
+                checkpoint_path=checkpoint,
+                failures_path=failures,
+                rate_limiter=TokenBucket(args.rate) if args.rate else None,
+                progress=lambda stats: print(stats, file=sys.stderr, flush=True),
+            )
+
+    try:
+        stats = asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"Interrupted; progress saved to {checkpoint}", file=sys.stderr)
+        sys.exit(130)
+
+    if stats.failed:
+        print(f"Failed records written to {failures}", file=sys.stderr)
+    sys.exit(1 if stats.failed else 0)
@@ -109,7 +109,7 @@ class OneSignalInAppMessages:
             "iam_is_paused",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     # Convenience methods for pause control
     async def pause(self) -> None:
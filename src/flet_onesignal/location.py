@@ -29,7 +29,7 @@ class OneSignalLocation:
             "location_request_permission",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     async def get_permission(self, timeout: float = 10) -> bool:
         """
@@ -42,7 +42,7 @@ class OneSignalLocation:
             "location_get_permission",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     async def set_shared(self, shared: bool) -> None:
         """
@@ -67,4 +67,4 @@ class OneSignalLocation:
             "location_is_shared",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
@@ -2,7 +2,9 @@
 OneSignal Notifications module for flet-onesignal.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
+
+from flet_onesignal.types import OSForegroundRule
 
 if TYPE_CHECKING:
     from flet_onesignal.onesignal import OneSignal
@@ -47,7 +49,7 @@ class OneSignalNotifications:
             {"fallback_to_settings": fallback_to_settings},
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     async def can_request_permission(self, timeout: float = 25) -> bool:
         """
@@ -63,7 +65,7 @@ class OneSignalNotifications:
             "notifications_can_request_permission",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     async def get_permission(self, timeout: float = 25) -> bool:
         """
@@ -76,7 +78,7 @@ class OneSignalNotifications:
             "notifications_get_permission",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     async def register_for_provisional_authorization(self, timeout: float = 25) -> bool:
         """
@@ -92,7 +94,7 @@ class OneSignalNotifications:
             "notifications_register_provisional",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
 
     # -------------------------------------------------------------------------
     # Notification Management
@@ -147,6 +149,33 @@ class OneSignalNotifications:
             {"notification_id": notification_id},
         )
 
+    async def set_foreground_rules(self, rules: Iterable[OSForegroundRule]) -> None:
+        """
+        Set rules that decide natively whether foreground notifications are shown.
+
+        The rules are sent once and evaluated on the native side as each
+        notification arrives, so suppressing a notification does not need a
+        round trip to Python inside the SDK's display window. The first
+        matching rule wins; notifications that match no rule are displayed.
+        `on_notification_foreground` still fires afterwards, with the applied
+        action in `rule_action`.
+
+        Args:
+            rules: Rules in priority order. An empty list removes all rules.
+
+        Example:
+            ```python
+            await onesignal.notifications.set_foreground_rules([
+                fos.OSForegroundRule(fos.OSForegroundAction.SUPPRESS, data_key="silent"),
+                fos.OSForegroundRule(fos.OSForegroundAction.DEFER, collapse_id="chat"),
+            ])
+            ```
+        """
+        await self._service._invoke_method(
+            "notifications_set_foreground_rules",
+            {"rules": [rule.to_dict() for rule in rules]},
+        )
+
     async def display(self, notification_id: str) -> None:
         """
         Allow a notification to be displayed after calling prevent_default.
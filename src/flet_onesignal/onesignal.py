@@ -5,8 +5,13 @@ This module provides the main OneSignal class that integrates with Flet
 applications using the Flet 0.80.x extension pattern.
 """
 
+import asyncio
+import contextvars
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import field
-from typing import Any, Optional
+from typing import Any, ContextManager, Iterable, Iterator, Optional
 
 import flet as ft
 
@@ -15,9 +20,28 @@ from flet_onesignal.in_app_messages import OneSignalInAppMessages
 from flet_onesignal.live_activities import OneSignalLiveActivities
 from flet_onesignal.location import OneSignalLocation
 from flet_onesignal.notifications import OneSignalNotifications
+from flet_onesignal.policy import (
+    METHOD_POLICIES,
+    CallPolicy,
+    CircuitBreaker,
+    OneSignalNativeError,
+    OneSignalQueueTimeoutError,
+    OneSignalTimeoutError,
+    _deadline,
+    error_from_envelope,
+    is_transient,
+    time_left,
+)
+from flet_onesignal.policy import deadline as call_deadline
+from flet_onesignal.scheduler import BridgeScheduler
 from flet_onesignal.session import OneSignalSession
+from flet_onesignal.tracing import BridgeTracer, now_us
 from flet_onesignal.types import (
+    COALESCIBLE_EVENTS,
+    OSCallPriority,
     OSErrorEvent,
+    OSEventCoalescing,
+    OSEventReplay,
     OSInAppMessageClickEvent,
     OSInAppMessageDidDismissEvent,
     OSInAppMessageDidDisplayEvent,
@@ -28,10 +52,85 @@ from flet_onesignal.types import (
     OSNotificationWillDisplayEvent,
     OSPermissionChangeEvent,
     OSPushSubscriptionChangedEvent,
+    OSStateSnapshot,
     OSUserChangedEvent,
 )
 from flet_onesignal.user import OneSignalUser
 
+BRIDGE_PROTOCOL_VERSION = 1
+"""Highest result envelope version understood (``resultVersion`` on the Dart side)."""
+
+READ_ONLY_METHODS = frozenset(
+    {
+        "user_get_onesignal_id",
+        "user_get_external_id",
+        "user_get_tags",
+        "user_get_push_subscription_id",
+        "user_get_push_subscription_token",
+        "user_is_push_opted_in",
+        "notifications_get_permission",
+        "notifications_can_request_permission",
+        "iam_is_paused",
+        "location_get_permission",
+        "location_is_shared",
+        "state_snapshot",
+    }
+)
+"""Dart methods that only read SDK state.
+
+Concurrent identical calls to these share one bridge round trip (see
+`OneSignal._invoke_method`). Only add methods without side effects.
+"""
+
+METHOD_PRIORITIES: dict[str, OSCallPriority] = {
+    **dict.fromkeys(
+        (
+            "login",
+            "logout",
+            "consent_given",
+            "events_listen",
+            "notifications_request_permission",
+            "notifications_register_provisional",
+            "notifications_prevent_default",
+            "notifications_display",
+            "location_request_permission",
+        ),
+        OSCallPriority.INTERACTIVE,
+    ),
+    **dict.fromkeys(
+        (
+            "user_add_tag",
+            "user_add_tags",
+            "user_remove_tag",
+            "user_remove_tags",
+            "session_add_outcome",
+            "session_add_unique_outcome",
+            "session_add_outcome_with_value",
+        ),
+        OSCallPriority.BACKGROUND,
+    ),
+}
+"""Default scheduling class of Dart methods; others are `OSCallPriority.NORMAL`."""
+
+_call_priority: contextvars.ContextVar[Optional[OSCallPriority]] = contextvars.ContextVar(
+    "flet_onesignal_call_priority", default=None
+)
+
+
+def _detached_context() -> contextvars.Context:
+    """Copy of the current context without the caller's deadline or call priority."""
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    context.run(_call_priority.set, None)
+    return context
+
+
+DEDUP_EVENTS = frozenset({"notification_click", "notification_foreground"})
+"""Events delivered at most once per notification ID."""
+
+SEEN_NOTIFICATIONS_LIMIT = 256
+"""Notification IDs remembered per event for deduplication."""
+
 
 @ft.control("OneSignal")
 class OneSignal(ft.Service):
@@ -64,6 +163,13 @@ class OneSignal(ft.Service):
         log_level: Optional SDK log level for console/logcat output.
         visual_alert_level: Optional SDK log level for visual alerts (iOS toast notifications).
         require_consent: Whether to require user consent before collecting data.
+        event_coalescing: Optional coalescing policy per state event type.
+        event_buffer_size: Click/display events held natively until listening starts.
+        defer_events: Whether to wait for `start_listening()` before delivering events.
+        max_in_flight: Bridge calls running at the same time.
+        call_policies: Per-method timeout/retry overrides.
+        circuit_breaker: Breaker that fails calls fast while the native SDK keeps failing.
+        tracer: Optional tracer recording a timing breakdown of sampled bridge calls.
     """
 
     app_id: str = ""
@@ -78,6 +184,20 @@ class OneSignal(ft.Service):
     require_consent: bool = False
     """Whether to require user consent before the SDK collects data (GDPR compliance)."""
 
+    event_coalescing: Optional[dict[str, OSEventCoalescing]] = None
+    """Coalescing per state event, keyed by `"permission_change"`, `"user_change"` or
+    `"push_subscription_change"`. Events without an entry are delivered immediately."""
+
+    event_buffer_size: int = 32
+    """Notification click, notification foreground and in-app message click events
+    held natively until Python starts listening, so a click that launches the app
+    is not lost. When full, the oldest event is dropped. `0` disables holding."""
+
+    defer_events: bool = False
+    """If `True`, held events are delivered only when you call `start_listening()`
+    (e.g. once your page and router are ready). Otherwise listening starts as soon
+    as the service is mounted."""
+
     on_notification_click: Optional[ft.EventHandler[OSNotificationClickEvent]] = None
     """Called when the user taps on a notification."""
 
@@ -111,6 +231,22 @@ class OneSignal(ft.Service):
     on_error: Optional[ft.EventHandler[OSErrorEvent]] = None
     """Called when an error occurs in the SDK."""
 
+    max_in_flight: int = field(default=4, metadata={"skip": True})
+    """Bridge calls running at the same time; further calls wait by priority class
+    (see `call_priority()`). Python-side only."""
+
+    call_policies: Optional[dict[str, CallPolicy]] = field(default=None, metadata={"skip": True})
+    """Timeout/retry policy per bridge method, over the defaults in
+    `flet_onesignal.policy.METHOD_POLICIES`. Python-side only."""
+
+    circuit_breaker: Optional[CircuitBreaker] = field(default=None, metadata={"skip": True})
+    """Breaker shared by all calls (default: `CircuitBreaker()`, opening after 5
+    consecutive failures for 10s). Python-side only."""
+
+    tracer: Optional[BridgeTracer] = field(default=None, metadata={"skip": True})
+    """Records the queue, transport, Dart and SDK time of sampled bridge calls,
+    exportable as Chrome trace-event JSON. Python-side only."""
+
     # Internal sub-modules (not sent to Flutter)
     _debug: OneSignalDebug = field(default=None, init=False, metadata={"skip": True})
     _user: OneSignalUser = field(default=None, init=False, metadata={"skip": True})
@@ -126,6 +262,16 @@ class OneSignal(ft.Service):
         default=None, init=False, metadata={"skip": True}
     )
 
+    # Single-flight state for READ_ONLY_METHODS (not sent to Flutter)
+    _in_flight: dict = field(default=None, init=False, metadata={"skip": True})
+    _write_epoch: int = field(default=0, init=False, metadata={"skip": True})
+
+    _scheduler: BridgeScheduler = field(default=None, init=False, metadata={"skip": True})
+
+    # Event replay state (not sent to Flutter)
+    _seen_notifications: OrderedDict = field(default=None, init=False, metadata={"skip": True})
+    _duplicate_events: int = field(default=0, init=False, metadata={"skip": True})
+
     def init(self):
         """Initialize the service and sub-modules."""
         super().init()
@@ -137,6 +283,40 @@ class OneSignal(ft.Service):
         self._location = OneSignalLocation(self)
         self._session = OneSignalSession(self)
         self._live_activities = OneSignalLiveActivities(self)
+        self._in_flight = {}
+        self._seen_notifications = OrderedDict()
+        self._scheduler = BridgeScheduler(self.max_in_flight)
+        if self.circuit_breaker is None:
+            self.circuit_breaker = CircuitBreaker()
+
+    def did_mount(self):
+        super().did_mount()
+        if not self.defer_events and self._is_supported_platform():
+            self.page.run_task(self.start_listening)
+
+    def before_event(self, e: ft.Event):
+        """Drop a notification event already delivered for the same notification ID."""
+        notification_id = getattr(e, "notification_id", None)
+        if e.name in DEDUP_EVENTS and notification_id:
+            key = (e.name, notification_id)
+            if key in self._seen_notifications:
+                self._duplicate_events += 1
+                return False
+            self._seen_notifications[key] = None
+            if len(self._seen_notifications) > SEEN_NOTIFICATIONS_LIMIT:
+                self._seen_notifications.popitem(last=False)
+        return super().before_event(e)
+
+    def before_update(self):
+        super().before_update()
+        if self.event_buffer_size < 0:
+            raise ValueError("event_buffer_size must be >= 0")
+        unknown = set(self.event_coalescing or {}) - COALESCIBLE_EVENTS
+        if unknown:
+            raise ValueError(
+                f"event_coalescing: unknown event(s) {', '.join(sorted(unknown))}; "
+                f"expected {', '.join(sorted(COALESCIBLE_EVENTS))}"
+            )
 
     # -------------------------------------------------------------------------
     # Sub-modules as properties
@@ -227,6 +407,115 @@ class OneSignal(ft.Service):
         """
         await self._invoke_method("consent_given", {"given": given})
 
+    async def snapshot(
+        self, fields: Optional[Iterable[str]] = None, timeout: float = 25
+    ) -> OSStateSnapshot:
+        """
+        Read the user, push, permission, in-app message and location state in one call.
+
+        The values are gathered concurrently on the native side and returned in
+        a single round trip, instead of one call per getter.
+
+        Args:
+            fields: `OSStateSnapshot` field names to read (default: all).
+            timeout: Timeout in seconds.
+
+        Returns:
+            The snapshot. Unrequested fields are `None`; fields that could not
+            be read are `None` and listed in `errors`.
+
+        Raises:
+            ValueError: If a field name is unknown.
+        """
+        arguments = None
+        if fields is not None:
+            names = list(fields)
+            unknown = set(names) - set(OSStateSnapshot.field_names())
+            if unknown:
+                raise ValueError(f"Unknown snapshot fields: {', '.join(sorted(unknown))}")
+            arguments = {"fields": names}
+
+        result = await self._invoke_method("state_snapshot", arguments, timeout=timeout)
+        return OSStateSnapshot.from_dict(result if isinstance(result, dict) else {})
+
+    @staticmethod
+    @contextmanager
+    def call_priority(priority: OSCallPriority) -> Iterator[None]:
+        """
+        Run the bridge calls made inside the block with the given priority.
+
+        Applies to the current task and to tasks it creates inside the block,
+        overriding each method's default class in `METHOD_PRIORITIES`.
+
+        Example:
+            ```python
+            with fos.OneSignal.call_priority(fos.OSCallPriority.BACKGROUND):
+                await onesignal.user.add_tags(analytics_tags)
+                await onesignal.session.add_outcome("screen_view")
+            ```
+
+        Args:
+            priority: Scheduling class for the calls.
+        """
+        token = _call_priority.set(OSCallPriority(priority))
+        try:
+            yield
+        finally:
+            _call_priority.reset(token)
+
+    @staticmethod
+    def deadline(seconds: float) -> ContextManager[None]:
+        """
+        Give all bridge calls made inside the block one shared time budget.
+
+        Each call's timeout is capped by the time left, retries stop when it
+        runs out, and calls made after it has passed raise
+        `OneSignalTimeoutError` without being sent.
+
+        Example:
+            ```python
+            with fos.OneSignal.deadline(5):
+                await onesignal.login(user_id)
+                await onesignal.user.add_tags(profile_tags)
+            ```
+
+        Args:
+            seconds: Budget for the whole block.
+        """
+        return call_deadline(seconds)
+
+    async def start_listening(self, timeout: float = 25) -> OSEventReplay:
+        """
+        Deliver the events held natively and start receiving events live.
+
+        Until this is called, notification click, notification foreground and
+        in-app message click events are held in a ring of `event_buffer_size`
+        on the native side. This call returns them in one message and they
+        are delivered to their handlers in order, with `replayed=True` and the
+        original `timestamp`. Notification events are deduplicated by
+        notification ID, so a replay never fires a handler twice for the same
+        notification.
+
+        Called automatically when the service is mounted, unless
+        `defer_events` is `True`. Calling it again is harmless.
+
+        Args:
+            timeout: Timeout in seconds.
+
+        Returns:
+            Counts of replayed, duplicate and dropped events.
+        """
+        result = await self._invoke_method("events_listen", timeout=timeout)
+        result = result if isinstance(result, dict) else {}
+        replay = OSEventReplay(dropped=result.get("dropped") or 0)
+        duplicates = self._duplicate_events
+        for held in result.get("events") or []:
+            await self._trigger_event(held["event"], {**held["data"], "replayed": True})
+            replay.replayed += 1
+        replay.duplicates = self._duplicate_events - duplicates
+        replay.replayed -= replay.duplicates
+        return replay
+
     # -------------------------------------------------------------------------
     # Internal method for sub-modules
     # -------------------------------------------------------------------------
@@ -251,13 +540,39 @@ class OneSignal(ft.Service):
 
         This is used by sub-modules to communicate with the Dart side.
 
+        The Dart side returns native values in a versioned envelope,
+        ``{"v": 1, "value": ...}``, which is unwrapped here. A failed call
+        returns ``{"v": 1, "error": {...}}``; it is reported through
+        `on_error` and raised as a `OneSignalNativeError` subclass.
+
+        Each method has a `CallPolicy` (`call_policies`, else
+        `METHOD_POLICIES`): a per-attempt timeout, capped by any enclosing
+        `deadline()`, and retries with jittered backoff for idempotent
+        methods. Timeouts and native errors count towards `circuit_breaker`;
+        while it is open, calls raise `OneSignalCircuitOpenError` at once.
+
+        Calls are admitted by `BridgeScheduler`: at most `max_in_flight` run at
+        once, and waiting calls start in priority order (`call_priority()`,
+        else `METHOD_PRIORITIES`).
+
+        Calls to `READ_ONLY_METHODS` are single-flight: while one is in flight,
+        identical calls (same method and arguments) await the same result
+        instead of making another round trip. A call to any other method
+        starts a new flight for later reads, so a read issued after a write
+        never gets a result read before it. Cancelling one caller does not
+        cancel the shared call.
+
         Args:
             method_name: Name of the method to invoke on the Dart side.
             arguments: Dictionary of arguments to pass to the method.
-            timeout: Timeout in seconds. Defaults to 25 if None.
+            timeout: Timeout in seconds per attempt. Defaults to the method's policy.
 
         Raises:
             FletUnsupportedPlatformException: If called on unsupported platform.
+            OneSignalNativeError: If the Dart side failed (after any retries).
+            OneSignalTimeoutError: If the call or the enclosing deadline timed out.
+            OneSignalCircuitOpenError: If the circuit breaker is open.
+            RuntimeError: If the Dart side uses a newer result envelope version.
         """
         # Validate platform before invoking methods
         if not self._is_supported_platform():
@@ -268,12 +583,185 @@ class OneSignal(ft.Service):
                 f"Method '{method_name}' cannot be executed."
             )
 
-        # Use default timeout if not provided
-        effective_timeout = timeout if timeout is not None else 25.0
+        policy = (self.call_policies or {}).get(method_name) or METHOD_POLICIES.get(
+            method_name, CallPolicy()
+        )
+        priority = _call_priority.get() or METHOD_PRIORITIES.get(method_name, OSCallPriority.NORMAL)
+
+        if method_name not in READ_ONLY_METHODS:
+            self._write_epoch += 1
+            return await self._call_with_policy(method_name, arguments, timeout, priority, policy)
+
+        remaining = time_left()
+        if remaining is not None and remaining <= 0:
+            raise OneSignalTimeoutError(method_name, "deadline exceeded")
 
-        # Call parent's _invoke_method from BaseControl
-        return await super()._invoke_method(
-            method_name=method_name,
-            arguments=arguments or {},
-            timeout=effective_timeout,
+        key = (
+            method_name,
+            json.dumps(arguments or {}, sort_keys=True, default=str),
+            self._write_epoch,
         )
+        flight = self._in_flight.get(key)
+        if flight is None:
+            # The flight is shared, so it must not inherit the first caller's
+            # deadline; each caller's own budget applies to its wait below.
+            # The task copies the detached context it is created in.
+            flight = _detached_context().run(
+                asyncio.ensure_future,
+                self._call_with_policy(method_name, arguments, timeout, priority, policy),
+            )
+            self._in_flight[key] = flight
+
+            def land(done: asyncio.Future) -> None:
+                self._in_flight.pop(key, None)
+                # Mark the error as retrieved in case every caller was cancelled
+                if not done.cancelled():
+                    done.exception()
+
+            flight.add_done_callback(land)
+
+        if remaining is None:
+            return await asyncio.shield(flight)
+        try:
+            # The shared flight keeps running for callers with a longer budget
+            return await asyncio.wait_for(asyncio.shield(flight), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise OneSignalTimeoutError(method_name, "deadline exceeded") from None
+
+    async def _call_with_policy(
+        self,
+        method_name: str,
+        arguments: Optional[dict[str, Any]],
+        timeout: Optional[float],
+        priority: OSCallPriority,
+        policy: CallPolicy,
+    ) -> Any:
+        """Run a call under its policy: deadline, retries and circuit breaker."""
+        attempt = 0
+        while True:
+            remaining = time_left()
+            if remaining is not None and remaining <= 0:
+                raise OneSignalTimeoutError(method_name, "deadline exceeded")
+
+            self.circuit_breaker.check(method_name)
+            try:
+                result = await self._scheduled_call(
+                    method_name,
+                    arguments,
+                    timeout if timeout is not None else policy.timeout,
+                    priority,
+                )
+                value = self._unwrap_result(method_name, result)
+            except OneSignalTimeoutError as e:
+                error = e
+            except (asyncio.TimeoutError, TimeoutError) as e:
+                error = OneSignalTimeoutError(method_name, "no result")
+                error.__cause__ = e
+            except OneSignalNativeError as e:
+                error = e
+            except BaseException:
+                self.circuit_breaker.record_other()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                return value
+
+            if not is_transient(error):
+                self.circuit_breaker.record_other()
+                raise error
+            self.circuit_breaker.record_failure()
+            attempt += 1
+            if attempt >= policy.attempts:
+                raise error
+            delay = policy.delay(attempt - 1)
+            remaining = time_left()
+            if remaining is not None and delay >= remaining:
+                raise error
+            await asyncio.sleep(delay)
+
+    async def _scheduled_call(
+        self,
+        method_name: str,
+        arguments: Optional[dict[str, Any]],
+        timeout: float,
+        priority: OSCallPriority,
+    ) -> Any:
+        """
+        Wait for a scheduler slot, then call the Dart side, tracing it if sampled.
+
+        ``timeout`` starts once the slot is acquired, so time spent behind other
+        calls is not mistaken for a slow SDK. The queue wait itself is bounded
+        only by the enclosing deadline.
+        """
+        trace_id = self.tracer.start() if self.tracer else None
+        queued_us = now_us() if trace_id else 0
+        remaining = time_left()
+        try:
+            if remaining is None:
+                await self._scheduler.acquire(priority)
+            else:
+                await asyncio.wait_for(self._scheduler.acquire(priority), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise OneSignalQueueTimeoutError(
+                method_name, "deadline exceeded while waiting for a scheduler slot"
+            ) from None
+
+        try:
+            remaining = time_left()
+            budget = timeout if remaining is None else min(timeout, remaining)
+            if budget <= 0:
+                raise OneSignalQueueTimeoutError(
+                    method_name, "deadline exceeded while waiting for a scheduler slot"
+                )
+            sent_us = now_us()
+            result = error = None
+            try:
+                # Call parent's _invoke_method from BaseControl
+                result = await asyncio.wait_for(
+                    super()._invoke_method(
+                        method_name=method_name,
+                        arguments=(
+                            arguments or {}
+                            if trace_id is None
+                            else {**(arguments or {}), "_trace": trace_id}
+                        ),
+                        timeout=budget,
+                    ),
+                    budget,
+                )
+                return result
+            except (asyncio.TimeoutError, TimeoutError) as e:
+                error = OneSignalTimeoutError(method_name, f"no result within {budget:.1f}s")
+                raise error from e
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if trace_id is not None:
+                    self.tracer.record(
+                        trace_id,
+                        method_name,
+                        priority.value,
+                        queued_us,
+                        sent_us,
+                        now_us(),
+                        result,
+                        error,
+                    )
+        finally:
+            self._scheduler.release(priority)
+
+    @staticmethod
+    def _unwrap_result(method_name: str, result: Any) -> Any:
+        """Extract the value from a Dart result envelope, raising its error if any."""
+        if not isinstance(result, dict) or "v" not in result:
+            return result
+        if result["v"] > BRIDGE_PROTOCOL_VERSION:
+            raise RuntimeError(
+                f"'{method_name}' returned result envelope v{result['v']}, but this "
+                f"flet-onesignal understands up to v{BRIDGE_PROTOCOL_VERSION}. "
+                f"Rebuild the app with the same flet-onesignal version."
+            )
+        if "error" in result:
+            raise error_from_envelope(method_name, result["error"])
+        return result.get("value")
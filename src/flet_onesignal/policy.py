@@ -0,0 +1,274 @@
+"""
+Call policies for flet-onesignal bridge calls.
+
+Typed exceptions for failed calls, per-method timeouts and retries, shared
+deadlines and a circuit breaker that fails fast while the native SDK keeps
+failing. Applied by `OneSignal._invoke_method`.
+"""
+
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+
+class OneSignalBridgeError(Exception):
+    """A call to the native OneSignal SDK failed.
+
+    Attributes:
+        method: Bridge method name, e.g. ``"user_add_tags"``.
+        type: Dart exception type (e.g. ``"PlatformException"``), if known.
+        code: `PlatformException` code, if any.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        message: str,
+        type: Optional[str] = None,
+        code: Optional[str] = None,
+    ):
+        self.method = method
+        self.type = type
+        self.code = code
+        super().__init__(f"{method}: {message}")
+
+
+class OneSignalNativeError(OneSignalBridgeError):
+    """The native side raised while executing the call."""
+
+
+class OneSignalArgumentError(OneSignalNativeError, ValueError):
+    """The native side rejected the call's arguments. Never retried."""
+
+
+class OneSignalUnsupportedError(OneSignalNativeError):
+    """The method is not available in this build or on this platform. Never retried."""
+
+
+class OneSignalTimeoutError(OneSignalBridgeError, TimeoutError):
+    """The call did not complete within its timeout or the enclosing deadline."""
+
+
+class OneSignalQueueTimeoutError(OneSignalTimeoutError):
+    """The enclosing deadline passed while the call waited for a scheduler slot.
+
+    The call was never sent, so it is not retried and does not count against
+    the circuit breaker.
+    """
+
+
+class OneSignalCircuitOpenError(OneSignalBridgeError):
+    """The circuit breaker is open; the call was not sent.
+
+    Attributes:
+        retry_after: Seconds until the breaker lets a trial call through.
+    """
+
+    def __init__(self, method: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            method, f"native SDK unhealthy, failing fast (retry in {retry_after:.1f}s)"
+        )
+
+
+_ARGUMENT_ERRORS = frozenset(
+    {"ArgumentError", "RangeError", "FormatException", "TypeError", "_TypeError"}
+)
+_UNSUPPORTED_ERRORS = frozenset(
+    {"MissingPluginException", "UnimplementedError", "UnsupportedError"}
+)
+
+
+def error_from_envelope(method: str, error: Any) -> OneSignalNativeError:
+    """Build the typed exception for the ``error`` part of a result envelope."""
+    error = error if isinstance(error, dict) else {"message": str(error)}
+    error_type = error.get("type")
+    if error_type in _ARGUMENT_ERRORS:
+        cls = OneSignalArgumentError
+    elif error_type in _UNSUPPORTED_ERRORS:
+        cls = OneSignalUnsupportedError
+    else:
+        cls = OneSignalNativeError
+    return cls(method, error.get("message") or "unknown error", error_type, error.get("code"))
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error may go away on retry and counts as a native SDK failure."""
+    return isinstance(error, (OneSignalNativeError, OneSignalTimeoutError)) and not isinstance(
+        error, (OneSignalArgumentError, OneSignalUnsupportedError, OneSignalQueueTimeoutError)
+    )
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """Timeout and retry behaviour of one bridge method."""
+
+    timeout: float = 25.0
+    """Seconds per attempt once it has a scheduler slot, unless the caller passes a timeout."""
+
+    attempts: int = 1
+    """Total attempts, including the first one. Only raise it for idempotent methods."""
+
+    backoff: float = 0.1
+    """Base delay in seconds; retry ``n`` waits up to ``backoff * 2**n``."""
+
+    max_backoff: float = 2.0
+    """Upper bound for a single delay."""
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based), with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+_IDEMPOTENT = CallPolicy(attempts=3)
+_PROMPT = CallPolicy(timeout=120.0)
+
+METHOD_POLICIES: dict[str, CallPolicy] = {
+    # Reads and writes that set state to a given value are safe to repeat
+    **dict.fromkeys(
+        (
+            "user_get_onesignal_id",
+            "user_get_external_id",
+            "user_get_tags",
+            "user_get_push_subscription_id",
+            "user_get_push_subscription_token",
+            "user_is_push_opted_in",
+            "notifications_get_permission",
+            "notifications_can_request_permission",
+            "iam_is_paused",
+            "location_get_permission",
+            "location_is_shared",
+            "state_snapshot",
+            "login",
+            "consent_given",
+            "user_add_tag",
+            "user_add_tags",
+            "user_remove_tag",
+            "user_remove_tags",
+            "user_add_alias",
+            "user_add_aliases",
+            "user_remove_alias",
+            "user_remove_aliases",
+            "user_set_language",
+            "user_push_opt_in",
+            "user_push_opt_out",
+            "iam_set_paused",
+            "location_set_shared",
+            "notifications_set_foreground_rules",
+            "debug_set_log_level",
+            "debug_set_alert_level",
+        ),
+        _IDEMPOTENT,
+    ),
+    # The user may take a while to answer a system prompt
+    **dict.fromkeys(
+        (
+            "notifications_request_permission",
+            "notifications_register_provisional",
+            "location_request_permission",
+        ),
+        _PROMPT,
+    ),
+}
+"""Per-method policies; other methods use ``CallPolicy()`` (25s, no retry).
+
+Outcomes, email/SMS subscriptions, `events_listen` and other calls that
+count, prompt or drain are deliberately not retried.
+"""
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the native SDK keeps failing.
+
+    After ``failure_threshold`` consecutive transient failures (timeouts or
+    native errors) the breaker opens and calls raise
+    `OneSignalCircuitOpenError` without being sent. After ``reset_timeout``
+    seconds one trial call is let through: success closes the breaker, failure
+    opens it again.
+
+    Args:
+        failure_threshold: Consecutive failures that open the breaker; ``0`` disables it.
+        reset_timeout: Seconds the breaker stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"`` (a trial call is allowed or running)."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def check(self, method: str) -> None:
+        """Admit a call, or raise `OneSignalCircuitOpenError`."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        raise OneSignalCircuitOpenError(method, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        """Record a completed call; closes the breaker."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Record a transient failure; may open the breaker."""
+        self.failures += 1
+        if self._trial_running or (
+            self.failure_threshold and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+        self._trial_running = False
+
+    def record_other(self) -> None:
+        """Record a call that ended without telling anything about SDK health."""
+        self._trial_running = False
+
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "flet_onesignal_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Give every bridge call inside the block one shared time budget.
+
+    Each call's timeout is capped by the time left, retries stop when it runs
+    out, and a call started after it has passed raises `OneSignalTimeoutError`
+    straight away. A nested deadline can only shorten the enclosing one.
+
+    Args:
+        seconds: Budget for the whole block.
+    """
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds left in the enclosing `deadline()`, or `None` outside one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
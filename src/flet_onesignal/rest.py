@@ -0,0 +1,553 @@
+"""
+Async OneSignal REST API client for flet-onesignal.
+
+Server-side counterpart of the `OneSignal` service: sends notifications and
+manages users, aliases and subscriptions through the OneSignal REST API.
+
+All requests go through one pooled ``httpx.AsyncClient`` (HTTP keep-alive),
+at most ``max_concurrency`` at a time. Responses with status 429 or 5xx, and
+connection errors, are retried with jittered exponential backoff, honouring
+``Retry-After`` when the server sends it.
+
+`OneSignalClient.send_bulk` splits large audiences into ``include_aliases``
+chunks, paces them with a `TokenBucket` and yields a `ChunkResult` per chunk
+as soon as it completes.
+
+Example:
+    ```python
+    from flet_onesignal.rest import OneSignalClient
+
+    async with OneSignalClient(app_id, rest_api_key) as client:
+        result = await client.send_push(
+            "Hello!",
+            headings="Greeting",
+            include_aliases={"external_id": ["user-1"]},
+        )
+    ```
+"""
+
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Iterable, Optional
+from urllib.parse import quote
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.onesignal.com"
+"""Base URL of the OneSignal REST API."""
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+"""HTTP statuses that are retried."""
+
+MAX_ALIASES_PER_REQUEST = 20_000
+"""Maximum ``include_aliases`` entries OneSignal accepts in one notification request."""
+
+
+class OneSignalAPIError(Exception):
+    """A OneSignal REST API request failed.
+
+    Attributes:
+        status: HTTP status code (0 if no response was received).
+        body: Decoded response body (JSON if possible, else text).
+        method: HTTP method of the request.
+        path: Request path.
+    """
+
+    def __init__(self, status: int, body: Any, method: str, path: str):
+        self.status = status
+        self.body = body
+        self.method = method
+        self.path = path
+        super().__init__(f"{method} {path} failed with status {status}: {body}")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry behaviour for failed requests."""
+
+    attempts: int = 4
+    """Total attempts per request, including the first one."""
+
+    backoff: float = 0.5
+    """Base delay in seconds; attempt ``n`` waits up to ``backoff * 2**n``."""
+
+    max_backoff: float = 30.0
+    """Upper bound for a single delay, including ``Retry-After``."""
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based).
+
+        Uses full jitter so many clients backing off at once do not retry in
+        lockstep. ``Retry-After`` takes precedence when given.
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class TokenBucket:
+    """
+    Async token bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    `acquire` waits until enough tokens are available. Waiters are served in
+    arrival order. Share one bucket between senders to pace them together.
+
+    Args:
+        rate: Tokens added per second (e.g. allowed requests per second).
+        capacity: Maximum burst size (defaults to ``max(rate, 1)``).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` are available and take them."""
+        async with self._lock:
+            while (wait := self.try_acquire(tokens)) > 0:
+                await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available without waiting.
+
+        Returns:
+            0 if the tokens were taken, otherwise the seconds until they will be.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of one chunk of a bulk send."""
+
+    index: int
+    """Position of the chunk in the audience (0-based)."""
+
+    aliases: list[str]
+    """Alias IDs targeted by this chunk."""
+
+    response: Optional[dict] = None
+    """API response, if the request succeeded."""
+
+    error: Optional["OneSignalAPIError"] = None
+    """The error, if the request failed after all retries."""
+
+    @property
+    def ok(self) -> bool:
+        """Check if the chunk was accepted (it may still report invalid aliases)."""
+        return self.error is None
+
+    @property
+    def notification_id(self) -> Optional[str]:
+        """ID of the created notification, if any."""
+        return (self.response or {}).get("id") or None
+
+    @property
+    def errors(self) -> Any:
+        """Per-recipient errors reported by the API (e.g. invalid aliases)."""
+        return (self.response or {}).get("errors")
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterable[list[str]]:
+    """Lazily split ``items`` into lists of at most ``size`` elements."""
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _decode(response: httpx.Response) -> Any:
+    """Decode a response body as JSON, falling back to text (None if empty)."""
+    if not response.content:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+class OneSignalClient:
+    """
+    Async OneSignal REST API client.
+
+    Args:
+        app_id: OneSignal App ID.
+        rest_api_key: App REST API key (sent as ``Authorization: Key ...``).
+        base_url: API base URL; point it at a local server for testing.
+        max_connections: Size of the keep-alive connection pool.
+        max_concurrency: Maximum requests in flight (defaults to ``max_connections``).
+        timeout: Per-request timeout in seconds.
+        retry: Retry policy for 429/5xx responses and connection errors.
+        transport: Optional httpx transport (e.g. ``httpx.MockTransport``).
+
+    Attributes:
+        requests_sent: HTTP requests sent so far, counting every retry attempt.
+    """
+
+    def __init__(
+        self,
+        app_id: str,
+        rest_api_key: str,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        max_connections: int = 10,
+        max_concurrency: Optional[int] = None,
+        timeout: float = 15.0,
+        retry: RetryPolicy = RetryPolicy(),
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.app_id = app_id
+        self.retry = retry
+        self.max_concurrency = max_concurrency or max_connections
+        self.requests_sent = 0
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Key {rest_api_key}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "OneSignalClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        await self._http.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+    ) -> Any:
+        """
+        Send a request, retrying 429/5xx responses and connection errors.
+
+        Args:
+            method: HTTP method.
+            path: Path relative to the base URL.
+            json: JSON body.
+            params: Query string parameters.
+
+        Returns:
+            The decoded response body.
+
+        Raises:
+            OneSignalAPIError: If the request fails or keeps failing after all attempts.
+        """
+        for attempt in range(self.retry.attempts):
+            last = attempt == self.retry.attempts - 1
+
+            try:
+                async with self._semaphore:
+                    self.requests_sent += 1
+                    response = await self._http.request(method, path, json=json, params=params)
+            except httpx.TransportError as e:
+                if last:
+                    raise OneSignalAPIError(0, str(e), method, path) from e
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+
+            if response.is_success:
+                return _decode(response)
+
+            if response.status_code not in RETRY_STATUSES or last:
+                raise OneSignalAPIError(response.status_code, _decode(response), method, path)
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+
+    def _user_path(self, alias_label: str, alias_id: str) -> str:
+        return (
+            f"/apps/{self.app_id}/users/by/{quote(alias_label, safe='')}/{quote(alias_id, safe='')}"
+        )
+
+    # -------------------------------------------------------------------------
+    # Notifications
+    # -------------------------------------------------------------------------
+
+    async def send_notification(self, payload: dict) -> dict:
+        """
+        Create a notification.
+
+        ``app_id`` is filled in, and an ``idempotency_key`` is generated when
+        missing so that retried requests never send the notification twice.
+
+        Args:
+            payload: Notification body as documented by the OneSignal API.
+
+        Returns:
+            The API response (``id`` and, if any, ``errors``).
+        """
+        body = {"app_id": self.app_id, **payload}
+        body.setdefault("idempotency_key", str(uuid.uuid4()))
+        return await self.request("POST", "/notifications", json=body)
+
+    async def send_push(
+        self,
+        contents: str | dict[str, str],
+        *,
+        headings: str | dict[str, str] | None = None,
+        include_aliases: Optional[dict[str, list[str]]] = None,
+        **fields: Any,
+    ) -> dict:
+        """
+        Send a push notification.
+
+        Args:
+            contents: Message text, or a ``{language: text}`` mapping.
+            headings: Title text, or a ``{language: text}`` mapping.
+            include_aliases: Target users, e.g. ``{"external_id": ["user-1"]}``.
+            **fields: Any other notification fields (``data``, ``included_segments``, ...).
+
+        Returns:
+            The API response (``id`` and, if any, ``errors``).
+        """
+        payload: dict[str, Any] = {
+            "target_channel": "push",
+            "contents": {"en": contents} if isinstance(contents, str) else contents,
+            **fields,
+        }
+        if headings is not None:
+            payload["headings"] = {"en": headings} if isinstance(headings, str) else headings
+        if include_aliases is not None:
+            payload["include_aliases"] = include_aliases
+        return await self.send_notification(payload)
+
+    async def send_bulk(
+        self,
+        payload: dict,
+        alias_label: str,
+        alias_ids: Iterable[str],
+        *,
+        chunk_size: int = MAX_ALIASES_PER_REQUEST,
+        rate_limiter: Optional[TokenBucket] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[ChunkResult]:
+        """
+        Send one notification to a large audience, chunked by alias.
+
+        ``alias_ids`` is consumed lazily, so it can be a generator over
+        millions of IDs; at most ``concurrency`` chunks are in flight and no
+        more chunks are read until one completes. Results are yielded in
+        completion order. A failed chunk is yielded with ``error`` set instead
+        of stopping the send.
+
+        When ``payload`` has an ``idempotency_key``, each chunk gets a key
+        derived from it and the chunk index, so re-running the same bulk send
+        after a crash does not notify anyone twice.
+
+        Args:
+            payload: Notification body without ``include_aliases``.
+            alias_label: Alias the IDs belong to (e.g. ``"external_id"``).
+            alias_ids: Alias IDs to target.
+            chunk_size: Aliases per request (at most `MAX_ALIASES_PER_REQUEST`).
+            rate_limiter: Bucket paced per request, matched to the plan's rate limit.
+            concurrency: Chunks in flight (defaults to the client's ``max_concurrency``).
+
+        Yields:
+            A `ChunkResult` per chunk.
+
+        Example:
+            ```python
+            bucket = TokenBucket(rate=10)
+            async for chunk in client.send_bulk(payload, "external_id", ids, rate_limiter=bucket):
+                if not chunk.ok:
+                    log.error("chunk %d failed: %s", chunk.index, chunk.error)
+            ```
+        """
+        if not 0 < chunk_size <= MAX_ALIASES_PER_REQUEST:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_ALIASES_PER_REQUEST}")
+
+        base_key = payload.get("idempotency_key")
+
+        async def send(index: int, chunk: list[str]) -> ChunkResult:
+            body = {**payload, "include_aliases": {alias_label: chunk}}
+            if base_key:
+                body["idempotency_key"] = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{base_key}:{index}"))
+            if rate_limiter:
+                await rate_limiter.acquire()
+            try:
+                return ChunkResult(index, chunk, response=await self.send_notification(body))
+            except OneSignalAPIError as e:
+                return ChunkResult(index, chunk, error=e)
+
+        limit = concurrency or self.max_concurrency
+        pending: set[asyncio.Task] = set()
+        try:
+            for index, chunk in enumerate(_chunked(alias_ids, chunk_size)):
+                if len(pending) >= limit:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.create_task(send(index, chunk)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_notification(self, notification_id: str) -> dict:
+        """Get a notification's details and delivery stats."""
+        return await self.request(
+            "GET", f"/notifications/{quote(notification_id)}", params={"app_id": self.app_id}
+        )
+
+    async def cancel_notification(self, notification_id: str) -> dict:
+        """Cancel a scheduled notification."""
+        return await self.request(
+            "DELETE", f"/notifications/{quote(notification_id)}", params={"app_id": self.app_id}
+        )
+
+    # -------------------------------------------------------------------------
+    # Users
+    # -------------------------------------------------------------------------
+
+    async def create_user(
+        self,
+        identity: Optional[dict[str, str]] = None,
+        properties: Optional[dict] = None,
+        subscriptions: Optional[list[dict]] = None,
+    ) -> dict:
+        """
+        Create a user (or return the existing one with the same identity).
+
+        Args:
+            identity: Aliases, e.g. ``{"external_id": "user-1"}``.
+            properties: User properties (``tags``, ``language``, ...).
+            subscriptions: Subscriptions to attach (email, SMS, push).
+        """
+        body: dict[str, Any] = {}
+        if identity:
+            body["identity"] = identity
+        if properties:
+            body["properties"] = properties
+        if subscriptions:
+            body["subscriptions"] = subscriptions
+        return await self.request("POST", f"/apps/{self.app_id}/users", json=body)
+
+    async def get_user(self, alias_label: str, alias_id: str) -> dict:
+        """Get a user by one of its aliases (e.g. ``"external_id"``, ``"user-1"``)."""
+        return await self.request("GET", self._user_path(alias_label, alias_id))
+
+    async def update_user(self, alias_label: str, alias_id: str, properties: dict) -> dict:
+        """Update a user's properties (``tags``, ``language``, ...)."""
+        return await self.request(
+            "PATCH", self._user_path(alias_label, alias_id), json={"properties": properties}
+        )
+
+    async def delete_user(self, alias_label: str, alias_id: str) -> None:
+        """Delete a user and all of its subscriptions."""
+        await self.request("DELETE", self._user_path(alias_label, alias_id))
+
+    # -------------------------------------------------------------------------
+    # Aliases
+    # -------------------------------------------------------------------------
+
+    async def get_aliases(self, alias_label: str, alias_id: str) -> dict:
+        """Get all aliases of a user."""
+        return await self.request("GET", f"{self._user_path(alias_label, alias_id)}/identity")
+
+    async def add_aliases(self, alias_label: str, alias_id: str, aliases: dict[str, str]) -> dict:
+        """Add aliases to a user."""
+        return await self.request(
+            "PATCH",
+            f"{self._user_path(alias_label, alias_id)}/identity",
+            json={"identity": aliases},
+        )
+
+    async def delete_alias(self, alias_label: str, alias_id: str, label: str) -> dict:
+        """Delete the alias ``label`` from a user."""
+        return await self.request(
+            "DELETE",
+            f"{self._user_path(alias_label, alias_id)}/identity/{quote(label, safe='')}",
+        )
+
+    # -------------------------------------------------------------------------
+    # Subscriptions
+    # -------------------------------------------------------------------------
+
+    async def create_subscription(
+        self, alias_label: str, alias_id: str, subscription: dict
+    ) -> dict:
+        """Attach a subscription (``type``, ``token``, ...) to a user."""
+        return await self.request(
+            "POST",
+            f"{self._user_path(alias_label, alias_id)}/subscriptions",
+            json={"subscription": subscription},
+        )
+
+    async def update_subscription(self, subscription_id: str, subscription: dict) -> dict:
+        """Update a subscription (e.g. ``{"enabled": False}``)."""
+        return await self.request(
+            "PATCH",
+            f"/apps/{self.app_id}/subscriptions/{quote(subscription_id, safe='')}",
+            json={"subscription": subscription},
+        )
+
+    async def delete_subscription(self, subscription_id: str) -> None:
+        """Delete a subscription."""
+        await self.request(
+            "DELETE", f"/apps/{self.app_id}/subscriptions/{quote(subscription_id, safe='')}"
+        )
+
+    async def transfer_subscription(self, subscription_id: str, identity: dict[str, str]) -> dict:
+        """Move a subscription to the user identified by ``identity``."""
+        return await self.request(
+            "PATCH",
+            f"/apps/{self.app_id}/subscriptions/{quote(subscription_id, safe='')}/owner",
+            json={"identity": identity},
+        )
@@ -0,0 +1,362 @@
+"""
+Deep-link router for flet-onesignal click events.
+
+Maps notification and in-app message clicks to handlers by URL path
+(``/orders/{order_id}``) or by additional data key, instead of an if/elif
+chain in every ``on_notification_click`` handler.
+
+Path patterns are compiled into a segment trie when registered, so matching
+a link costs one dictionary lookup per path segment, whatever the number of
+routes. Patterns that would match exactly the same links are rejected with
+`RouteConflictError` at registration.
+
+Example:
+    ```python
+    router = fos.DeepLinkRouter()
+
+    @router.route("/orders/{order_id}")
+    async def open_order(match: fos.RouteMatch):
+        await show_order(match.params["order_id"])
+
+    @router.data("promo")
+    async def open_promo(match: fos.RouteMatch):
+        await show_promo(match.data["promo"])
+
+    onesignal = fos.OneSignal(
+        app_id="...",
+        on_notification_click=router.dispatch,
+        on_iam_click=router.dispatch,
+    )
+    ```
+"""
+
+import inspect
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+RouteHandler = Callable[["RouteMatch"], Union[Awaitable[Any], Any]]
+"""A route handler: called with the `RouteMatch`, sync or async."""
+
+_PARAM = re.compile(r"^\{([A-Za-z_][A-Za-z0-9_]*)(?::(path))?\}$")
+_ANY_VALUE = object()
+_WEB_SCHEMES = {"", "http", "https"}
+
+
+class RouteConflictError(ValueError):
+    """Raised when a route would match exactly the same links as an existing one."""
+
+
+@dataclass
+class RouteMatch:
+    """The route selected for a click, passed to its handler."""
+
+    pattern: str
+    """The matched path pattern, or `data:<key>` / `data:<key>=<value>` for data routes."""
+
+    params: dict[str, str] = field(default_factory=dict)
+    """Path parameters captured by the pattern."""
+
+    query: dict[str, str] = field(default_factory=dict)
+    """Query string parameters of the link."""
+
+    data: dict[str, Any] = field(default_factory=dict)
+    """The notification's additional data (empty for in-app messages)."""
+
+    url: Optional[str] = None
+    """The link that was matched, if any."""
+
+    event: Any = None
+    """The click event being dispatched, or `None` when calling `match()` directly."""
+
+
+@dataclass
+class _Route:
+    pattern: str
+    handler: RouteHandler
+    order: int
+    params: list[str] = field(default_factory=list)
+    rest: Optional[str] = None
+    """Name of the trailing ``{name:path}`` parameter, if any."""
+
+
+class _Node:
+    __slots__ = ("static", "param", "rest", "route")
+
+    def __init__(self):
+        self.static: dict[str, _Node] = {}
+        self.param: Optional[_Node] = None
+        self.rest: Optional[_Route] = None
+        self.route: Optional[_Route] = None
+
+
+def _split_url(url: str) -> tuple[list[str], dict[str, str]]:
+    """Split a link into decoded path segments and query parameters.
+
+    For custom schemes (``myapp://orders/42``) the host is the first segment;
+    for ``http(s)`` links and bare paths only the path is routed.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path
+    if parts.scheme.lower() not in _WEB_SCHEMES and parts.netloc:
+        path = f"{parts.netloc}/{path}"
+    if "%" in path:
+        segments = [unquote(segment) for segment in path.split("/") if segment]
+    else:
+        segments = [segment for segment in path.split("/") if segment]
+    return segments, dict(parse_qsl(parts.query)) if parts.query else {}
+
+
+def _notification_payload(notification: Any) -> tuple[dict[str, Any], Optional[str]]:
+    """Return ``(additional_data, launch_url)`` from a notification payload.
+
+    The payload may arrive as a dict or a JSON string, with SDK-style keys
+    (``additionalData``, ``launchUrl``) or as Android's raw ``custom`` object.
+    """
+    if isinstance(notification, str):
+        try:
+            notification = json.loads(notification)
+        except ValueError:
+            return {}, None
+    if not isinstance(notification, dict):
+        return {}, None
+
+    data = notification.get("additionalData") or notification.get("additional_data")
+    launch_url = notification.get("launchUrl") or notification.get("launch_url")
+    custom = notification.get("custom")
+    if isinstance(custom, str):
+        try:
+            custom = json.loads(custom)
+        except ValueError:
+            custom = None
+    if isinstance(custom, dict):
+        data = data or custom.get("a")
+        launch_url = launch_url or custom.get("u")
+    return (data if isinstance(data, dict) else {}), launch_url
+
+
+class DeepLinkRouter:
+    """
+    Dispatches click events to handlers registered by link path or data key.
+
+    For a notification click, the link is read from the additional data key
+    ``link_key`` and falls back to the notification's launch URL; for an
+    in-app message click it is the click action's URL. Path routes are tried
+    first, then data routes, then the fallback handler.
+
+    Path patterns are ``/``-separated segments; a ``{name}`` segment captures
+    one segment and a final ``{name:path}`` captures the rest of the path.
+    Static segments take precedence over ``{name}``, which takes precedence
+    over ``{name:path}``.
+
+    Args:
+        link_key: Additional data key holding a notification's deep link.
+    """
+
+    def __init__(self, link_key: str = "deep_link"):
+        self.link_key = link_key
+        self._root = _Node()
+        self._data: dict[str, dict[Any, _Route]] = {}
+        self._fallback: Optional[RouteHandler] = None
+        self._count = 0
+
+    # -------------------------------------------------------------------------
+    # Registration
+    # -------------------------------------------------------------------------
+
+    def route(self, pattern: str, handler: Optional[RouteHandler] = None):
+        """
+        Register a handler for a link path pattern.
+
+        Can be used as a decorator (``@router.route("/orders/{id}")``) or
+        called with the handler.
+
+        Args:
+            pattern: Path pattern, e.g. ``"/orders/{order_id}"`` or ``"/docs/{page:path}"``.
+            handler: Called with the `RouteMatch`.
+
+        Raises:
+            ValueError: If the pattern is malformed.
+            RouteConflictError: If an existing pattern matches the same links.
+        """
+        if handler is None:
+            return lambda fn: self.route(pattern, fn) or fn
+
+        route = _Route(pattern=pattern, handler=handler, order=self._next_order())
+        node = self._root
+        segments = [segment for segment in pattern.split("/") if segment]
+        for index, segment in enumerate(segments):
+            param = _PARAM.match(segment)
+            if param is None:
+                if "{" in segment or "}" in segment:
+                    raise ValueError(f"Invalid segment {segment!r} in route {pattern!r}")
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            name, kind = param.groups()
+            if name in route.params or name == route.rest:
+                raise ValueError(f"Duplicate parameter {name!r} in route {pattern!r}")
+            if kind == "path":
+                if index != len(segments) - 1:
+                    raise ValueError(f"{{{name}:path}} must be the last segment of {pattern!r}")
+                route.rest = name
+                if node.rest is not None:
+                    raise RouteConflictError(f"{pattern!r} conflicts with {node.rest.pattern!r}")
+                node.rest = route
+                return None
+            route.params.append(name)
+            if node.param is None:
+                node.param = _Node()
+            node = node.param
+
+        if node.route is not None:
+            raise RouteConflictError(f"{pattern!r} conflicts with {node.route.pattern!r}")
+        node.route = route
+        return None
+
+    def data(self, key: str, value: Any = None, handler: Optional[RouteHandler] = None):
+        """
+        Register a handler for notifications carrying an additional data key.
+
+        Can be used as a decorator (``@router.data("promo")``) or called with
+        the handler. A route with a ``value`` takes precedence over one for any
+        value of the same key; across keys, the earliest registered route wins.
+
+        Args:
+            key: Additional data key to match.
+            value: Only match this value (compared as text); `None` matches any value.
+            handler: Called with the `RouteMatch`.
+
+        Raises:
+            RouteConflictError: If the same key and value are already routed.
+        """
+        if handler is None:
+            return lambda fn: self.data(key, value, fn) or fn
+
+        values = self._data.setdefault(key, {})
+        slot = _ANY_VALUE if value is None else str(value)
+        pattern = f"data:{key}" if value is None else f"data:{key}={value}"
+        if slot in values:
+            raise RouteConflictError(f"{pattern!r} is already routed")
+        values[slot] = _Route(pattern=pattern, handler=handler, order=self._next_order())
+        return None
+
+    def fallback(self, handler: RouteHandler) -> RouteHandler:
+        """Set the handler for clicks that match no route. Usable as a decorator."""
+        self._fallback = handler
+        return handler
+
+    def _next_order(self) -> int:
+        self._count += 1
+        return self._count
+
+    # -------------------------------------------------------------------------
+    # Matching
+    # -------------------------------------------------------------------------
+
+    def match(
+        self, url: Optional[str] = None, data: Optional[dict[str, Any]] = None
+    ) -> Optional[RouteMatch]:
+        """
+        Find the route for a link and/or additional data, without calling it.
+
+        Args:
+            url: Deep link or path to match against the path routes.
+            data: Additional data to match against the data routes.
+
+        Returns:
+            The `RouteMatch`, or `None` if no route (other than the fallback) matches.
+        """
+        resolved = self._resolve(url, data or {})
+        return resolved[1] if resolved else None
+
+    def _resolve(
+        self, url: Optional[str], data: dict[str, Any]
+    ) -> Optional[tuple[_Route, RouteMatch]]:
+        if url:
+            segments, query = _split_url(url)
+            found = self._match_path(self._root, segments, 0, [])
+            if found is not None:
+                route, captured, rest = found
+                params = dict(zip(route.params, captured))
+                if route.rest is not None:
+                    params[route.rest] = "/".join(segments[rest:])
+                return route, RouteMatch(route.pattern, params, query, data, url)
+
+        route = self._match_data(data)
+        if route is not None:
+            return route, RouteMatch(route.pattern, data=data, url=url)
+        return None
+
+    def _match_path(
+        self, node: _Node, segments: list[str], index: int, captured: list[str]
+    ) -> Optional[tuple[_Route, list[str], int]]:
+        if index == len(segments):
+            if node.route is not None:
+                return node.route, captured, index
+        else:
+            child = node.static.get(segments[index])
+            if child is not None:
+                found = self._match_path(child, segments, index + 1, captured)
+                if found is not None:
+                    return found
+            if node.param is not None:
+                found = self._match_path(
+                    node.param, segments, index + 1, [*captured, segments[index]]
+                )
+                if found is not None:
+                    return found
+        if node.rest is not None:
+            return node.rest, captured, index
+        return None
+
+    def _match_data(self, data: dict[str, Any]) -> Optional[_Route]:
+        best: Optional[_Route] = None
+        for key, value in data.items():
+            values = self._data.get(key)
+            if values is None:
+                continue
+            route = values.get(str(value)) or values.get(_ANY_VALUE)
+            if route is not None and (best is None or route.order < best.order):
+                best = route
+        return best
+
+    # -------------------------------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------------------------------
+
+    async def dispatch(self, event: Any) -> bool:
+        """
+        Route a click event to its handler.
+
+        Pass it directly as ``on_notification_click`` and/or ``on_iam_click``.
+
+        Args:
+            event: An `OSNotificationClickEvent` or `OSInAppMessageClickEvent`.
+
+        Returns:
+            `True` if a route or the fallback handled the event.
+        """
+        if hasattr(event, "notification"):
+            data, launch_url = _notification_payload(event.notification)
+            link = data.get(self.link_key)
+            url = link if isinstance(link, str) and link else launch_url
+        else:
+            data, url = {}, getattr(event, "url", None)
+
+        resolved = self._resolve(url, data)
+        if resolved is not None:
+            route, match = resolved
+            handler = route.handler
+        elif self._fallback is not None:
+            match, handler = RouteMatch("", data=data, url=url), self._fallback
+        else:
+            return False
+
+        match.event = event
+        result = handler(match)
+        if inspect.isawaitable(result):
+            await result
+        return True
@@ -0,0 +1,133 @@
+"""
+Priority scheduler for flet-onesignal bridge calls.
+
+Limits how many calls to the Dart side are in flight at once and decides
+which waiting call goes next:
+
+- `OSCallPriority.INTERACTIVE` calls always go first.
+- `OSCallPriority.NORMAL` and `OSCallPriority.BACKGROUND` calls share the
+  remaining turns: after ``fairness`` normal calls in a row, a waiting
+  background call gets one, so background work is slowed but never starved.
+- Background calls never hold more than ``background_limit`` slots, leaving
+  the rest free for interactive and normal calls arriving later.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from flet_onesignal.types import OSCallPriority
+
+
+class BridgeScheduler:
+    """
+    Admits bridge calls by priority class, up to a max-in-flight limit.
+
+    Args:
+        max_in_flight: Calls running at the same time.
+        background_limit: Slots background calls may hold at once
+            (default: half of ``max_in_flight``, at least 1).
+        fairness: Normal calls admitted in a row before a waiting background
+            call gets a turn.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        background_limit: Optional[int] = None,
+        fairness: int = 4,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.max_in_flight = max_in_flight
+        self.background_limit = (
+            background_limit if background_limit is not None else max(1, max_in_flight // 2)
+        )
+        self.fairness = fairness
+        self._queues: dict[OSCallPriority, deque[asyncio.Future]] = {
+            priority: deque() for priority in OSCallPriority
+        }
+        self._running: dict[OSCallPriority, int] = {priority: 0 for priority in OSCallPriority}
+        self._normal_turns = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Calls currently admitted."""
+        return sum(self._running.values())
+
+    def waiting(self, priority: Optional[OSCallPriority] = None) -> int:
+        """Calls waiting for a slot, for one priority class or all of them."""
+        queues = [self._queues[priority]] if priority else self._queues.values()
+        return sum(1 for queue in queues for waiter in queue if not waiter.done())
+
+    @asynccontextmanager
+    async def slot(self, priority: OSCallPriority) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority: OSCallPriority) -> None:
+        """Wait until a call of ``priority`` may start, and count it as running."""
+        if not self.waiting() and self._has_room(priority):
+            self._running[priority] += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Admitted just before the cancellation landed: hand the slot on
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            raise
+
+    def release(self, priority: OSCallPriority) -> None:
+        """Mark a call of ``priority`` as finished and admit waiting calls."""
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _has_room(self, priority: OSCallPriority) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        return (
+            priority is not OSCallPriority.BACKGROUND
+            or self._running[priority] < self.background_limit
+        )
+
+    def _dispatch(self) -> None:
+        while (priority := self._next()) is not None:
+            self._running[priority] += 1
+            self._queues[priority].popleft().set_result(None)
+
+    def _next(self) -> Optional[OSCallPriority]:
+        for queue in self._queues.values():
+            # Drop callers cancelled while waiting
+            while queue and queue[0].done():
+                queue.popleft()
+
+        if self.in_flight >= self.max_in_flight:
+            return None
+        if self._queues[OSCallPriority.INTERACTIVE]:
+            return OSCallPriority.INTERACTIVE
+
+        normal = bool(self._queues[OSCallPriority.NORMAL])
+        background = bool(self._queues[OSCallPriority.BACKGROUND]) and self._has_room(
+            OSCallPriority.BACKGROUND
+        )
+        if normal and background:
+            if self._normal_turns < self.fairness:
+                self._normal_turns += 1
+                return OSCallPriority.NORMAL
+            self._normal_turns = 0
+            return OSCallPriority.BACKGROUND
+        if normal:
+            return OSCallPriority.NORMAL
+        if background:
+            return OSCallPriority.BACKGROUND
+        return None
@@ -0,0 +1,182 @@
+"""
+Build artifact size analysis for fos-build.
+
+Breaks an APK, AAB or IPA down by component using only the ZIP central
+directory (nothing is extracted), stores the result as a JSON manifest next
+to the build output and compares it against the previous build's manifest.
+"""
+
+import json
+import re
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Ordered (component, pattern) rules; the first match wins. Patterns are
+# matched against entry names with the AAB module prefix (e.g. "base/")
+# already stripped.
+COMPONENT_RULES: list[tuple[str, re.Pattern]] = [
+    (
+        "Python site-packages",
+        re.compile(r"(site-packages|libpythonsitepackages\.so$)"),
+    ),
+    # Only the SDK's own native libraries, Java resources, Android resources
+    # and iOS frameworks; Flutter/Python packages named after the plugin
+    # (flutter_assets/packages/flet_onesignal/...) are not OneSignal native.
+    # Its classes are merged into classes*.dex and counted as Dex bytecode.
+    (
+        "OneSignal native",
+        re.compile(
+            r"(?i)(^lib/[^/]+/[^/]*onesignal[^/]*\.so$|^com/onesignal/|^META-INF/com\.onesignal"
+            r"|^res/[^/]+/[^/]*onesignal|^Frameworks/OneSignal[^/]*\.framework/)"
+        ),
+    ),
+    (
+        "Flutter engine",
+        re.compile(r"(lib/[^/]+/libflutter\.so$|Frameworks/Flutter\.framework/)"),
+    ),
+    (
+        "Dart app code",
+        re.compile(r"(lib/[^/]+/libapp\.so$|Frameworks/App\.framework/App$)"),
+    ),
+    (
+        "Python app",
+        re.compile(r"(flutter_assets/app/|/app\.zip$)"),
+    ),
+    (
+        "Python runtime",
+        re.compile(
+            r"(?i)(libpython[^/]*\.so$|python[^/]*\.(bundle|framework|xcframework)/|stdlib)"
+        ),
+    ),
+    (
+        "Native libraries",
+        re.compile(r"(^lib/[^/]+/[^/]+\.so$|Frameworks/)"),
+    ),
+    (
+        "Dex bytecode",
+        re.compile(r"(^classes\d*\.dex$|^dex/)"),
+    ),
+    (
+        "Assets",
+        re.compile(r"(^assets/|^res/|flutter_assets/|\.(png|jpg|jpeg|webp|ttf|otf|json)$)"),
+    ),
+]
+
+OTHER_COMPONENT = "Other"
+
+DEFAULT_GROWTH_THRESHOLD = 5.0
+"""Percentage growth of a component over the previous build that is flagged."""
+
+_AAB_MODULE_PREFIX = re.compile(r"^(base|feature[^/]*)/")
+_IPA_APP_PREFIX = re.compile(r"^Payload/[^/]+\.app/")
+
+
+@dataclass
+class ComponentSize:
+    """Size of one artifact component, in bytes."""
+
+    name: str
+    compressed: int = 0
+    """Bytes the component takes inside the archive (download size)."""
+
+    uncompressed: int = 0
+    """Bytes the component takes uncompressed."""
+
+    previous: Optional[int] = None
+    """Compressed size in the previous build, or `None` if unknown."""
+
+    @property
+    def delta(self) -> Optional[int]:
+        """Compressed size change since the previous build."""
+        return None if self.previous is None else self.compressed - self.previous
+
+    def grew_over(self, threshold: float) -> bool:
+        """Check if the component grew more than `threshold` percent."""
+        if self.previous is None or self.delta <= 0:
+            return False
+        if self.previous == 0:
+            return True
+        return self.delta * 100 / self.previous > threshold
+
+
+def classify(entry_name: str) -> str:
+    """Return the component an archive entry belongs to."""
+    name = _IPA_APP_PREFIX.sub("", _AAB_MODULE_PREFIX.sub("", entry_name))
+    for component, pattern in COMPONENT_RULES:
+        if pattern.search(name):
+            return component
+    return OTHER_COMPONENT
+
+
+def analyze_artifact(path: Path) -> dict[str, ComponentSize]:
+    """Break an APK/AAB/IPA down by component from its ZIP central directory."""
+    components: dict[str, ComponentSize] = {}
+
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = classify(info.filename)
+            size = components.setdefault(name, ComponentSize(name))
+            size.compressed += info.compress_size
+            size.uncompressed += info.file_size
+
+    return components
+
+
+def manifest_path(project_root: Path, artifact: Path) -> Path:
+    """Location of the size manifest for an artifact.
+
+    Stored outside the flet output directory so it survives rebuilds.
+    """
+    return project_root / "build" / ".fos-size" / f"{artifact.name}.json"
+
+
+def load_manifest(path: Path) -> dict[str, int]:
+    """Load a previous size manifest (component -> compressed bytes)."""
+    try:
+        return json.loads(path.read_text()).get("components", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, artifact: Path, components: dict[str, ComponentSize]) -> None:
+    """Write the size manifest for the current build."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "artifact": artifact.name,
+        "size": artifact.stat().st_size,
+        "components": {name: c.compressed for name, c in components.items()},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True))
+
+
+def compare_with_previous(project_root: Path, artifact: Path) -> list[ComponentSize]:
+    """Analyze an artifact, diff it against the previous manifest and save the new one.
+
+    Returns:
+        Components sorted by compressed size (largest first). Components that
+        disappeared since the previous build are included with size 0.
+    """
+    components = analyze_artifact(artifact)
+    manifest = manifest_path(project_root, artifact)
+    previous = load_manifest(manifest)
+
+    for name, size in previous.items():
+        components.setdefault(name, ComponentSize(name)).previous = size
+    for component in components.values():
+        if component.previous is None and previous:
+            component.previous = 0
+
+    save_manifest(manifest, artifact, components)
+    return sorted(components.values(), key=lambda c: c.compressed, reverse=True)
+
+
+def find_artifacts(project_root: Path, build_type: str) -> list[Path]:
+    """Find the archives produced by flet build for a build type."""
+    output_dir = project_root / "build" / build_type
+    if not output_dir.exists():
+        return []
+    return sorted(output_dir.glob(f"*.{build_type}"))
@@ -0,0 +1,272 @@
+"""
+Bridge call tracing for flet-onesignal.
+
+A sampled bridge call carries a trace id to the Dart side, which returns
+when it received, started and finished the call. Together with the Python
+timestamps this splits each call into:
+
+- ``queue``: waiting for a `BridgeScheduler` slot in Python.
+- ``transport``: Flet transport in both directions (round trip minus the
+  time spent on the Dart side).
+- ``dart_queue``: on the Dart side before the method ran (argument decoding).
+- ``sdk``: the OneSignal Flutter/native SDK call itself.
+
+Durations are computed from differences on one clock each, so they do not
+depend on the Python and Dart clocks agreeing. For the timeline export the
+Dart part is centred in the transport time.
+
+Example:
+    ```python
+    tracer = BridgeTracer(sample_rate=0.1)
+    onesignal = fos.OneSignal(app_id="...", tracer=tracer)
+    ...
+    tracer.export("bridge-trace.json")  # open in chrome://tracing or Perfetto
+    ```
+"""
+
+import itertools
+import json
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+def now_us() -> int:
+    """Wall-clock time in microseconds since the epoch (the Dart side's unit)."""
+    return time.time_ns() // 1000
+
+
+@dataclass
+class BridgeSpan:
+    """Timestamps of one traced bridge call, in microseconds since the epoch."""
+
+    trace_id: str
+    """Id sent to the Dart side with the call."""
+
+    method: str
+    """Bridge method name."""
+
+    priority: str
+    """`OSCallPriority` value the call was scheduled with."""
+
+    queued_us: int
+    """Python: the call asked for a scheduler slot."""
+
+    sent_us: int
+    """Python: the call was handed to Flet."""
+
+    returned_us: int
+    """Python: the result arrived."""
+
+    dart_received_us: Optional[int] = None
+    """Dart: the call reached `OneSignalService`."""
+
+    dart_started_us: Optional[int] = None
+    """Dart: the method started running."""
+
+    dart_finished_us: Optional[int] = None
+    """Dart: the method finished."""
+
+    error: Optional[str] = None
+    """Error type if the call failed."""
+
+    @property
+    def has_dart_times(self) -> bool:
+        """Whether the Dart side returned its timestamps."""
+        return self.dart_received_us is not None and self.dart_finished_us is not None
+
+    @property
+    def total_ms(self) -> float:
+        """Whole call as seen by the caller, including the scheduler wait."""
+        return (self.returned_us - self.queued_us) / 1000
+
+    @property
+    def queue_ms(self) -> float:
+        """Waiting for a scheduler slot."""
+        return (self.sent_us - self.queued_us) / 1000
+
+    @property
+    def dart_ms(self) -> Optional[float]:
+        """Time on the Dart side, from receive to finish."""
+        if not self.has_dart_times:
+            return None
+        return (self.dart_finished_us - self.dart_received_us) / 1000
+
+    @property
+    def transport_ms(self) -> float:
+        """Round trip through Flet, outside the Dart method handler."""
+        round_trip = (self.returned_us - self.sent_us) / 1000
+        return round_trip - (self.dart_ms or 0.0)
+
+    @property
+    def dart_queue_ms(self) -> Optional[float]:
+        """On the Dart side before the method ran."""
+        if not self.has_dart_times:
+            return None
+        return (self.dart_started_us - self.dart_received_us) / 1000
+
+    @property
+    def sdk_ms(self) -> Optional[float]:
+        """Running the OneSignal SDK call."""
+        if not self.has_dart_times:
+            return None
+        return (self.dart_finished_us - self.dart_started_us) / 1000
+
+
+class BridgeTracer:
+    """
+    Samples bridge calls and keeps their spans.
+
+    Pass it as `OneSignal(tracer=...)`. Calls that are not sampled are sent
+    unchanged.
+
+    Args:
+        sample_rate: Fraction of calls to trace, from 0 to 1.
+        max_spans: Spans kept; the oldest are discarded first.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_spans: int = 10_000):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.spans: deque[BridgeSpan] = deque(maxlen=max_spans)
+        self._prefix = f"{os.getpid():x}{random.getrandbits(16):04x}"
+        self._ids = itertools.count(1)
+
+    def start(self) -> Optional[str]:
+        """Return a new trace id if this call is sampled, else `None`."""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return f"{self._prefix}-{next(self._ids)}"
+
+    def record(
+        self,
+        trace_id: str,
+        method: str,
+        priority: str,
+        queued_us: int,
+        sent_us: int,
+        returned_us: int,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> BridgeSpan:
+        """Store the span of a finished call, reading Dart times from its envelope."""
+        dart = result.get("trace") if isinstance(result, dict) else None
+        if not isinstance(dart, dict) or dart.get("id") != trace_id:
+            dart = {}
+        error_type = type(error).__name__ if error is not None else None
+        if isinstance(result, dict) and isinstance(result.get("error"), dict):
+            error_type = result["error"].get("type") or "error"
+        span = BridgeSpan(
+            trace_id=trace_id,
+            method=method,
+            priority=priority,
+            queued_us=queued_us,
+            sent_us=sent_us,
+            returned_us=returned_us,
+            dart_received_us=dart.get("received_us"),
+            dart_started_us=dart.get("started_us"),
+            dart_finished_us=dart.get("finished_us"),
+            error=error_type,
+        )
+        self.spans.append(span)
+        return span
+
+    def clear(self) -> None:
+        """Discard all spans."""
+        self.spans.clear()
+
+    def summary(self) -> dict[str, dict[str, Optional[float]]]:
+        """Mean breakdown per method in milliseconds, plus the call count.
+
+        The Dart-side means are `None` for methods without Dart timestamps.
+        """
+        grouped: dict[str, list[BridgeSpan]] = {}
+        for span in self.spans:
+            grouped.setdefault(span.method, []).append(span)
+
+        def mean(values: list[Optional[float]]) -> Optional[float]:
+            known = [v for v in values if v is not None]
+            return sum(known) / len(known) if known else None
+
+        return {
+            method: {
+                "calls": len(spans),
+                "total_ms": mean([s.total_ms for s in spans]),
+                "queue_ms": mean([s.queue_ms for s in spans]),
+                "transport_ms": mean([s.transport_ms for s in spans]),
+                "dart_queue_ms": mean([s.dart_queue_ms for s in spans]),
+                "sdk_ms": mean([s.sdk_ms for s in spans]),
+            }
+            for method, spans in sorted(grouped.items())
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Build a Chrome trace-event document (open in ``chrome://tracing`` or Perfetto).
+
+        Python and Dart are separate processes; overlapping calls are spread
+        over lanes (threads) so every call's slices stay nested.
+        """
+        events: list[dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": 1, "args": {"name": "Python"}},
+            {"ph": "M", "name": "process_name", "pid": 2, "args": {"name": "Dart"}},
+        ]
+        lanes: list[int] = []
+
+        def slice_(pid, lane, name, start, end, args=None):
+            event = {
+                "ph": "X",
+                "cat": "bridge",
+                "name": name,
+                "pid": pid,
+                "tid": lane,
+                "ts": start,
+                "dur": max(end - start, 0),
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        for span in sorted(self.spans, key=lambda s: s.queued_us):
+            lane = next((i for i, end in enumerate(lanes) if end <= span.queued_us), len(lanes))
+            if lane == len(lanes):
+                lanes.append(0)
+            lanes[lane] = span.returned_us
+
+            args = {
+                "trace_id": span.trace_id,
+                "priority": span.priority,
+                "queue_ms": round(span.queue_ms, 3),
+                "transport_ms": round(span.transport_ms, 3),
+            }
+            if span.has_dart_times:
+                args["dart_queue_ms"] = round(span.dart_queue_ms, 3)
+                args["sdk_ms"] = round(span.sdk_ms, 3)
+            if span.error:
+                args["error"] = span.error
+            slice_(1, lane, span.method, span.queued_us, span.returned_us, args)
+            slice_(1, lane, "queue", span.queued_us, span.sent_us)
+            slice_(1, lane, "bridge", span.sent_us, span.returned_us)
+
+            if span.has_dart_times:
+                # Place the Dart part in the middle of the transport time
+                shift = span.sent_us + round(span.transport_ms * 500) - span.dart_received_us
+                received = span.dart_received_us + shift
+                started = span.dart_started_us + shift
+                finished = span.dart_finished_us + shift
+                slice_(2, lane, span.method, received, finished, {"trace_id": span.trace_id})
+                slice_(2, lane, "dart_queue", received, started)
+                slice_(2, lane, "sdk", started, finished)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Union[str, Path]) -> Path:
+        """Write `to_chrome_trace()` to a JSON file and return its path."""
+        path = Path(path)
+        path.write_text(json.dumps(self.to_chrome_trace()))
+        return path
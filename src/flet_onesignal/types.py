@@ -5,9 +5,10 @@ This module defines all event types, enums, and data structures used
 throughout the flet-onesignal SDK.
 """
 
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import flet as ft
 
@@ -51,6 +52,90 @@ class OSLogLevel(Enum):
     """All messages including verbose details."""
 
 
+# -----------------------------------------------------------------------------
+# Event Coalescing
+# -----------------------------------------------------------------------------
+
+
+class OSCoalescePolicy(Enum):
+    """How bursts of a state event are delivered to Python.
+
+    Used with `OSEventCoalescing`.
+    """
+
+    NONE = "none"
+    """Deliver every event as soon as it happens (no coalescing)."""
+
+    LATEST = "latest"
+    """Deliver only the latest state at the end of each window."""
+
+    LIST = "list"
+    """Deliver the latest state at the end of each window, plus every distinct
+    state of the burst in the event's `states` list."""
+
+
+@dataclass
+class OSEventCoalescing:
+    """Coalescing settings for one state event type.
+
+    Bursts of permission, user and push subscription changes (e.g. during
+    login, logout or token refresh) are collected on the native side and
+    cross the bridge once per window. Consecutive identical states are
+    dropped, and a burst that ends in the state last delivered is not
+    delivered again.
+
+    Example:
+        ```python
+        onesignal = fos.OneSignal(
+            app_id="...",
+            event_coalescing={
+                "user_change": fos.OSEventCoalescing(window_ms=300),
+                "push_subscription_change": fos.OSEventCoalescing(
+                    policy=fos.OSCoalescePolicy.LIST
+                ),
+            },
+        )
+        ```
+    """
+
+    policy: OSCoalescePolicy = OSCoalescePolicy.LATEST
+    """How a burst is delivered."""
+
+    window_ms: int = 200
+    """Window in milliseconds, started by the first event of a burst."""
+
+
+COALESCIBLE_EVENTS = frozenset({"permission_change", "user_change", "push_subscription_change"})
+"""Event names accepted as keys of `OneSignal.event_coalescing`."""
+
+
+class OSCallPriority(Enum):
+    """Scheduling class of a bridge call. See `OneSignal.call_priority()`."""
+
+    INTERACTIVE = "interactive"
+    """User-facing calls (permission prompts, login); admitted before anything else."""
+
+    NORMAL = "normal"
+    """Default for calls without a class of their own."""
+
+    BACKGROUND = "background"
+    """Analytics-style calls (tags, outcomes); yield to other calls under load."""
+
+
+@dataclass
+class OSEventReplay:
+    """Result of `OneSignal.start_listening()`."""
+
+    replayed: int = 0
+    """Held events delivered to their handlers."""
+
+    duplicates: int = 0
+    """Held events skipped because their notification was already delivered."""
+
+    dropped: int = 0
+    """Events discarded natively because the buffer was full (oldest first)."""
+
+
 # -----------------------------------------------------------------------------
 # Notification Events
 # -----------------------------------------------------------------------------
@@ -79,6 +164,15 @@ class OSNotificationClickEvent(ft.Event["OneSignal"]):
     action_id: Optional[str] = None
     """The action button ID if the user tapped an action button, or `None`."""
 
+    notification_id: Optional[str] = None
+    """The notification ID."""
+
+    timestamp: Optional[float] = None
+    """Unix time in seconds when the native side received the click."""
+
+    replayed: bool = False
+    """`True` if the click was held natively until `OneSignal.start_listening()`."""
+
 
 @dataclass
 class OSNotificationWillDisplayEvent(ft.Event["OneSignal"]):
@@ -106,6 +200,83 @@ class OSNotificationWillDisplayEvent(ft.Event["OneSignal"]):
     notification_id: Optional[str] = None
     """The notification ID, used with `prevent_default()` and `display()`."""
 
+    rule_action: Optional[str] = None
+    """The action of the foreground rule that matched (`"display"`, `"suppress"` or
+    `"defer"`), already applied natively, or `None` if no rule matched.
+    See `OneSignalNotifications.set_foreground_rules()`."""
+
+    timestamp: Optional[float] = None
+    """Unix time in seconds when the native side received the notification."""
+
+    replayed: bool = False
+    """`True` if the event was held natively until `OneSignal.start_listening()`.
+    The notification has then already been displayed (or suppressed by a rule)."""
+
+
+class OSForegroundAction(Enum):
+    """What a foreground rule does with a matching notification."""
+
+    DISPLAY = "display"
+    """Show the notification (the SDK default)."""
+
+    SUPPRESS = "suppress"
+    """Do not show the notification."""
+
+    DEFER = "defer"
+    """Hold the notification; call `notifications.display()` to show it later."""
+
+
+@dataclass
+class OSForegroundRule:
+    """A foreground display rule, evaluated natively when a notification arrives.
+
+    Every condition that is set must match; a rule without conditions matches
+    every notification. Used with `OneSignalNotifications.set_foreground_rules()`.
+
+    Example:
+        ```python
+        fos.OSForegroundRule(fos.OSForegroundAction.SUPPRESS, data_key="silent")
+        fos.OSForegroundRule(fos.OSForegroundAction.DEFER, title_pattern=r"^Chat: ")
+        ```
+    """
+
+    action: OSForegroundAction
+    """What to do with a matching notification."""
+
+    data_key: Optional[str] = None
+    """Match notifications whose additional data has this key."""
+
+    data_value: Optional[str] = None
+    """With `data_key`, also require this value (compared as text)."""
+
+    collapse_id: Optional[str] = None
+    """Match this collapse ID (Android)."""
+
+    category: Optional[str] = None
+    """Match this notification category (iOS)."""
+
+    title_pattern: Optional[str] = None
+    """Regular expression searched in the title. It runs on Dart's `RegExp`, so
+    stick to syntax that Python and Dart share."""
+
+    def __post_init__(self):
+        self.action = OSForegroundAction(self.action)
+        if self.data_value is not None and self.data_key is None:
+            raise ValueError("data_value requires data_key")
+        if self.title_pattern is not None:
+            try:
+                re.compile(self.title_pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid title_pattern {self.title_pattern!r}: {e}") from e
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the rule for the Dart side, omitting unset conditions."""
+        rule = {f.name: getattr(self, f.name) for f in fields(self)}
+        rule["action"] = self.action.value
+        if rule["data_value"] is not None:
+            rule["data_value"] = str(rule["data_value"])
+        return {k: v for k, v in rule.items() if v is not None}
+
 
 @dataclass
 class OSPermissionChangeEvent(ft.Event["OneSignal"]):
@@ -114,6 +285,9 @@ class OSPermissionChangeEvent(ft.Event["OneSignal"]):
     permission: bool = False
     """`True` if notifications are now permitted, `False` otherwise."""
 
+    states: Optional[list[dict]] = None
+    """Every distinct state of a coalesced burst (`OSCoalescePolicy.LIST` only)."""
+
 
 # -----------------------------------------------------------------------------
 # User Events
@@ -141,6 +315,9 @@ class OSUserChangedEvent(ft.Event["OneSignal"]):
     external_id: Optional[str] = None
     """The external user ID set via `login()`."""
 
+    states: Optional[list[dict]] = None
+    """Every distinct state of a coalesced burst (`OSCoalescePolicy.LIST` only)."""
+
     @property
     def state(self) -> OSUserState:
         """Get the user state as an OSUserState object."""
@@ -163,6 +340,9 @@ class OSPushSubscriptionChangedEvent(ft.Event["OneSignal"]):
     opted_in: bool = False
     """`True` if the user is opted in to push notifications."""
 
+    states: Optional[list[dict]] = None
+    """Every distinct state of a coalesced burst (`OSCoalescePolicy.LIST` only)."""
+
 
 # -----------------------------------------------------------------------------
 # In-App Message Events
@@ -213,6 +393,12 @@ class OSInAppMessageClickEvent(ft.Event["OneSignal"]):
     closing_message: bool = False
     """`True` if the click action closes the in-app message."""
 
+    timestamp: Optional[float] = None
+    """Unix time in seconds when the native side received the click."""
+
+    replayed: bool = False
+    """`True` if the click was held natively until `OneSignal.start_listening()`."""
+
     @property
     def result(self) -> OSInAppMessageClickResult:
         """Get the click result as an OSInAppMessageClickResult object."""
@@ -256,6 +442,78 @@ class OSInAppMessageDidDismissEvent(ft.Event["OneSignal"]):
     """The in-app message payload."""
 
 
+# -----------------------------------------------------------------------------
+# State Snapshot
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class OSStateSnapshot:
+    """SDK state read in a single call with `OneSignal.snapshot()`.
+
+    Fields that were not requested or could not be read are `None`. The
+    names of fields that could not be read are keys of `errors`.
+
+    Example:
+        ```python
+        state = await onesignal.snapshot()
+        print(state.onesignal_id, state.push_opted_in, state.tags)
+
+        # Only what the screen needs
+        state = await onesignal.snapshot(fields=["notification_permission", "iam_paused"])
+        ```
+    """
+
+    onesignal_id: Optional[str] = None
+    """The OneSignal-generated user ID."""
+
+    external_id: Optional[str] = None
+    """The external user ID set via `login()`."""
+
+    tags: Optional[dict[str, str]] = None
+    """The current user's tags."""
+
+    push_subscription_id: Optional[str] = None
+    """The push subscription ID."""
+
+    push_subscription_token: Optional[str] = None
+    """The push token (FCM/APNs)."""
+
+    push_opted_in: Optional[bool] = None
+    """Whether the user is opted in to push notifications."""
+
+    notification_permission: Optional[bool] = None
+    """Whether notification permission is granted."""
+
+    iam_paused: Optional[bool] = None
+    """Whether in-app messages are paused."""
+
+    location_shared: Optional[bool] = None
+    """Whether location is shared with OneSignal."""
+
+    errors: dict[str, str] = field(default_factory=dict)
+    """Error message per field that could not be read."""
+
+    @classmethod
+    def field_names(cls) -> tuple[str, ...]:
+        """Names of the state fields that can be requested."""
+        return tuple(f.name for f in fields(cls) if f.name != "errors")
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OSStateSnapshot":
+        """Build a snapshot from the Dart side's result, ignoring unknown keys."""
+        values = {name: data.get(name) for name in cls.field_names()}
+        # The SDK reports missing IDs as empty strings
+        for name in (
+            "onesignal_id",
+            "external_id",
+            "push_subscription_id",
+            "push_subscription_token",
+        ):
+            values[name] = values[name] or None
+        return cls(**values, errors=dict(data.get("errors") or {}))
+
+
 # -----------------------------------------------------------------------------
 # Error Event
 # -----------------------------------------------------------------------------
@@ -1,29 +1,95 @@
-"""Rich-based UI helpers for fos-build CLI output.
+"""UI helpers for fos-build CLI output.
 
-Requires the 'cli' extra: pip install flet-onesignal[cli]
+Human-readable output uses Rich and requires the 'cli' extra:
+pip install flet-onesignal[cli]
+
+With ``set_output("ndjson")`` every helper emits one JSON event per line on
+stdout instead (phase start/end with timings, injected files, artifacts and
+the exit status); ``set_output("json")`` collects the same events and prints
+a single JSON document when ``finish()`` is called, so watch mode, which
+only finishes on Ctrl+C, accepts ndjson only. Neither mode needs Rich.
 """
 
+import json
+import sys
+import time
+from typing import Optional
+
 try:
     from rich.console import Console
     from rich.panel import Panel
+    from rich.table import Table
 
     console = Console()
 except ImportError:
-    import sys
-
-    print(
-        "ERROR: 'rich' is required for fos-build.\n"
-        "Install it with:\n"
-        "  uv add flet-onesignal[cli]\n"
-        "  pip install flet-onesignal[cli]\n"
-        "  poetry add flet-onesignal[cli]",
-        file=sys.stderr,
-    )
-    sys.exit(1)
+    console = None
+
+OUTPUT_FORMATS = ("text", "json", "ndjson")
+
+_output = "text"
+_events: list[dict] = []
+_phase: Optional[dict] = None
+_started = time.monotonic()
+
+
+def set_output(fmt: str):
+    """Select the output format ('text', 'json' or 'ndjson')."""
+    global _output
+
+    if fmt == "text" and console is None:
+        print(
+            "ERROR: 'rich' is required for fos-build.\n"
+            "Install it with:\n"
+            "  uv add flet-onesignal[cli]\n"
+            "  pip install flet-onesignal[cli]\n"
+            "  poetry add flet-onesignal[cli]\n"
+            "Or use --output json / --output ndjson.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    _output = fmt
+
+
+def machine_readable() -> bool:
+    """Check if output is JSON/NDJSON rather than human-readable text."""
+    return _output != "text"
+
+
+def subprocess_stdout():
+    """Where child processes (flet build) should write their stdout.
+
+    In machine-readable modes stdout is reserved for events, so child output
+    goes to stderr.
+    """
+    return sys.stderr if machine_readable() else None
+
+
+def _emit(event: str, **data):
+    """Emit (ndjson) or record (json) a machine-readable event."""
+    record = {"event": event, "time": round(time.time(), 3), **data}
+    if _output == "ndjson":
+        print(json.dumps(record), flush=True)
+    else:
+        _events.append(record)
+
+
+def _end_phase():
+    """Emit phase_end for the running step, if any."""
+    global _phase
+
+    if _phase is not None:
+        duration = round(time.monotonic() - _phase["started"], 3)
+        _emit("phase_end", step=_phase["step"], message=_phase["message"], duration=duration)
+        _phase = None
 
 
 def header():
     """Print the FOS Build header panel."""
+    if machine_readable():
+        _emit("start")
+        return
+
     console.print()
     console.print(
         Panel(
@@ -35,16 +101,33 @@ def header():
 
 def info(label: str, value: str):
     """Print an info line: 'ℹ label: value'."""
+    if machine_readable():
+        _emit("info", label=label, value=value)
+        return
+
     console.print(f"[cyan]ℹ {label}:[/] {value}")
 
 
 def step(n: int, msg: str):
     """Print a step indicator: '▶ Step N: msg'."""
+    global _phase
+
+    if machine_readable():
+        _end_phase()
+        _phase = {"step": n, "message": msg, "started": time.monotonic()}
+        _emit("phase_start", step=n, message=msg)
+        return
+
     console.print(f"\n[bold yellow]▶ Step {n}:[/] {msg}\n")
 
 
 def success_panel(build_type: str, output_dir: str | None, next_steps: list[str]):
     """Print a green success panel with output location and next steps."""
+    if machine_readable():
+        _end_phase()
+        _emit("success", build_type=build_type, output_dir=output_dir)
+        return
+
     lines = ["[bold green]✓ BUILD SUCCESSFUL![/]"]
 
     if output_dir:
@@ -61,6 +144,11 @@ def success_panel(build_type: str, output_dir: str | None, next_steps: list[str]
 
 def error_panel(title: str, body: str):
     """Print a red error panel with title and body."""
+    if machine_readable():
+        _end_phase()
+        _emit("error", title=title, message=body.strip())
+        return
+
     content = f"[bold red]✗ {title}[/]\n\n{body}"
     console.print()
     console.print(Panel(content, title="ERROR", style="red"))
@@ -68,6 +156,11 @@ def error_panel(title: str, body: str):
 
 def failure_panel(tips: list[str]):
     """Print a red failure panel with tips."""
+    if machine_readable():
+        _end_phase()
+        _emit("failure")
+        return
+
     lines = ["[bold red]✗ BUILD FAILED[/]", "\n  Check the error messages above for details."]
 
     if tips:
@@ -81,14 +174,120 @@ def failure_panel(tips: list[str]):
 
 def warning(msg: str):
     """Print a yellow warning message."""
+    if machine_readable():
+        _emit("warning", message=msg)
+        return
+
     console.print(f"[yellow]⚠ {msg}[/]")
 
 
-def modified(msg: str):
-    """Print a green checkmark for modified/copied files."""
+def modified(msg: str, **data):
+    """Print a green checkmark for modified/copied files.
+
+    Keyword arguments (e.g. ``dependency=``, ``file=``) are only included in
+    machine-readable events.
+    """
+    if machine_readable():
+        _emit("modified", message=msg, **data)
+        return
+
     console.print(f"  [green]✓ {msg}[/]")
 
 
 def build_info(msg: str):
     """Print a build phase info line (e.g., 'Building APK...')."""
+    if machine_readable():
+        _emit("build", message=msg)
+        return
+
     console.print(f"\n[bold]{msg}[/]\n")
+
+
+def artifact(path: str, size: int):
+    """Print the path and size of a build artifact."""
+    if machine_readable():
+        _emit("artifact", path=path, size=size)
+        return
+
+    console.print(f"[cyan]ℹ Artifact:[/] {path} ({format_bytes(size)})")
+
+
+def rebuild(status: int, changed: list[str]):
+    """Report the outcome of a watch-mode rebuild (machine-readable modes only).
+
+    Text output already shows the success or failure panel of the build.
+    """
+    if not machine_readable():
+        return
+
+    _end_phase()
+    _emit("rebuild", status=status, changed=changed)
+
+
+def finish(status: int):
+    """Report the exit status. In 'json' mode, print all collected events."""
+    _end_phase()
+    if not machine_readable():
+        return
+
+    duration = round(time.monotonic() - _started, 3)
+    _emit("exit", status=status, duration=duration)
+
+    if _output == "json":
+        print(json.dumps({"status": status, "duration": duration, "events": _events}, indent=2))
+
+
+def format_bytes(n: int) -> str:
+    """Format a byte count as a human-readable string."""
+    size = float(abs(n))
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def size_report(artifact: str, components: list, threshold: float):
+    """Print a per-component size table for a build artifact.
+
+    Components that grew more than ``threshold`` percent are highlighted.
+    """
+    if machine_readable():
+        _emit(
+            "size_report",
+            artifact=artifact,
+            threshold=threshold,
+            components=[
+                {
+                    "name": c.name,
+                    "compressed": c.compressed,
+                    "uncompressed": c.uncompressed,
+                    "delta": c.delta,
+                    "over_threshold": c.grew_over(threshold),
+                }
+                for c in components
+            ],
+        )
+        return
+
+    table = Table(title=f"Size breakdown: {artifact}", title_style="bold")
+    table.add_column("Component")
+    table.add_column("Size", justify="right")
+    table.add_column("Uncompressed", justify="right")
+    table.add_column("Δ previous", justify="right")
+
+    for c in components:
+        if c.delta is None:
+            delta = "[dim]—[/]"
+        elif c.grew_over(threshold):
+            delta = f"[bold red]+{format_bytes(c.delta)}[/]"
+        elif c.delta > 0:
+            delta = f"[yellow]+{format_bytes(c.delta)}[/]"
+        elif c.delta < 0:
+            delta = f"[green]-{format_bytes(c.delta)}[/]"
+        else:
+            delta = "[dim]0[/]"
+        table.add_row(c.name, format_bytes(c.compressed), format_bytes(c.uncompressed), delta)
+
+    console.print()
+    console.print(table)
@@ -2,7 +2,6 @@
 OneSignal User module for flet-onesignal.
 """
 
-import json
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
@@ -113,14 +112,7 @@ class OneSignalUser:
             "user_get_tags",
             timeout=timeout,
         )
-        if isinstance(result, str):
-            try:
-                return json.loads(result)
-            except json.JSONDecodeError:
-                return {}
-        if isinstance(result, dict):
-            return result
-        return {}
+        return dict(result) if isinstance(result, dict) else {}
 
     # -------------------------------------------------------------------------
     # Aliases
@@ -307,4 +299,4 @@ class OneSignalUser:
             "user_is_push_opted_in",
             timeout=timeout,
         )
-        return result == "true"
+        return result is True
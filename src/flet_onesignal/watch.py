@@ -0,0 +1,122 @@
+"""
+Watch mode for fos-build.
+
+Watches the project's Python sources and pyproject.toml and calls a rebuild
+callback with the set of changed files once edits settle.
+
+Every rebuild is a full ``flet build`` run: flet has no entry point that
+repackages only the Python app. Watch mode saves the manual restart and, for
+Python-only edits, the OneSignal configuration pass; Gradle's own daemon and
+incremental compilation are what keep the repeated builds from starting cold.
+
+Requires the 'cli' extra (watchdog): pip install flet-onesignal[cli]
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+WATCHED_SUFFIXES = {".py", ".toml"}
+"""File suffixes that trigger a rebuild."""
+
+IGNORED_DIRS = {"build", "dist", "storage", "__pycache__", ".git", ".venv", "venv"}
+"""Directory names whose contents never trigger a rebuild (includes build output)."""
+
+DEBOUNCE_SECONDS = 1.0
+"""Quiet period after the last change before a rebuild starts."""
+
+
+def is_watched(path: Path, project_root: Path) -> bool:
+    """Check if a changed file should trigger a rebuild."""
+    try:
+        parts = path.relative_to(project_root).parts
+    except ValueError:
+        return False
+
+    if any(part in IGNORED_DIRS or part.startswith(".") for part in parts[:-1]):
+        return False
+
+    return path.suffix in WATCHED_SUFFIXES
+
+
+def needs_reconfigure(changed: set[Path], project_root: Path) -> bool:
+    """Check if the changes require re-applying the OneSignal configuration.
+
+    Only pyproject.toml affects gradle injection. Python-only edits are
+    rebuilt with a single full ``flet build`` pass, without the OneSignal
+    configuration pass.
+    """
+    return project_root / "pyproject.toml" in changed
+
+
+class _ChangeCollector:
+    """watchdog event handler that accumulates changed paths."""
+
+    def __init__(self, project_root: Path):
+        self._project_root = project_root
+        self._lock = threading.Lock()
+        self._changed: set[Path] = set()
+        self._last_change = 0.0
+        self.pending = threading.Event()
+
+    def dispatch(self, event) -> None:
+        if event.is_directory:
+            return
+
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        for raw in filter(None, paths):
+            path = Path(raw)
+            if is_watched(path, self._project_root):
+                with self._lock:
+                    self._changed.add(path)
+                    self._last_change = time.monotonic()
+                self.pending.set()
+
+    def quiet_for(self) -> float:
+        """Seconds since the last relevant change."""
+        with self._lock:
+            return time.monotonic() - self._last_change
+
+    def drain(self) -> set[Path]:
+        """Return and reset the accumulated changes."""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            self.pending.clear()
+        return changed
+
+
+def watch_project(
+    project_root: Path,
+    rebuild: Callable[[set[Path]], None],
+    debounce: float = DEBOUNCE_SECONDS,
+) -> None:
+    """Block and call ``rebuild(changed)`` whenever watched files change.
+
+    Changes made while a rebuild is running are batched into the next one.
+    Returns on KeyboardInterrupt.
+
+    Raises:
+        ImportError: If watchdog is not installed.
+    """
+    from watchdog.observers import Observer
+
+    collector = _ChangeCollector(project_root)
+    observer = Observer()
+    observer.schedule(collector, str(project_root), recursive=True)
+    observer.start()
+
+    try:
+        while True:
+            collector.pending.wait()
+
+            # Debounce: editors often write several files (or one file twice)
+            while (remaining := debounce - collector.quiet_for()) > 0:
+                time.sleep(remaining)
+
+            rebuild(collector.drain())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+        observer.join()
@@ -1,6 +1,9 @@
+import 'dart:async';
+import 'dart:collection';
 import 'dart:convert';
 import 'package:flet/flet.dart';
 import 'package:flutter/foundation.dart';
+import 'package:flutter/services.dart';
 import 'package:onesignal_flutter/onesignal_flutter.dart';
 import 'package:permission_handler/permission_handler.dart';
 
@@ -11,20 +14,44 @@ import 'package:permission_handler/permission_handler.dart';
 class OneSignalService extends FletService {
   OneSignalService({required super.control});
 
+  /// Version of the result envelope returned to Python; bump it when the
+  /// envelope shape changes (`BRIDGE_PROTOCOL_VERSION` on the Python side).
+  static const int resultVersion = 1;
+
   bool _initialized = false;
   bool _listenersSetup = false;
 
+  /// Foreground display rules set from Python; the first matching rule wins.
+  List<_ForegroundRule> _foregroundRules = const [];
+
+  /// Coalescers for state events, keyed by event name (from `event_coalescing`).
+  final Map<String, _EventCoalescer> _coalescers = {};
+  String? _coalescingConfig;
+
+  /// Events held until Python calls `events_listen`, so a click that launches
+  /// the app is not lost before the Python handlers are ready.
+  static const Set<String> _replayableEvents = {
+    "notification_click",
+    "notification_foreground",
+    "iam_click",
+  };
+  bool _listening = false;
+  final ListQueue<Map<String, dynamic>> _pendingEvents = ListQueue();
+  int _droppedEvents = 0;
+
   @override
   void init() {
     super.init();
     debugPrint("OneSignalService.init: type=${control.type}, app_id=${control.getString("app_id")}");
     control.addInvokeMethodListener(_onInvokeMethod);
+    _configureCoalescing();
     _initializeOneSignal();
   }
 
   @override
   Future<void> update() async {
     // Handle property updates if needed
+    _configureCoalescing();
     final appId = control.getString("app_id");
     if (appId != null && !_initialized) {
       _initializeOneSignal();
@@ -33,10 +60,89 @@ class OneSignalService extends FletService {
 
   @override
   void dispose() {
-    // Cleanup listeners if needed
+    for (final coalescer in _coalescers.values) {
+      coalescer.dispose();
+    }
+    _coalescers.clear();
     super.dispose();
   }
 
+  /// (Re)build the event coalescers from the `event_coalescing` property.
+  ///
+  /// The property maps an event name to `{"policy": "latest" | "list" | "none",
+  /// "window_ms": int}`. Pending states are flushed before reconfiguring.
+  void _configureCoalescing() {
+    final config = control.get("event_coalescing");
+    final encoded = config == null ? null : jsonEncode(config);
+    if (encoded == _coalescingConfig) return;
+    _coalescingConfig = encoded;
+
+    for (final coalescer in _coalescers.values) {
+      coalescer.flush();
+      coalescer.dispose();
+    }
+    _coalescers.clear();
+
+    if (config is! Map) return;
+    config.forEach((event, options) {
+      if (options is! Map) return;
+      final policy = options["policy"] as String? ?? "latest";
+      if (policy == "none") return;
+      final windowMs = (options["window_ms"] as num?)?.toInt() ?? 200;
+      _coalescers[event as String] = _EventCoalescer(
+        window: Duration(milliseconds: windowMs),
+        keepAll: policy == "list",
+        emit: (payload) => _triggerStateEvent(event, payload),
+      );
+    });
+    debugPrint("OneSignalService._configureCoalescing: ${_coalescers.keys.toList()}");
+  }
+
+  /// Send a state event to Python, through its coalescer if one is configured.
+  void _emitStateEvent(String event, Map<String, dynamic> state) {
+    final coalescer = _coalescers[event];
+    if (coalescer != null) {
+      coalescer.add(state);
+    } else {
+      _triggerStateEvent(event, state);
+    }
+  }
+
+  /// Send a click/display event to Python, or hold it in a bounded ring
+  /// (oldest dropped first) until Python starts listening.
+  void _sendEvent(String event, Map<String, dynamic> payload) {
+    payload["timestamp"] = DateTime.now().millisecondsSinceEpoch / 1000;
+    final capacity = control.getInt("event_buffer_size", 32)!;
+    if (_listening || capacity <= 0 || !_replayableEvents.contains(event)) {
+      control.triggerEvent(event, payload);
+      return;
+    }
+    _pendingEvents.add({"event": event, "data": payload});
+    while (_pendingEvents.length > capacity) {
+      _pendingEvents.removeFirst();
+      _droppedEvents++;
+    }
+    debugPrint("OneSignalService._sendEvent: buffered $event (${_pendingEvents.length} pending)");
+  }
+
+  /// Start sending events live and return the held ones in one message.
+  Map<String, dynamic> _eventsListen() {
+    _listening = true;
+    final result = {"events": _pendingEvents.toList(), "dropped": _droppedEvents};
+    _pendingEvents.clear();
+    _droppedEvents = 0;
+    debugPrint("OneSignalService._eventsListen: replaying ${(result["events"] as List).length} events");
+    return result;
+  }
+
+  void _triggerStateEvent(String event, Map<String, dynamic> payload) {
+    try {
+      control.triggerEvent(event, payload);
+    } catch (error, stackTrace) {
+      _handleError("${event}_listener", error, stackTrace);
+    }
+  }
+
   /// Initialize the OneSignal SDK with the app ID.
   void _initializeOneSignal() {
     final appId = control.getString("app_id");
@@ -87,8 +193,9 @@ class OneSignalService extends FletService {
     // Notification click listener
     OneSignal.Notifications.addClickListener((event) {
       try {
-        control.triggerEvent("notification_click", {
+        _sendEvent("notification_click", {
           "notification": event.notification.jsonRepresentation(),
+          "notification_id": event.notification.notificationId,
           "action_id": event.result.actionId,
         });
       } catch (error, stackTrace) {
@@ -99,9 +206,17 @@ class OneSignalService extends FletService {
     // Notification foreground will display listener
     OneSignal.Notifications.addForegroundWillDisplayListener((event) {
       try {
-        control.triggerEvent("notification_foreground", {
+        debugPrint(
+            "OneSignalService.notification_foreground: notification_id=${event.notification.notificationId}");
+        // Rules run here, inside the SDK's display window, without a round trip
+        final rule = _matchForegroundRule(event.notification);
+        if (rule != null && rule.action != "display") {
+          event.preventDefault();
+        }
+        _sendEvent("notification_foreground", {
           "notification": event.notification.jsonRepresentation(),
           "notification_id": event.notification.notificationId,
+          "rule_action": rule?.action,
         });
       } catch (error, stackTrace) {
         _handleError("notification_foreground_listener", error, stackTrace);
@@ -110,44 +225,36 @@ class OneSignalService extends FletService {
 
     // Permission change listener
     OneSignal.Notifications.addPermissionObserver((permission) {
-      try {
-        control.triggerEvent("permission_change", {"permission": permission});
-      } catch (error, stackTrace) {
-        _handleError("permission_change_listener", error, stackTrace);
-      }
+      _emitStateEvent("permission_change", {"permission": permission});
     });
 
     // User state change listener
     OneSignal.User.addObserver((state) {
-      try {
-        control.triggerEvent("user_change", {
-          "onesignal_id": state.current.onesignalId,
-          "external_id": state.current.externalId,
-        });
-      } catch (error, stackTrace) {
-        _handleError("user_change_listener", error, stackTrace);
-      }
+      _emitStateEvent("user_change", {
+        "onesignal_id": state.current.onesignalId,
+        "external_id": state.current.externalId,
+      });
     });
 
     // Push subscription change listener
     OneSignal.User.pushSubscription.addObserver((state) {
-      try {
-        control.triggerEvent("push_subscription_change", {
-          "id": state.current.id,
-          "token": state.current.token,
-          "opted_in": state.current.optedIn,
-        });
-      } catch (error, stackTrace) {
-        _handleError("push_subscription_change_listener", error, stackTrace);
-      }
+      _emitStateEvent("push_subscription_change", {
+        "id": state.current.id,
+        "token": state.current.token,
+        "opted_in": state.current.optedIn,
+      });
     });
 
     // In-App Message listeners
     OneSignal.InAppMessages.addClickListener((event) {
       try {
-        control.triggerEvent("iam_click", {
+        _sendEvent("iam_click", {
           "message": jsonDecode(event.message.jsonRepresentation()),
           "result": jsonDecode(event.result.jsonRepresentation()),
+          "action_id": event.result.actionId,
+          "url": event.result.url,
+          "url_target": event.result.urlTarget,
+          "closing_message": event.result.closingMessage,
         });
       } catch (error, stackTrace) {
         _handleError("iam_click_listener", error, stackTrace);
@@ -198,7 +305,32 @@ class OneSignalService extends FletService {
   }
 
   /// Handle method invocations from Python.
-  Future<dynamic> _onInvokeMethod(String methodName, dynamic args) async {
+  ///
+  /// Results are native values (bool, num, String, List, Map) wrapped in a
+  /// versioned envelope: `{"v": 1, "value": result}`, or
+  /// `{"v": 1, "error": {"type": ..., "message": ...}}` when the call fails
+  /// (plus `"code"` for a `PlatformException`).
+  ///
+  /// When the arguments carry a `"_trace"` id, the envelope also gets a
+  /// `"trace"` entry with the receive, start and finish times of the call in
+  /// microseconds since the epoch.
+  Future<Map<String, dynamic>> _onInvokeMethod(String methodName, dynamic args) async {
+    final stopwatch = Stopwatch()..start();
+    final receivedUs = DateTime.now().microsecondsSinceEpoch;
+    Object? traceId;
+    int? startedUs;
+    Map<String, dynamic> withTrace(Map<String, dynamic> envelope) {
+      if (traceId != null) {
+        envelope["trace"] = {
+          "id": traceId,
+          "received_us": receivedUs,
+          "started_us": startedUs ?? receivedUs,
+          "finished_us": DateTime.now().microsecondsSinceEpoch,
+        };
+      }
+      return envelope;
+    }
+
     try {
       // Convert args to Map<String, dynamic> properly
       // args can come as _Map<dynamic, dynamic> from Flet
@@ -206,13 +338,18 @@ class OneSignalService extends FletService {
       if (args != null && args is Map) {
         arguments = Map<String, dynamic>.from(args);
       }
+      traceId = arguments.remove("_trace");
       debugPrint("OneSignalService._onInvokeMethod: method=$methodName, args=$arguments");
 
-      return switch (methodName) {
+      startedUs = DateTime.now().microsecondsSinceEpoch;
+
+      final result = switch (methodName) {
         // Main methods
         "login" => await _login(arguments),
         "logout" => await _logout(),
         "consent_given" => await _consentGiven(arguments),
+        "state_snapshot" => await _stateSnapshot(arguments),
+        "events_listen" => _eventsListen(),
 
         // Debug methods
         "debug_set_log_level" => _setLogLevel(arguments["level"]),
@@ -251,6 +388,7 @@ class OneSignalService extends FletService {
         "notifications_remove_grouped" => await _notificationsRemoveGrouped(arguments),
         "notifications_prevent_default" => _notificationsPreventDefault(arguments),
         "notifications_display" => _notificationsDisplay(arguments),
+        "notifications_set_foreground_rules" => _notificationsSetForegroundRules(arguments),
 
         // In-App Message methods
         "iam_add_trigger" => _iamAddTrigger(arguments),
@@ -281,9 +419,19 @@ class OneSignalService extends FletService {
 
         _ => throw Exception("Unknown OneSignal method: $methodName"),
       };
+      debugPrint(
+          "OneSignalService._onInvokeMethod: method=$methodName done in ${stopwatch.elapsedMicroseconds}us");
+      return withTrace({"v": resultVersion, "value": result});
     } catch (error, stackTrace) {
       _handleError(methodName, error, stackTrace);
-      return null;
+      return withTrace({
+        "v": resultVersion,
+        "error": {
+          "type": error.runtimeType.toString(),
+          "message": error is PlatformException ? (error.message ?? error.code) : error.toString(),
+          if (error is PlatformException) "code": error.code,
+        },
+      });
     }
   }
 
@@ -310,6 +458,46 @@ class OneSignalService extends FletService {
     return null;
   }
 
+  /// Readers for `state_snapshot`, keyed by the Python `OSStateSnapshot` field.
+  static final Map<String, Future<dynamic> Function()> _snapshotReaders = {
+    "onesignal_id": () => OneSignal.User.getOnesignalId(),
+    "external_id": () => OneSignal.User.getExternalId(),
+    "tags": () => OneSignal.User.getTags(),
+    "push_subscription_id": () async => OneSignal.User.pushSubscription.id,
+    "push_subscription_token": () async => OneSignal.User.pushSubscription.token,
+    "push_opted_in": () async => OneSignal.User.pushSubscription.optedIn,
+    "notification_permission": () async => OneSignal.Notifications.permission,
+    "iam_paused": () => OneSignal.InAppMessages.arePaused(),
+    "location_shared": () => OneSignal.Location.isShared(),
+  };
+
+  /// Read several state values concurrently and return them as one map.
+  ///
+  /// A failing reader does not fail the snapshot: its field is null and the
+  /// error message is reported under "errors".
+  Future<Map<String, dynamic>> _stateSnapshot(Map<String, dynamic> args) async {
+    final requested = (args["fields"] as List?)?.cast<String>();
+    final names = requested ?? _snapshotReaders.keys.toList();
+    final snapshot = <String, dynamic>{};
+    final errors = <String, String>{};
+
+    await Future.wait(names.map((name) async {
+      final reader = _snapshotReaders[name];
+      if (reader == null) {
+        errors[name] = "Unknown snapshot field";
+        return;
+      }
+      try {
+        snapshot[name] = await reader();
+      } catch (error) {
+        errors[name] = error.toString();
+      }
+    }));
+
+    snapshot["errors"] = errors;
+    return snapshot;
+  }
+
   // ---------------------------------------------------------------------------
   // Debug methods
   // ---------------------------------------------------------------------------
@@ -388,11 +576,10 @@ class OneSignalService extends FletService {
     return null;
   }
 
-  Future<String?> _userGetTags() async {
+  Future<Map<String, String>> _userGetTags() async {
     final tags = await OneSignal.User.getTags();
-    final result = jsonEncode(tags);
-    debugPrint("OneSignalService._userGetTags: result=$result");
-    return result;
+    debugPrint("OneSignalService._userGetTags: result=$tags");
+    return tags;
   }
 
   Future<String?> _userAddAlias(Map<String, dynamic> args) async {
@@ -487,32 +674,29 @@ class OneSignalService extends FletService {
     return OneSignal.User.pushSubscription.token;
   }
 
-  String _userIsPushOptedIn() {
-    return OneSignal.User.pushSubscription.optedIn.toString();
+  bool _userIsPushOptedIn() {
+    return OneSignal.User.pushSubscription.optedIn ?? false;
   }
 
   // ---------------------------------------------------------------------------
   // Notification methods
   // ---------------------------------------------------------------------------
 
-  Future<String> _notificationsRequestPermission(Map<String, dynamic> args) async {
+  Future<bool> _notificationsRequestPermission(Map<String, dynamic> args) async {
     final fallbackToSettings = args["fallback_to_settings"] as bool? ?? true;
-    final result = await OneSignal.Notifications.requestPermission(fallbackToSettings);
-    return result.toString();
+    return await OneSignal.Notifications.requestPermission(fallbackToSettings);
   }
 
-  Future<String> _notificationsCanRequestPermission() async {
-    final result = await OneSignal.Notifications.canRequest();
-    return result.toString();
+  Future<bool> _notificationsCanRequestPermission() async {
+    return await OneSignal.Notifications.canRequest();
   }
 
-  String _notificationsGetPermission() {
-    return OneSignal.Notifications.permission.toString();
+  bool _notificationsGetPermission() {
+    return OneSignal.Notifications.permission;
   }
 
-  Future<String> _notificationsRegisterProvisional() async {
-    final result = await OneSignal.Notifications.registerForProvisionalAuthorization(true);
-    return result.toString();
+  Future<bool> _notificationsRegisterProvisional() async {
+    return await OneSignal.Notifications.registerForProvisionalAuthorization(true);
   }
 
   Future<String?> _notificationsClearAll() async {
@@ -552,6 +736,22 @@ class OneSignalService extends FletService {
     return null;
   }
 
+  String? _notificationsSetForegroundRules(Map<String, dynamic> args) {
+    final rules = (args["rules"] as List?) ?? const [];
+    _foregroundRules = rules
+        .map((rule) => _ForegroundRule.fromMap(Map<String, dynamic>.from(rule as Map)))
+        .toList();
+    debugPrint("OneSignalService._notificationsSetForegroundRules: ${_foregroundRules.length} rules");
+    return null;
+  }
+
+  _ForegroundRule? _matchForegroundRule(OSNotification notification) {
+    for (final rule in _foregroundRules) {
+      if (rule.matches(notification)) return rule;
+    }
+    return null;
+  }
+
   // ---------------------------------------------------------------------------
   // In-App Message methods
   // ---------------------------------------------------------------------------
@@ -600,24 +800,23 @@ class OneSignalService extends FletService {
     return null;
   }
 
-  Future<String> _iamIsPaused() async {
-    final result = await OneSignal.InAppMessages.arePaused();
-    return result.toString();
+  Future<bool> _iamIsPaused() async {
+    return await OneSignal.InAppMessages.arePaused();
   }
 
   // ---------------------------------------------------------------------------
   // Location methods
   // ---------------------------------------------------------------------------
 
-  Future<String> _locationRequestPermission() async {
+  Future<bool> _locationRequestPermission() async {
     await OneSignal.Location.requestPermission();
     final status = await Permission.location.status;
-    return status.isGranted.toString();
+    return status.isGranted;
   }
 
-  Future<String> _locationGetPermission() async {
+  Future<bool> _locationGetPermission() async {
     final status = await Permission.location.status;
-    return status.isGranted.toString();
+    return status.isGranted;
   }
 
   Future<String?> _locationSetShared(Map<String, dynamic> args) async {
@@ -626,9 +825,8 @@ class OneSignalService extends FletService {
     return null;
   }
 
-  Future<String> _locationIsShared() async {
-    final shared = await OneSignal.Location.isShared();
-    return shared.toString();
+  Future<bool> _locationIsShared() async {
+    return await OneSignal.Location.isShared();
   }
 
   // ---------------------------------------------------------------------------
@@ -723,4 +921,85 @@ class OneSignalService extends FletService {
       "stack_trace": stackTrace.toString(),
     });
   }
-}
\ No newline at end of file
+}
+
+/// A foreground display rule (`OSForegroundRule` on the Python side).
+///
+/// Every condition that is set must match; a rule without conditions matches
+/// every notification.
+class _ForegroundRule {
+  _ForegroundRule.fromMap(Map<String, dynamic> map)
+      : action = map["action"] as String? ?? "display",
+        dataKey = map["data_key"] as String?,
+        dataValue = map["data_value"]?.toString(),
+        collapseId = map["collapse_id"] as String?,
+        category = map["category"] as String?,
+        titlePattern =
+            map["title_pattern"] == null ? null : RegExp(map["title_pattern"] as String);
+
+  /// "display", "suppress" or "defer".
+  final String action;
+  final String? dataKey;
+  final String? dataValue;
+  final String? collapseId;
+  final String? category;
+  final RegExp? titlePattern;
+
+  bool matches(OSNotification notification) {
+    final key = dataKey;
+    if (key != null) {
+      final data = notification.additionalData;
+      if (data == null || !data.containsKey(key)) return false;
+      if (dataValue != null && data[key]?.toString() != dataValue) return false;
+    }
+    if (collapseId != null && notification.collapseId != collapseId) return false;
+    if (category != null && notification.category != category) return false;
+    final pattern = titlePattern;
+    if (pattern != null && !pattern.hasMatch(notification.title ?? "")) return false;
+    return true;
+  }
+}
+
+/// Collects bursts of state events and forwards them once per window.
+///
+/// The window starts at the first event of a burst, so an event is delayed by
+/// at most `window`. Consecutive identical states are dropped, and a burst
+/// that ends in the state last sent is not sent again. With `keepAll`, the
+/// payload also carries every distinct state of the burst under "states".
+class _EventCoalescer {
+  _EventCoalescer({required this.window, required this.keepAll, required this.emit});
+
+  final Duration window;
+  final bool keepAll;
+  final void Function(Map<String, dynamic> payload) emit;
+
+  final List<Map<String, dynamic>> _pending = [];
+  Map<String, dynamic>? _lastSent;
+  Timer? _timer;
+
+  void add(Map<String, dynamic> state) {
+    if (_pending.isEmpty || !mapEquals(_pending.last, state)) {
+      _pending.add(state);
+    }
+    _timer ??= Timer(window, flush);
+  }
+
+  void flush() {
+    _timer?.cancel();
+    _timer = null;
+    if (_pending.isEmpty) return;
+
+    final states = List.of(_pending);
+    _pending.clear();
+    final latest = states.last;
+    if (states.length == 1 && _lastSent != null && mapEquals(_lastSent, latest)) return;
+
+    _lastSent = latest;
+    emit({...latest, if (keepAll) "states": states});
+  }
+
+  void dispose() {
+    _timer?.cancel();
+    _timer = null;
+  }
+}
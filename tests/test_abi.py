@@ -0,0 +1,57 @@
+"""Tests for flet_onesignal.abi — ABI detection and native library sizes."""
+
+import zipfile
+from pathlib import Path
+
+from flet_onesignal.abi import abi_of, excluded_abis, native_lib_sizes
+
+
+class TestAbiOf:
+    def test_abi_directory(self):
+        assert abi_of(Path("jniLibs/arm64-v8a/libfoo.so")) == "arm64-v8a"
+        assert abi_of(Path("x86/numpy/core/_multiarray.so")) == "x86"
+
+    def test_cpython_suffix(self):
+        assert abi_of(Path("numpy/_core.cpython-312-aarch64-linux-android.so")) == "arm64-v8a"
+        assert abi_of(Path("_ssl.cpython-312-arm-linux-androideabi.so")) == "armeabi-v7a"
+        assert abi_of(Path("_ssl.cpython-312-x86_64-linux-android.so")) == "x86_64"
+        assert abi_of(Path("_ssl.cpython-312-i686-linux-android.so")) == "x86"
+
+    def test_unknown(self):
+        assert abi_of(Path("lib/libfoo.so")) is None
+
+
+class TestExcludedAbis:
+    def test_excluded(self):
+        assert excluded_abis(["arm64-v8a"]) == ["armeabi-v7a", "x86_64", "x86"]
+
+    def test_all_targeted(self):
+        assert excluded_abis(["arm64-v8a", "armeabi-v7a", "x86_64", "x86"]) == []
+
+
+class TestNativeLibSizes:
+    def _artifact(self, path, entries):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, size in entries.items():
+                archive.writestr(name, b"\0" * size)
+        return path
+
+    def test_sizes_per_abi(self, tmp_path):
+        artifact = self._artifact(
+            tmp_path / "app.aab",
+            {
+                "base/lib/arm64-v8a/libflutter.so": 10,
+                "base/lib/arm64-v8a/libpython.so": 5,
+                "base/lib/x86_64/libflutter.so": 7,
+                "base/assets/m.cpython-312-i686-linux-android.so": 3,
+                "base/assets/libunknown.so": 4,
+                "base/classes.dex": 100,
+            },
+        )
+        assert native_lib_sizes(artifact) == {"arm64-v8a": 15, "x86_64": 7, "x86": 3}
+
+    def test_artifact_location_ignored(self, tmp_path):
+        # Only entry names inside the archive decide the ABI
+        artifact = self._artifact(tmp_path / "x86" / "app.apk", {"lib/libfoo.so": 1})
+        assert native_lib_sizes(artifact) == {}
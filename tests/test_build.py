@@ -3,16 +3,67 @@
 import textwrap
 
 from flet_onesignal.build import (
-    _PROGUARD_LOCATION_MARKER,
     _PROGUARD_MARKER,
+    _apply_onesignal_modules,
+    _arch_args,
+    _check_abi_filter,
+    _check_module_excludes,
     _check_onesignal_modules,
     _collect_onesignal_deps,
+    _collect_onesignal_excludes,
+    _collect_onesignal_permissions,
+    _enabled_modules,
     _get_onesignal_config,
+    _inject_abi_filter,
     _inject_dep_line,
+    _inject_manifest_permissions,
+    _inject_module_excludes,
     _inject_onesignal_modules,
     _inject_proguard_rules,
+    _load_module_registry,
 )
 
+_PROGUARD_LOCATION_MARKER = "# OneSignal Location module"
+
+
+# ---------------------------------------------------------------------------
+# _load_module_registry / _enabled_modules
+# ---------------------------------------------------------------------------
+
+
+class TestModuleRegistry:
+    def test_builtin_location(self):
+        registry = _load_module_registry()
+        assert "location" in registry
+        assert registry["location"]["proguard"].startswith(_PROGUARD_LOCATION_MARKER)
+        assert "android.permission.ACCESS_FINE_LOCATION" in registry["location"]["permissions"]
+
+    def test_override_existing_module(self):
+        deps = [{"coord": "com.onesignal:location", "version": "5.1.0"}]
+        registry = _load_module_registry({"location": {"dependencies": deps}})
+        assert registry["location"]["dependencies"] == deps
+        # Keys not overridden are kept from the built-in entry
+        assert "proguard" in registry["location"]
+
+    def test_declare_new_module(self):
+        spec = {"dependencies": [{"coord": "com.huawei.hms:push", "version": "6.3.0.304"}]}
+        registry = _load_module_registry({"huawei": spec})
+        assert registry["huawei"] == spec
+        assert "location" in registry
+
+    def test_enabled_modules(self):
+        assert list(_enabled_modules({"location": True})) == ["location", "in_app_messages"]
+        assert list(_enabled_modules({"location": False})) == ["in_app_messages"]
+        assert _enabled_modules({"in_app_messages": False}) == {}
+
+    def test_enabled_custom_module(self):
+        config = {
+            "huawei": True,
+            "modules": {"huawei": {"dependencies": [{"coord": "a:b", "version": "1"}]}},
+        }
+        assert _collect_onesignal_deps(config) == [("a:b", "1")]
+
+
 # ---------------------------------------------------------------------------
 # _collect_onesignal_deps
 # ---------------------------------------------------------------------------
@@ -171,7 +222,7 @@ class TestInjectProguardRules:
     def test_location_rules_included(self, tmp_path):
         app_dir = tmp_path / "app"
         app_dir.mkdir()
-        _inject_proguard_rules(app_dir, location=True)
+        _inject_proguard_rules(app_dir, {"location": True})
         content = (app_dir / "proguard-rules.pro").read_text()
         assert _PROGUARD_MARKER in content
         assert _PROGUARD_LOCATION_MARKER in content
@@ -199,9 +250,9 @@ class TestInjectProguardRules:
     def test_no_duplicate_with_location(self, tmp_path):
         app_dir = tmp_path / "app"
         app_dir.mkdir()
-        _inject_proguard_rules(app_dir, location=True)
+        _inject_proguard_rules(app_dir, {"location": True})
         content_first = (app_dir / "proguard-rules.pro").read_text()
-        _inject_proguard_rules(app_dir, location=True)
+        _inject_proguard_rules(app_dir, {"location": True})
         content_second = (app_dir / "proguard-rules.pro").read_text()
         assert content_first == content_second
 
@@ -291,3 +342,183 @@ class TestCheckOnesignalModules:
         gradle = app_dir / "build.gradle.kts"
         gradle.write_text("dependencies {\n}\n")
         assert _check_onesignal_modules(tmp_path, {}) is False
+
+
+# ---------------------------------------------------------------------------
+# _inject_manifest_permissions / _apply_onesignal_modules
+# ---------------------------------------------------------------------------
+
+_MANIFEST = textwrap.dedent("""\
+    <manifest xmlns:android="http://schemas.android.com/apk/res/android">
+        <uses-permission android:name="android.permission.INTERNET" />
+        <application android:label="app">
+        </application>
+    </manifest>
+""")
+
+
+class TestInjectManifestPermissions:
+    def _make_manifest(self, app_dir, content=_MANIFEST):
+        manifest = app_dir / "src" / "main" / "AndroidManifest.xml"
+        manifest.parent.mkdir(parents=True)
+        manifest.write_text(content)
+        return manifest
+
+    def test_collect_permissions(self):
+        assert _collect_onesignal_permissions({}) == []
+        assert "android.permission.ACCESS_COARSE_LOCATION" in _collect_onesignal_permissions(
+            {"location": True}
+        )
+
+    def test_inject_before_application(self, tmp_path):
+        manifest = self._make_manifest(tmp_path)
+        assert _inject_manifest_permissions(tmp_path, {"location": True}) is True
+        content = manifest.read_text()
+        assert "android.permission.ACCESS_FINE_LOCATION" in content
+        assert content.index("ACCESS_FINE_LOCATION") < content.index("<application")
+
+    def test_no_duplicate(self, tmp_path):
+        manifest = self._make_manifest(tmp_path)
+        _inject_manifest_permissions(tmp_path, {"location": True})
+        first = manifest.read_text()
+        assert _inject_manifest_permissions(tmp_path, {"location": True}) is False
+        assert manifest.read_text() == first
+
+    def test_no_manifest(self, tmp_path):
+        assert _inject_manifest_permissions(tmp_path, {"location": True}) is False
+
+
+class TestApplyOnesignalModules:
+    def test_single_pass(self, tmp_path):
+        app_dir = tmp_path / "android" / "app"
+        app_dir.mkdir(parents=True)
+        (app_dir / "build.gradle.kts").write_text("dependencies {\n}\n")
+        manifest = app_dir / "src" / "main" / "AndroidManifest.xml"
+        manifest.parent.mkdir(parents=True)
+        manifest.write_text(_MANIFEST)
+
+        config = {"location": True}
+        assert _check_onesignal_modules(tmp_path, config) is False
+        assert _apply_onesignal_modules(tmp_path, config) is True
+        assert _check_onesignal_modules(tmp_path, config) is True
+        assert _apply_onesignal_modules(tmp_path, config) is False
+
+    def test_base_rules_without_modules(self, tmp_path):
+        app_dir = tmp_path / "android" / "app"
+        app_dir.mkdir(parents=True)
+        assert _apply_onesignal_modules(tmp_path, {}) is True
+        assert _PROGUARD_MARKER in (app_dir / "proguard-rules.pro").read_text()
+
+    def test_no_android_dir(self, tmp_path):
+        assert _apply_onesignal_modules(tmp_path, {"location": True}) is False
+
+
+# ---------------------------------------------------------------------------
+# _inject_module_excludes / _check_module_excludes
+# ---------------------------------------------------------------------------
+
+
+class TestModuleExcludes:
+    def _make_gradle(self, app_dir, kts=True):
+        app_dir.mkdir(parents=True, exist_ok=True)
+        gradle = app_dir / ("build.gradle.kts" if kts else "build.gradle")
+        gradle.write_text("dependencies {\n}\n")
+        return gradle
+
+    def test_collect_excludes(self):
+        assert _collect_onesignal_excludes({}) == []
+        assert _collect_onesignal_excludes({"in_app_messages": False}) == [
+            ("com.onesignal", "in-app-messages")
+        ]
+
+    def test_inject_kts(self, tmp_path):
+        gradle = self._make_gradle(tmp_path)
+        config = {"in_app_messages": False}
+        assert _check_module_excludes(tmp_path, config) is False
+        assert _inject_module_excludes(tmp_path, config) is True
+        content = gradle.read_text()
+        assert 'exclude(group = "com.onesignal", module = "in-app-messages")' in content
+        assert content.index("configurations.all") > content.index("dependencies")
+        assert _check_module_excludes(tmp_path, config) is True
+        assert _inject_module_excludes(tmp_path, config) is False
+
+    def test_inject_groovy(self, tmp_path):
+        gradle = self._make_gradle(tmp_path, kts=False)
+        _inject_module_excludes(tmp_path, {"in_app_messages": False})
+        assert "exclude group: 'com.onesignal', module: 'in-app-messages'" in gradle.read_text()
+
+    def test_reenabling_removes_excludes(self, tmp_path):
+        gradle = self._make_gradle(tmp_path)
+        original = gradle.read_text()
+        _inject_module_excludes(tmp_path, {"in_app_messages": False})
+        assert _check_module_excludes(tmp_path, {}) is False
+        assert _inject_module_excludes(tmp_path, {}) is True
+        assert gradle.read_text() == original
+
+    def test_nothing_excluded_by_default(self, tmp_path):
+        self._make_gradle(tmp_path)
+        assert _inject_module_excludes(tmp_path, {}) is False
+        assert _check_module_excludes(tmp_path, {}) is True
+
+    def test_applied_with_modules(self, tmp_path):
+        gradle = self._make_gradle(tmp_path / "android" / "app")
+        config = {"location": True, "in_app_messages": False}
+        assert _apply_onesignal_modules(tmp_path, config) is True
+        assert "in-app-messages" in gradle.read_text()
+        assert _check_onesignal_modules(tmp_path, config) is True
+
+
+# ---------------------------------------------------------------------------
+# _inject_abi_filter / _check_abi_filter / _arch_args
+# ---------------------------------------------------------------------------
+
+
+class TestAbiFilter:
+    def _make_gradle(self, app_dir, kts=True):
+        app_dir.mkdir(parents=True, exist_ok=True)
+        gradle = app_dir / ("build.gradle.kts" if kts else "build.gradle")
+        gradle.write_text('android {\n    namespace = "com.example"\n}\n')
+        return gradle
+
+    def test_inject_kts(self, tmp_path):
+        gradle = self._make_gradle(tmp_path)
+        assert _inject_abi_filter(tmp_path, ["arm64-v8a"]) is True
+        content = gradle.read_text()
+        assert 'excludes += setOf("lib/armeabi-v7a/**", "lib/x86_64/**", "lib/x86/**")' in content
+        assert _check_abi_filter(tmp_path, ["arm64-v8a"]) is True
+        assert _inject_abi_filter(tmp_path, ["arm64-v8a"]) is False
+
+    def test_inject_groovy(self, tmp_path):
+        gradle = self._make_gradle(tmp_path, kts=False)
+        _inject_abi_filter(tmp_path, ["arm64-v8a", "armeabi-v7a"])
+        assert "packagingOptions" in gradle.read_text()
+        assert "excludes += ['lib/x86_64/**', 'lib/x86/**']" in gradle.read_text()
+
+    def test_replaces_previous_selection(self, tmp_path):
+        gradle = self._make_gradle(tmp_path)
+        _inject_abi_filter(tmp_path, ["arm64-v8a"])
+        assert _check_abi_filter(tmp_path, ["x86_64"]) is False
+        assert _inject_abi_filter(tmp_path, ["x86_64"]) is True
+        content = gradle.read_text()
+        assert content.count("fos-build: ABI filter") == 1
+        assert '"lib/arm64-v8a/**"' in content
+
+    def test_empty_selection_removes_filter(self, tmp_path):
+        gradle = self._make_gradle(tmp_path)
+        original = gradle.read_text()
+        _inject_abi_filter(tmp_path, ["arm64-v8a"])
+        assert _check_abi_filter(tmp_path, []) is False
+        assert _inject_abi_filter(tmp_path, []) is True
+        assert gradle.read_text() == original
+        assert _check_abi_filter(tmp_path, []) is True
+
+    def test_no_gradle_file(self, tmp_path):
+        assert _inject_abi_filter(tmp_path, ["arm64-v8a"]) is False
+        assert _check_abi_filter(tmp_path, ["arm64-v8a"]) is True
+
+    def test_arch_args(self):
+        assert _arch_args(["flet", "build", "apk"]) == []
+        assert _arch_args(["-v", "--arch", "arm64-v8a", "x86_64", "--clear-cache"]) == [
+            "arm64-v8a",
+            "x86_64",
+        ]
@@ -0,0 +1,199 @@
+"""Tests for flet_onesignal.emulator — endpoints, rate limiting, errors and recording."""
+
+import asyncio
+import json
+
+import pytest
+
+from flet_onesignal.emulator import OneSignalEmulator
+from flet_onesignal.rest import OneSignalAPIError, OneSignalClient, RetryPolicy, TokenBucket
+
+FAST_RETRY = RetryPolicy(attempts=3, backoff=0.001, max_backoff=0.05)
+
+
+def _run(emulator, scenario, **client_kwargs):
+    """Run ``scenario(client)`` against a started emulator."""
+
+    async def run():
+        async with emulator:
+            async with OneSignalClient(
+                "app", "key", base_url=emulator.url, **client_kwargs
+            ) as client:
+                return await scenario(client)
+
+    return asyncio.run(run())
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+
+class TestEndpoints:
+    def test_user_lifecycle(self):
+        async def scenario(client):
+            created = await client.create_user({"external_id": "u1"}, {"tags": {"plan": "free"}})
+            await client.add_aliases("external_id", "u1", {"crm": "42"})
+            await client.update_user("crm", "42", {"tags": {"plan": "pro", "trial": "1"}})
+            await client.update_user("external_id", "u1", {"tags": {"trial": ""}})
+            user = await client.get_user("external_id", "u1")
+            await client.delete_user("external_id", "u1")
+            with pytest.raises(OneSignalAPIError) as exc:
+                await client.get_user("crm", "42")
+            return created, user, exc.value.status
+
+        created, user, status = _run(OneSignalEmulator(app_id="app"), scenario)
+        assert created["identity"]["external_id"] == "u1"
+        assert user["identity"]["crm"] == "42"
+        assert user["properties"]["tags"] == {"plan": "pro"}
+        assert status == 404
+
+    def test_alias_conflict(self):
+        async def scenario(client):
+            await client.create_user({"external_id": "u1"})
+            await client.create_user({"external_id": "u2"})
+            with pytest.raises(OneSignalAPIError) as exc:
+                await client.add_aliases("external_id", "u2", {"external_id": "u1"})
+            return exc.value.status
+
+        assert _run(OneSignalEmulator(), scenario) == 409
+
+    def test_subscription_transfer(self):
+        async def scenario(client):
+            created = await client.create_user(
+                {"external_id": "u1"}, subscriptions=[{"type": "Email", "token": "a@b.c"}]
+            )
+            await client.create_user({"external_id": "u2"})
+            subscription_id = created["subscriptions"][0]["id"]
+            await client.transfer_subscription(subscription_id, {"external_id": "u2"})
+            return (
+                await client.get_user("external_id", "u1"),
+                await client.get_user("external_id", "u2"),
+            )
+
+        first, second = _run(OneSignalEmulator(), scenario)
+        assert first["subscriptions"] == []
+        assert second["subscriptions"][0]["token"] == "a@b.c"
+
+    def test_notification_invalid_aliases_and_idempotency(self):
+        async def scenario(client):
+            await client.create_user({"external_id": "u1"})
+            payload = {"contents": {"en": "x"}, "idempotency_key": "k1"}
+            payload["include_aliases"] = {"external_id": ["u1", "ghost"]}
+            first = await client.send_notification(dict(payload))
+            second = await client.send_notification(dict(payload))
+            stored = await client.get_notification(first["id"])
+            return first, second, stored
+
+        emulator = OneSignalEmulator()
+        first, second, stored = _run(emulator, scenario)
+        assert first["errors"] == {"invalid_aliases": {"external_id": ["ghost"]}}
+        assert second["id"] == first["id"]
+        assert stored["successful"] == 1
+        assert len(emulator.notifications) == 1
+
+    def test_notification_to_onesignal_id(self):
+        async def scenario(client):
+            created = await client.create_user({"external_id": "u1"})
+            onesignal_id = created["identity"]["onesignal_id"]
+            payload = {"contents": {"en": "x"}, "include_aliases": {"onesignal_id": [onesignal_id]}}
+            sent = await client.send_notification(payload)
+            return sent, await client.get_notification(sent["id"])
+
+        sent, stored = _run(OneSignalEmulator(), scenario)
+        assert "errors" not in sent
+        assert stored["successful"] == 1
+
+    @pytest.mark.parametrize("raw", [b"[]", b'"x"', b"3"])
+    def test_non_object_body_rejected(self, raw):
+        emulator = OneSignalEmulator()
+        status, payload, _ = asyncio.run(emulator._respond("POST", "/notifications", {}, raw))
+
+        assert status == 400
+        assert payload == {"errors": ["Request body must be a JSON object"]}
+
+    def test_handler_exception_answers_500(self, monkeypatch):
+        emulator = OneSignalEmulator()
+        monkeypatch.setattr(emulator, "_dispatch", lambda *args: 1 / 0)
+
+        status, payload, _ = asyncio.run(emulator._respond("GET", "/notifications/x", {}, b""))
+
+        assert status == 500
+        assert "ZeroDivisionError" in payload["errors"][0]
+        assert emulator.requests[0].status == 500
+
+    def test_wrong_api_key_rejected(self):
+        async def scenario(client):
+            with pytest.raises(OneSignalAPIError) as exc:
+                await client.get_user("external_id", "u1")
+            return exc.value.status
+
+        assert _run(OneSignalEmulator(api_key="secret"), scenario) == 403
+
+
+# ---------------------------------------------------------------------------
+# Fault injection
+# ---------------------------------------------------------------------------
+
+
+class TestFaults:
+    def test_rate_limit_answers_429_and_client_recovers(self):
+        async def scenario(client):
+            return await asyncio.gather(
+                *(client.create_user({"external_id": f"u{i}"}) for i in range(4))
+            )
+
+        emulator = OneSignalEmulator(rate_limit=50, burst=2)
+        results = _run(emulator, scenario, retry=RetryPolicy(attempts=10, max_backoff=1.0))
+        statuses = [r.status for r in emulator.requests]
+        assert len(results) == 4
+        assert 429 in statuses
+        assert statuses.count(201) == 4
+
+    def test_error_injection(self):
+        async def scenario(client):
+            for i in range(20):
+                await client.create_user({"external_id": f"u{i}"})
+
+        emulator = OneSignalEmulator(error_rate=0.3, seed=1)
+        _run(emulator, scenario, retry=RetryPolicy(attempts=20, backoff=0.001))
+        statuses = [r.status for r in emulator.requests]
+        assert 500 in statuses
+        assert statuses.count(201) == 20
+
+    def test_latency(self):
+        async def scenario(client):
+            with pytest.raises(OneSignalAPIError):
+                await client.get_notification("missing")
+
+        emulator = OneSignalEmulator(latency=0.05)
+        _run(emulator, scenario, retry=FAST_RETRY)
+        assert emulator.requests[0].duration >= 0.05
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+class TestRecording:
+    def test_requests_recorded_to_file(self, tmp_path):
+        async def scenario(client):
+            await client.create_user({"external_id": "u 1"})
+            await client.get_user("external_id", "u 1")
+
+        path = tmp_path / "requests.ndjson"
+        emulator = OneSignalEmulator(record_path=path)
+        _run(emulator, scenario)
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(r["method"], r["status"]) for r in lines] == [("POST", 201), ("GET", 200)]
+        assert lines[0]["body"] == {"identity": {"external_id": "u 1"}}
+        assert emulator.requests[1].path == "/apps/app/users/by/external_id/u%201"
+
+
+class TestTryAcquire:
+    def test_returns_wait_when_empty(self):
+        bucket = TokenBucket(rate=10, capacity=1)
+        assert bucket.try_acquire() == 0
+        assert 0 < bucket.try_acquire() <= 0.1
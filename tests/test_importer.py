@@ -0,0 +1,245 @@
+"""Tests for flet_onesignal.importer — record parsing, checkpoints and the pipeline."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from flet_onesignal.importer import (
+    Checkpoint,
+    UserRecord,
+    import_users,
+    read_records,
+)
+from flet_onesignal.rest import OneSignalClient, RetryPolicy
+
+
+class MockAPI:
+    """httpx.MockTransport handler that records requests and fails chosen users."""
+
+    def __init__(self, fail_users=(), delay=0.0, unavailable=None):
+        self.fail_users = set(fail_users)
+        # external_id -> number of 503 answers before the user's create succeeds
+        self.unavailable = dict(unavailable or {})
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, request.url.path, body))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        user = (body or {}).get("identity", {}).get("external_id", "")
+        if user in self.fail_users:
+            return httpx.Response(400, json={"errors": ["bad user"]})
+        if self.unavailable.get(user):
+            self.unavailable[user] -= 1
+            return httpx.Response(503, json={"errors": ["unavailable"]})
+        return httpx.Response(200, json={"ok": True})
+
+    def created(self):
+        return [b["identity"]["external_id"] for m, p, b in self.requests if p.endswith("/users")]
+
+
+def _import(api, path, retry=RetryPolicy(attempts=1), **kwargs):
+    async def run():
+        async with OneSignalClient(
+            "app",
+            "key",
+            transport=httpx.MockTransport(api),
+            retry=retry,
+        ) as client:
+            return await import_users(client, path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def _write_ndjson(path, users):
+    path.write_text("".join(json.dumps(u) + "\n" for u in users))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+
+class TestUserRecord:
+    def test_from_csv_row(self):
+        record = UserRecord.from_dict(
+            {
+                "external_id": "u1",
+                "language": "pt",
+                "email": "a@b.c",
+                "sms": "",
+                "tag:plan": "pro",
+                "alias:crm": "42",
+            }
+        )
+        assert record.external_id == "u1"
+        assert record.language == "pt"
+        assert record.tags == {"plan": "pro"}
+        assert record.aliases == {"crm": "42"}
+        assert record.subscriptions == [{"type": "Email", "token": "a@b.c"}]
+
+    def test_from_ndjson_object(self):
+        record = UserRecord.from_dict(
+            {"external_id": "u1", "tags": {"level": 3}, "aliases": {"crm": "42"}}
+        )
+        assert record.tags == {"level": "3"}
+        assert record.aliases == {"crm": "42"}
+
+    def test_missing_external_id(self):
+        with pytest.raises(ValueError):
+            UserRecord.from_dict({"email": "a@b.c"})
+
+
+class TestReadRecords:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("external_id,tag:plan\nu1,pro\n,free\n")
+        records = list(read_records(path))
+        assert records[0][1].tags == {"plan": "pro"}
+        assert isinstance(records[1][1], ValueError)
+
+    def test_ndjson_invalid_line(self, tmp_path):
+        path = tmp_path / "users.ndjson"
+        path.write_text('{"external_id": "u1"}\n\nnot json\n{"external_id": "u2"}\n')
+        records = list(read_records(path))
+        assert [i for i, _ in records] == [0, 1, 2]
+        assert isinstance(records[1][1], ValueError)
+        assert records[2][1].external_id == "u2"
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+
+
+class TestCheckpoint:
+    def test_watermark_advances_over_contiguous(self, tmp_path):
+        checkpoint = Checkpoint(None, tmp_path / "users.csv")
+        for index in (1, 3, 0):
+            checkpoint.mark(index)
+        assert checkpoint.watermark == 2
+        assert checkpoint.done == {3}
+        assert checkpoint.is_done(1) and checkpoint.is_done(3) and not checkpoint.is_done(2)
+
+    def test_roundtrip(self, tmp_path):
+        source = tmp_path / "users.csv"
+        checkpoint = Checkpoint(tmp_path / "cp.json", source)
+        checkpoint.mark(0)
+        checkpoint.mark(5)
+        checkpoint.save()
+
+        loaded = Checkpoint(tmp_path / "cp.json", source).load()
+        assert loaded.watermark == 1
+        assert loaded.done == {5}
+
+    def test_other_source_ignored(self, tmp_path):
+        checkpoint = Checkpoint(tmp_path / "cp.json", tmp_path / "a.csv")
+        checkpoint.mark(0)
+        checkpoint.save()
+        assert Checkpoint(tmp_path / "cp.json", tmp_path / "b.csv").load().watermark == 0
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+class TestImportUsers:
+    def test_operations_grouped_per_user(self, tmp_path):
+        path = _write_ndjson(
+            tmp_path / "users.ndjson",
+            [{"external_id": "u1", "tags": {"plan": "pro"}, "aliases": {"crm": "42"}}],
+        )
+        api = MockAPI()
+        stats = _import(api, path)
+
+        assert [(m, p) for m, p, _ in api.requests] == [
+            ("POST", "/apps/app/users"),
+            ("PATCH", "/apps/app/users/by/external_id/u1/identity"),
+            ("PATCH", "/apps/app/users/by/external_id/u1"),
+        ]
+        assert api.requests[2][2] == {"properties": {"tags": {"plan": "pro"}}}
+        assert (stats.succeeded, stats.failed, stats.requests) == (1, 0, 3)
+
+    def test_failures_recorded(self, tmp_path):
+        path = _write_ndjson(
+            tmp_path / "users.ndjson", [{"external_id": f"u{i}"} for i in range(4)] + [{}]
+        )
+        failures = tmp_path / "failures.ndjson"
+        stats = _import(MockAPI(fail_users={"u2"}), path, failures_path=failures)
+
+        assert (stats.succeeded, stats.failed) == (3, 2)
+        lines = [json.loads(line) for line in failures.read_text().splitlines()]
+        assert sorted(str(line["external_id"]) for line in lines) == ["None", "u2"]
+        assert {line["status"] for line in lines} == {None, 400}
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        path = _write_ndjson(
+            tmp_path / "users.ndjson", [{"external_id": f"u{i}"} for i in range(5)]
+        )
+        checkpoint = Checkpoint(tmp_path / "cp.json", path)
+        for index in (0, 1, 3):
+            checkpoint.mark(index)
+        checkpoint.save()
+
+        api = MockAPI()
+        stats = _import(api, path, checkpoint_path=tmp_path / "cp.json")
+
+        assert sorted(api.created()) == ["u2", "u4"]
+        assert stats.skipped == 3
+        assert Checkpoint(tmp_path / "cp.json", path).load().watermark == 5
+
+    def test_transient_failure_retried_on_resume(self, tmp_path):
+        path = _write_ndjson(
+            tmp_path / "users.ndjson", [{"external_id": f"u{i}"} for i in range(4)]
+        )
+        checkpoint_path = tmp_path / "cp.json"
+        failures = tmp_path / "failures.ndjson"
+
+        api = MockAPI(fail_users={"u3"}, unavailable={"u1": 1})
+        first = _import(api, path, checkpoint_path=checkpoint_path, failures_path=failures)
+        assert (first.succeeded, first.failed) == (2, 2)
+        retry = {line["external_id"]: line["retry"] for line in map(json.loads, failures.open())}
+        assert retry == {"u1": True, "u3": False}
+
+        # The API has recovered: only the transient failure is imported again
+        api = MockAPI(fail_users={"u3"})
+        second = _import(api, path, checkpoint_path=checkpoint_path)
+        assert api.created() == ["u1"]
+        assert (second.skipped, second.succeeded) == (3, 1)
+        assert Checkpoint(checkpoint_path, path).load().watermark == 4
+
+    def test_requests_include_retries(self, tmp_path):
+        path = _write_ndjson(tmp_path / "users.ndjson", [{"external_id": "u1"}])
+        retry = RetryPolicy(attempts=3, backoff=0.001, max_backoff=0.01)
+        stats = _import(MockAPI(unavailable={"u1": 2}), path, retry=retry)
+
+        assert stats.succeeded == 1
+        assert stats.requests == 3
+
+    def test_bounded_parallelism(self, tmp_path):
+        path = _write_ndjson(
+            tmp_path / "users.ndjson", [{"external_id": f"u{i}"} for i in range(12)]
+        )
+        api = MockAPI(delay=0.01)
+        stats = _import(api, path, concurrency=3)
+
+        assert stats.succeeded == 12
+        assert stats.requests == len(api.requests) == 12
+        assert api.max_in_flight <= 3
+
+    def test_progress_reported(self, tmp_path):
+        path = _write_ndjson(tmp_path / "users.ndjson", [{"external_id": "u1"}])
+        reports = []
+        _import(MockAPI(), path, progress=reports.append)
+        assert reports and reports[-1].succeeded == 1
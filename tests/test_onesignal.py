@@ -0,0 +1,573 @@
+"""Tests for flet_onesignal.onesignal — bridge call handling in OneSignal._invoke_method."""
+
+import asyncio
+import time
+
+import flet as ft
+import pytest
+from flet.controls.control_event import get_event_field_type
+from flet.utils.from_dict import from_dict
+
+import flet_onesignal as fos
+from flet_onesignal.onesignal import (
+    METHOD_POLICIES,
+    METHOD_PRIORITIES,
+    READ_ONLY_METHODS,
+    SEEN_NOTIFICATIONS_LIMIT,
+)
+from flet_onesignal.types import OSStateSnapshot
+
+
+class FakeBridge:
+    """Stands in for BaseControl._invoke_method, recording calls."""
+
+    def __init__(self, delay=0.02, error=None, results=None):
+        self.delay = delay
+        self.error = error
+        self.results = results or {}
+        self.calls = []
+
+    async def invoke(self, method_name, arguments=None, timeout=None):
+        self.calls.append((method_name, arguments))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        if method_name in self.results:
+            result = self.results[method_name]
+            # A list gives one result per call, the last one repeating
+            if isinstance(result, list):
+                return result.pop(0) if len(result) > 1 else result[0]
+            return result
+        result = {"v": 1, "value": f"{method_name}#{len(self.calls)}"}
+        if arguments and "_trace" in arguments:
+            now = time.time_ns() // 1000
+            trace = {"id": arguments["_trace"], "received_us": now, "started_us": now}
+            result["trace"] = {**trace, "finished_us": now}
+        return result
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    fake = FakeBridge()
+
+    async def invoke(control, **kwargs):
+        return await fake.invoke(**kwargs)
+
+    monkeypatch.setattr(ft.BaseControl, "_invoke_method", invoke)
+    monkeypatch.setattr(fos.OneSignal, "_is_supported_platform", lambda self: True)
+    return fake
+
+
+class TestResultEnvelope:
+    def test_native_values_unwrapped(self, bridge):
+        bridge.results.update(
+            {
+                "user_get_tags": {"v": 1, "value": {"plan": "pro"}},
+                "iam_is_paused": {"v": 1, "value": True},
+                "notifications_get_permission": {"v": 1, "value": False},
+                "user_get_external_id": {"v": 1, "value": None},
+            }
+        )
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            return (
+                await onesignal.user.get_tags(),
+                await onesignal.in_app_messages.is_paused(),
+                await onesignal.notifications.get_permission(),
+                await onesignal.user.get_external_id(),
+            )
+
+        assert asyncio.run(scenario()) == ({"plan": "pro"}, True, False, None)
+
+    def test_error_envelope_raises_typed_error(self, bridge):
+        bridge.results["logout"] = {
+            "v": 1,
+            "error": {"type": "PlatformException", "message": "boom", "code": "E42"},
+        }
+
+        with pytest.raises(fos.OneSignalNativeError, match="logout: boom") as raised:
+            asyncio.run(fos.OneSignal(app_id="x").logout())
+        assert (raised.value.type, raised.value.code) == ("PlatformException", "E42")
+
+    def test_newer_version_rejected(self, bridge):
+        bridge.results["logout"] = {"v": 99, "value": None}
+
+        async def scenario():
+            await fos.OneSignal(app_id="x").logout()
+
+        with pytest.raises(RuntimeError, match="v99"):
+            asyncio.run(scenario())
+
+
+class TestSingleFlight:
+    def test_concurrent_reads_share_one_call(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            return await asyncio.gather(
+                onesignal.user.get_onesignal_id(),
+                onesignal.user.get_onesignal_id(),
+                onesignal.notifications.get_permission(),
+                onesignal.notifications.get_permission(),
+            )
+
+        results = asyncio.run(scenario())
+        assert [name for name, _ in bridge.calls] == [
+            "user_get_onesignal_id",
+            "notifications_get_permission",
+        ]
+        assert results[0] == results[1]
+
+    def test_sequential_reads_not_cached(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            await onesignal.in_app_messages.is_paused()
+            await onesignal.in_app_messages.is_paused()
+
+        asyncio.run(scenario())
+        assert len(bridge.calls) == 2
+
+    def test_write_starts_new_flight(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            first = asyncio.create_task(onesignal._invoke_method("user_get_tags"))
+            await asyncio.sleep(0)
+            await onesignal._invoke_method("user_add_tag", {"key": "a", "value": "1"})
+            second = asyncio.create_task(onesignal._invoke_method("user_get_tags"))
+            return await first, await second
+
+        first, second = asyncio.run(scenario())
+        assert first != second
+        assert [name for name, _ in bridge.calls].count("user_get_tags") == 2
+
+    def test_different_arguments_not_shared(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            await asyncio.gather(
+                onesignal._invoke_method("user_get_tags", {"a": 1}),
+                onesignal._invoke_method("user_get_tags", {"a": 2}),
+            )
+
+        asyncio.run(scenario())
+        assert len(bridge.calls) == 2
+
+    def test_writes_never_shared(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            await asyncio.gather(onesignal.logout(), onesignal.logout())
+
+        asyncio.run(scenario())
+        assert len(bridge.calls) == 2
+
+    def test_error_reaches_every_caller(self, bridge):
+        bridge.error = TimeoutError("bridge timeout")
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            return await asyncio.gather(
+                onesignal._invoke_method("iam_is_paused"),
+                onesignal._invoke_method("iam_is_paused"),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, fos.OneSignalTimeoutError) for r in results)
+        # One shared flight, retried under the method's policy
+        assert len(bridge.calls) == METHOD_POLICIES["iam_is_paused"].attempts
+
+    def test_cancelled_caller_does_not_cancel_others(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            first = asyncio.create_task(onesignal._invoke_method("location_is_shared"))
+            second = asyncio.create_task(onesignal._invoke_method("location_is_shared"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "location_is_shared#1"
+
+    def test_registry_excludes_writes(self):
+        writes = {
+            "login",
+            "logout",
+            "user_add_tag",
+            "user_push_opt_in",
+            "notifications_request_permission",
+            "location_request_permission",
+            "iam_set_paused",
+        }
+        assert READ_ONLY_METHODS.isdisjoint(writes)
+
+
+class TestSnapshot:
+    def test_single_call_decoded(self, bridge):
+        bridge.results["state_snapshot"] = {
+            "v": 1,
+            "value": {
+                "onesignal_id": "os-1",
+                "external_id": "",
+                "tags": {"plan": "pro"},
+                "push_opted_in": True,
+                "location_shared": None,
+                "errors": {"location_shared": "Location module not installed"},
+            },
+        }
+
+        async def scenario():
+            return await fos.OneSignal(app_id="x").snapshot()
+
+        state = asyncio.run(scenario())
+        assert bridge.calls == [("state_snapshot", {})]
+        assert state.onesignal_id == "os-1"
+        assert state.external_id is None
+        assert state.tags == {"plan": "pro"}
+        assert state.push_opted_in is True
+        assert state.errors == {"location_shared": "Location module not installed"}
+
+    def test_selected_fields_forwarded(self, bridge):
+        bridge.results["state_snapshot"] = {"v": 1, "value": {"iam_paused": False, "errors": {}}}
+
+        async def scenario():
+            return await fos.OneSignal(app_id="x").snapshot(fields=["iam_paused"])
+
+        state = asyncio.run(scenario())
+        assert bridge.calls == [("state_snapshot", {"fields": ["iam_paused"]})]
+        assert state.iam_paused is False
+        assert state.onesignal_id is None
+
+    def test_unknown_field_rejected(self, bridge):
+        async def scenario():
+            await fos.OneSignal(app_id="x").snapshot(fields=["iam_paused", "nope"])
+
+        with pytest.raises(ValueError, match="nope"):
+            asyncio.run(scenario())
+        assert bridge.calls == []
+
+    def test_field_names_exclude_errors(self):
+        assert "errors" not in OSStateSnapshot.field_names()
+        assert len(OSStateSnapshot.field_names()) == 9
+
+
+class TestEventCoalescingConfig:
+    def test_known_events_accepted(self):
+        onesignal = fos.OneSignal(
+            app_id="x",
+            event_coalescing={
+                "user_change": fos.OSEventCoalescing(window_ms=300),
+                "permission_change": fos.OSEventCoalescing(policy=fos.OSCoalescePolicy.NONE),
+            },
+        )
+        onesignal.before_update()
+
+    def test_unknown_event_rejected(self):
+        onesignal = fos.OneSignal(
+            app_id="x", event_coalescing={"notification_click": fos.OSEventCoalescing()}
+        )
+        with pytest.raises(ValueError, match="notification_click"):
+            onesignal.before_update()
+
+
+class TestForegroundRules:
+    def test_rules_sent_in_order(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            await onesignal.notifications.set_foreground_rules(
+                [
+                    fos.OSForegroundRule(fos.OSForegroundAction.SUPPRESS, data_key="silent"),
+                    fos.OSForegroundRule("defer", title_pattern=r"^Chat: "),
+                ]
+            )
+
+        asyncio.run(scenario())
+        assert bridge.calls == [
+            (
+                "notifications_set_foreground_rules",
+                {
+                    "rules": [
+                        {"action": "suppress", "data_key": "silent"},
+                        {"action": "defer", "title_pattern": "^Chat: "},
+                    ]
+                },
+            )
+        ]
+
+    def test_empty_list_clears(self, bridge):
+        asyncio.run(fos.OneSignal(app_id="x").notifications.set_foreground_rules([]))
+        assert bridge.calls == [("notifications_set_foreground_rules", {"rules": []})]
+
+
+class TestEventReplay:
+    @pytest.fixture
+    def delivered(self, monkeypatch):
+        """Replace BaseControl._trigger_event with event building + before_event only."""
+        events = []
+
+        async def trigger(control, event_name, event_data, e=None):
+            event_type = get_event_field_type(control, f"on_{event_name}")
+            e = from_dict(event_type, {"control": control, "name": event_name, **event_data})
+            if control.before_event(e) is not False:
+                events.append(e)
+
+        monkeypatch.setattr(ft.BaseControl, "_trigger_event", trigger)
+        return events
+
+    @staticmethod
+    def held(event, notification_id, timestamp=1700000000.5):
+        data = {"notification": {}, "notification_id": notification_id, "timestamp": timestamp}
+        return {"event": event, "data": data}
+
+    def test_held_events_replayed_in_order(self, bridge, delivered):
+        bridge.results["events_listen"] = {
+            "v": 1,
+            "value": {
+                "events": [
+                    self.held("notification_foreground", "n1"),
+                    self.held("notification_click", "n1"),
+                ],
+                "dropped": 2,
+            },
+        }
+
+        replay = asyncio.run(fos.OneSignal(app_id="x").start_listening())
+
+        assert replay == fos.OSEventReplay(replayed=2, duplicates=0, dropped=2)
+        assert [type(e) for e in delivered] == [
+            fos.OSNotificationWillDisplayEvent,
+            fos.OSNotificationClickEvent,
+        ]
+        assert all(e.replayed and e.timestamp == 1700000000.5 for e in delivered)
+
+    def test_replay_skips_notifications_already_delivered(self, bridge, delivered):
+        onesignal = fos.OneSignal(app_id="x")
+        bridge.results["events_listen"] = {
+            "v": 1,
+            "value": {"events": [self.held("notification_click", "n1")] * 2, "dropped": 0},
+        }
+
+        async def scenario():
+            await onesignal._trigger_event(
+                "notification_click", {"notification": {}, "notification_id": "n2"}
+            )
+            first = await onesignal.start_listening()
+            # A second replay of the same events delivers nothing new
+            second = await onesignal.start_listening()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first == fos.OSEventReplay(replayed=1, duplicates=1)
+        assert second == fos.OSEventReplay(replayed=0, duplicates=2)
+        assert [e.notification_id for e in delivered] == ["n2", "n1"]
+
+    def test_seen_ids_bounded(self, delivered):
+        onesignal = fos.OneSignal(app_id="x")
+
+        async def click(notification_id):
+            await onesignal._trigger_event(
+                "notification_click", {"notification": {}, "notification_id": notification_id}
+            )
+
+        async def scenario():
+            for i in range(SEEN_NOTIFICATIONS_LIMIT + 1):
+                await click(f"n{i}")
+            await click("n0")
+
+        asyncio.run(scenario())
+        assert len(delivered) == SEEN_NOTIFICATIONS_LIMIT + 2
+
+    def test_negative_buffer_size_rejected(self):
+        with pytest.raises(ValueError, match="event_buffer_size"):
+            fos.OneSignal(app_id="x", event_buffer_size=-1).before_update()
+
+
+class TestCallPriority:
+    def test_interactive_call_overtakes_background_backlog(self, bridge):
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x", max_in_flight=1)
+            with fos.OneSignal.call_priority(fos.OSCallPriority.BACKGROUND):
+                backlog = [
+                    asyncio.create_task(onesignal.session.add_outcome(f"o{i}")) for i in range(3)
+                ]
+            await asyncio.sleep(0)
+            await onesignal.notifications.request_permission()
+            await asyncio.gather(*backlog)
+
+        asyncio.run(scenario())
+        methods = [method for method, _ in bridge.calls]
+        assert methods.index("notifications_request_permission") == 1
+
+    def test_default_priorities(self):
+        assert (
+            METHOD_PRIORITIES["notifications_request_permission"] is fos.OSCallPriority.INTERACTIVE
+        )
+        assert METHOD_PRIORITIES["user_add_tags"] is fos.OSCallPriority.BACKGROUND
+        assert "user_get_tags" not in METHOD_PRIORITIES
+
+
+def error(error_type="PlatformException", message="boom"):
+    return {"v": 1, "error": {"type": error_type, "message": message}}
+
+
+class TestCallPolicies:
+    def test_idempotent_method_retried_until_success(self, bridge):
+        bridge.results["user_add_tags"] = [error(), error(), {"v": 1, "value": None}]
+
+        asyncio.run(fos.OneSignal(app_id="x").user.add_tags({"a": "1"}))
+
+        assert len(bridge.calls) == 3
+
+    def test_counting_method_not_retried(self, bridge):
+        bridge.results["session_add_outcome"] = error()
+
+        with pytest.raises(fos.OneSignalNativeError):
+            asyncio.run(fos.OneSignal(app_id="x").session.add_outcome("purchase"))
+        assert len(bridge.calls) == 1
+
+    def test_argument_error_not_retried(self, bridge):
+        bridge.results["user_add_tags"] = error("ArgumentError", "bad tags")
+
+        with pytest.raises(fos.OneSignalArgumentError):
+            asyncio.run(fos.OneSignal(app_id="x").user.add_tags({"a": "1"}))
+        assert len(bridge.calls) == 1
+
+    def test_policy_timeout(self, bridge):
+        bridge.delay = 1
+
+        async def scenario():
+            onesignal = fos.OneSignal(
+                app_id="x", call_policies={"logout": fos.CallPolicy(timeout=0.05)}
+            )
+            await onesignal.logout()
+
+        with pytest.raises(fos.OneSignalTimeoutError, match="logout"):
+            asyncio.run(asyncio.wait_for(scenario(), 0.5))
+
+    def test_deadline_shared_by_a_flow(self, bridge):
+        bridge.delay = 0.04
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+            with fos.OneSignal.deadline(0.1):
+                await onesignal.logout()
+                await onesignal.logout()
+                await onesignal.logout()
+
+        with pytest.raises(fos.OneSignalTimeoutError):
+            asyncio.run(scenario())
+        assert len(bridge.calls) == 3
+
+    def test_expired_deadline_sends_nothing(self, bridge):
+        async def scenario():
+            with fos.OneSignal.deadline(0):
+                await fos.OneSignal(app_id="x").user.get_tags()
+
+        with pytest.raises(fos.OneSignalTimeoutError, match="deadline"):
+            asyncio.run(scenario())
+        assert bridge.calls == []
+
+    def test_shared_flight_not_bound_by_first_callers_deadline(self, bridge):
+        bridge.delay = 0.2
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x")
+
+            async def short():
+                with fos.OneSignal.deadline(0.05):
+                    return await onesignal.user.get_onesignal_id()
+
+            async def longer():
+                with fos.OneSignal.deadline(1):
+                    return await onesignal.user.get_onesignal_id()
+
+            return await asyncio.gather(
+                short(), onesignal.user.get_onesignal_id(), longer(), return_exceptions=True
+            )
+
+        first, unbounded, longer = asyncio.run(scenario())
+        assert isinstance(first, fos.OneSignalTimeoutError)
+        assert unbounded == longer == "user_get_onesignal_id#1"
+        assert len(bridge.calls) == 1
+
+    def test_saturated_scheduler_does_not_trip_breaker(self, bridge):
+        bridge.delay = 0.1
+        breaker = fos.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+        async def scenario():
+            # One slot; each call gets 0.15s but waits behind up to 0.3s of others
+            onesignal = fos.OneSignal(
+                app_id="x",
+                max_in_flight=1,
+                circuit_breaker=breaker,
+                call_policies={"logout": fos.CallPolicy(timeout=0.15)},
+            )
+            return await asyncio.gather(*(onesignal.logout() for _ in range(4)))
+
+        assert len(asyncio.run(scenario())) == 4
+        assert len(bridge.calls) == 4
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+    def test_deadline_while_queued_not_sent_or_counted(self, bridge):
+        bridge.delay = 0.2
+        breaker = fos.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x", max_in_flight=1, circuit_breaker=breaker)
+            holder = asyncio.ensure_future(onesignal.logout())
+            await asyncio.sleep(0)
+            with fos.OneSignal.deadline(0.05):
+                with pytest.raises(fos.OneSignalQueueTimeoutError):
+                    await onesignal.user.add_tags({"a": "1"})
+            await holder
+
+        asyncio.run(scenario())
+        assert [name for name, _ in bridge.calls] == ["logout"]
+        assert breaker.failures == 0
+
+    def test_circuit_breaker_fails_fast(self, bridge):
+        bridge.results["logout"] = error()
+        breaker = fos.CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x", circuit_breaker=breaker)
+            return await asyncio.gather(
+                *(onesignal.logout() for _ in range(2)), return_exceptions=True
+            ), await asyncio.gather(onesignal.logout(), return_exceptions=True)
+
+        failed, fast = asyncio.run(scenario())
+
+        assert all(isinstance(r, fos.OneSignalNativeError) for r in failed)
+        assert isinstance(fast[0], fos.OneSignalCircuitOpenError)
+        assert len(bridge.calls) == 2
+        assert breaker.state == "open"
+
+
+class TestTracing:
+    def test_sampled_calls_carry_trace_id_and_record_spans(self, bridge):
+        tracer = fos.BridgeTracer()
+
+        async def scenario():
+            onesignal = fos.OneSignal(app_id="x", tracer=tracer)
+            await onesignal.user.add_tags({"a": "1"})
+            return await onesignal.user.get_onesignal_id()
+
+        assert asyncio.run(scenario()) == "user_get_onesignal_id#2"
+        assert [args["_trace"] for _, args in bridge.calls] == [s.trace_id for s in tracer.spans]
+        assert [s.method for s in tracer.spans] == ["user_add_tags", "user_get_onesignal_id"]
+        assert tracer.spans[0].priority == "background"
+        assert all(s.has_dart_times and s.error is None for s in tracer.spans)
+
+    def test_unsampled_calls_unchanged(self, bridge):
+        tracer = fos.BridgeTracer(sample_rate=0)
+        asyncio.run(fos.OneSignal(app_id="x", tracer=tracer).logout())
+
+        assert bridge.calls == [("logout", {})]
+        assert not tracer.spans
+
+    def test_failed_call_recorded(self, bridge):
+        bridge.results["session_add_outcome"] = error()
+        tracer = fos.BridgeTracer()
+
+        with pytest.raises(fos.OneSignalNativeError):
+            asyncio.run(fos.OneSignal(app_id="x", tracer=tracer).session.add_outcome("o"))
+        assert tracer.spans[0].error == "PlatformException"
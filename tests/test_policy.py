@@ -0,0 +1,108 @@
+"""Tests for flet_onesignal.policy — typed errors, deadlines and the circuit breaker."""
+
+import time
+
+import pytest
+
+from flet_onesignal.policy import (
+    CallPolicy,
+    CircuitBreaker,
+    OneSignalArgumentError,
+    OneSignalCircuitOpenError,
+    OneSignalNativeError,
+    OneSignalQueueTimeoutError,
+    OneSignalTimeoutError,
+    OneSignalUnsupportedError,
+    deadline,
+    error_from_envelope,
+    is_transient,
+    time_left,
+)
+
+
+class TestErrorFromEnvelope:
+    @pytest.mark.parametrize(
+        "error_type, cls",
+        [
+            ("PlatformException", OneSignalNativeError),
+            ("_TypeError", OneSignalArgumentError),
+            ("FormatException", OneSignalArgumentError),
+            ("MissingPluginException", OneSignalUnsupportedError),
+        ],
+    )
+    def test_type_mapping(self, error_type, cls):
+        error = error_from_envelope("m", {"type": error_type, "message": "x"})
+        assert type(error) is cls
+        assert error.type == error_type
+
+    def test_argument_error_is_value_error(self):
+        assert isinstance(error_from_envelope("m", {"type": "ArgumentError"}), ValueError)
+
+    def test_transient(self):
+        assert is_transient(OneSignalNativeError("m", "x"))
+        assert is_transient(OneSignalTimeoutError("m", "x"))
+        assert not is_transient(OneSignalArgumentError("m", "x"))
+        assert not is_transient(OneSignalUnsupportedError("m", "x"))
+        assert not is_transient(OneSignalQueueTimeoutError("m", "x"))
+        assert not is_transient(OneSignalCircuitOpenError("m", 1.0))
+
+
+class TestCallPolicy:
+    def test_delay_bounded(self):
+        policy = CallPolicy(backoff=1, max_backoff=3)
+        assert all(0 <= policy.delay(attempt) <= 3 for attempt in range(6))
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.check("m")
+        breaker.record_failure()
+
+        with pytest.raises(OneSignalCircuitOpenError) as raised:
+            breaker.check("m")
+        assert 59 < raised.value.retry_after <= 60
+
+    def test_success_resets_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        breaker.check("m")
+        with pytest.raises(OneSignalCircuitOpenError):
+            breaker.check("m")
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+    def test_trial_success_closes(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.check("m")
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_zero_threshold_disables(self):
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(100):
+            breaker.record_failure()
+        breaker.check("m")
+
+
+class TestDeadline:
+    def test_nested_deadline_only_shortens(self):
+        assert time_left() is None
+        with deadline(0.5):
+            with deadline(10):
+                assert time_left() <= 0.5
+            with deadline(0.1):
+                assert time_left() <= 0.1
+        assert time_left() is None
@@ -0,0 +1,346 @@
+"""Tests for flet_onesignal.rest — requests, pooling, retries and concurrency."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from flet_onesignal.rest import (
+    OneSignalAPIError,
+    OneSignalClient,
+    RetryPolicy,
+    TokenBucket,
+    parse_retry_after,
+)
+
+FAST_RETRY = RetryPolicy(attempts=3, backoff=0.001, max_backoff=0.01)
+
+
+class StubServer:
+    """Minimal keep-alive HTTP/1.1 server that replays scripted responses."""
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = list(responses or [])
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append(
+                    {
+                        "method": method,
+                        "path": path,
+                        "headers": headers,
+                        "json": json.loads(body) if body else None,
+                    }
+                )
+
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(self.delay)
+                self.in_flight -= 1
+
+                status, payload, extra = (
+                    self.responses.pop(0) if self.responses else (200, {"ok": True}, {})
+                )
+                data = json.dumps(payload).encode()
+                head = f"HTTP/1.1 {status} X\r\nContent-Length: {len(data)}\r\n"
+                head += "Content-Type: application/json\r\n"
+                head += "".join(f"{k}: {v}\r\n" for k, v in extra.items())
+                writer.write(head.encode() + b"\r\n" + data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+
+class TestRequests:
+    def test_send_push_payload_and_headers(self):
+        async def scenario():
+            async with StubServer([(200, {"id": "n1"}, {})]) as server:
+                async with OneSignalClient("app", "key", base_url=server.url) as client:
+                    result = await client.send_push(
+                        "Body", headings="Title", include_aliases={"external_id": ["u1"]}
+                    )
+                return result, server.requests[0]
+
+        result, request = _run(scenario())
+        assert result == {"id": "n1"}
+        assert request["method"] == "POST"
+        assert request["path"] == "/notifications"
+        assert request["headers"]["authorization"] == "Key key"
+        body = request["json"]
+        assert body["app_id"] == "app"
+        assert body["contents"] == {"en": "Body"}
+        assert body["headings"] == {"en": "Title"}
+        assert body["include_aliases"] == {"external_id": ["u1"]}
+        assert body["idempotency_key"]
+
+    def test_idempotency_key_kept_across_retries(self):
+        async def scenario():
+            async with StubServer([(503, {}, {}), (200, {"id": "n1"}, {})]) as server:
+                async with OneSignalClient(
+                    "app", "key", base_url=server.url, retry=FAST_RETRY
+                ) as client:
+                    await client.send_notification({"contents": {"en": "x"}})
+                return server.requests
+
+        first, second = _run(scenario())
+        assert first["json"]["idempotency_key"] == second["json"]["idempotency_key"]
+
+    def test_alias_and_subscription_paths(self):
+        async def scenario():
+            async with StubServer() as server:
+                async with OneSignalClient("app", "key", base_url=server.url) as client:
+                    await client.delete_alias("onesignal_id", "abc", "external_id")
+                    await client.add_aliases("external_id", "u 1", {"crm": "42"})
+                    await client.update_subscription("sub1", {"enabled": False})
+                return server.requests
+
+        delete, add, update = _run(scenario())
+        assert delete["method"] == "DELETE"
+        assert delete["path"] == "/apps/app/users/by/onesignal_id/abc/identity/external_id"
+        assert add["path"] == "/apps/app/users/by/external_id/u%201/identity"
+        assert add["json"] == {"identity": {"crm": "42"}}
+        assert update["path"] == "/apps/app/subscriptions/sub1"
+        assert update["json"] == {"subscription": {"enabled": False}}
+
+    def test_connections_reused(self):
+        async def scenario():
+            async with StubServer() as server:
+                async with OneSignalClient("app", "key", base_url=server.url) as client:
+                    for _ in range(5):
+                        await client.get_user("external_id", "u1")
+                return server.connections
+
+        assert _run(scenario()) == 1
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+
+class TestRetries:
+    def test_retries_5xx_then_succeeds(self):
+        async def scenario():
+            responses = [(500, {}, {}), (502, {}, {}), (200, {"ok": 1}, {})]
+            async with StubServer(responses) as server:
+                async with OneSignalClient(
+                    "app", "key", base_url=server.url, retry=FAST_RETRY
+                ) as client:
+                    result = await client.get_user("external_id", "u1")
+                return result, len(server.requests)
+
+        assert _run(scenario()) == ({"ok": 1}, 3)
+
+    def test_gives_up_after_attempts(self):
+        async def scenario():
+            async with StubServer([(503, {"errors": ["down"]}, {})] * 3) as server:
+                async with OneSignalClient(
+                    "app", "key", base_url=server.url, retry=FAST_RETRY
+                ) as client:
+                    await client.get_user("external_id", "u1")
+
+        with pytest.raises(OneSignalAPIError) as exc:
+            _run(scenario())
+        assert exc.value.status == 503
+        assert exc.value.body == {"errors": ["down"]}
+
+    def test_client_error_not_retried(self):
+        async def scenario():
+            async with StubServer([(400, {"errors": ["bad"]}, {})]) as server:
+                async with OneSignalClient(
+                    "app", "key", base_url=server.url, retry=FAST_RETRY
+                ) as client:
+                    with pytest.raises(OneSignalAPIError):
+                        await client.get_user("external_id", "u1")
+                return len(server.requests)
+
+        assert _run(scenario()) == 1
+
+    def test_retry_after_honoured(self):
+        async def scenario():
+            responses = [(429, {}, {"Retry-After": "0.2"}), (200, {}, {})]
+            async with StubServer(responses) as server:
+                async with OneSignalClient(
+                    "app",
+                    "key",
+                    base_url=server.url,
+                    retry=RetryPolicy(attempts=2, max_backoff=1.0),
+                ) as client:
+                    started = time.monotonic()
+                    await client.get_user("external_id", "u1")
+                    return time.monotonic() - started
+
+        assert _run(scenario()) >= 0.2
+
+
+class TestRetryPolicy:
+    def test_jitter_bounds(self):
+        policy = RetryPolicy(backoff=1.0, max_backoff=5.0)
+        for attempt in range(6):
+            assert 0 <= policy.delay(attempt) <= min(5.0, 2**attempt)
+
+    def test_retry_after_capped(self):
+        assert RetryPolicy(max_backoff=5.0).delay(0, retry_after=60) == 5.0
+
+    def test_parse_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_parse_http_date_in_past(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_parse_invalid(self):
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+# ---------------------------------------------------------------------------
+# Concurrency
+# ---------------------------------------------------------------------------
+
+
+class TestConcurrency:
+    def test_bounded_in_flight(self):
+        async def scenario():
+            async with StubServer(delay=0.02) as server:
+                async with OneSignalClient(
+                    "app", "key", base_url=server.url, max_concurrency=2
+                ) as client:
+                    await asyncio.gather(
+                        *(client.get_user("external_id", f"u{i}") for i in range(8))
+                    )
+                return server.max_in_flight, len(server.requests)
+
+        assert _run(scenario()) == (2, 8)
+
+
+# ---------------------------------------------------------------------------
+# Bulk send
+# ---------------------------------------------------------------------------
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        async def scenario():
+            bucket = TokenBucket(rate=50, capacity=2)
+            started = time.monotonic()
+            for _ in range(7):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        # 2 immediate, 5 more at 50/s
+        assert 0.09 <= _run(scenario()) < 0.5
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestSendBulk:
+    def _send(self, server, ids, **kwargs):
+        async def collect():
+            async with OneSignalClient(
+                "app", "key", base_url=server.url, retry=FAST_RETRY
+            ) as client:
+                return [
+                    chunk
+                    async for chunk in client.send_bulk(
+                        {"contents": {"en": "x"}, **kwargs.pop("payload", {})},
+                        "external_id",
+                        ids,
+                        **kwargs,
+                    )
+                ]
+
+        return collect()
+
+    def test_chunks_audience(self):
+        async def scenario():
+            async with StubServer() as server:
+                results = await self._send(server, (f"u{i}" for i in range(5)), chunk_size=2)
+                return results, server.requests
+
+        results, requests = _run(scenario())
+        assert sorted(r.index for r in results) == [0, 1, 2]
+        assert all(r.ok for r in results)
+        sent = sorted(r["json"]["include_aliases"]["external_id"] for r in requests)
+        assert sent == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+
+    def test_failed_chunk_reported(self):
+        async def scenario():
+            async with StubServer([(400, {"errors": ["bad"]}, {})]) as server:
+                return await self._send(server, ["a", "b", "c"], chunk_size=2, concurrency=1)
+
+        first, second = sorted(_run(scenario()), key=lambda r: r.index)
+        assert not first.ok and first.error.status == 400
+        assert first.aliases == ["a", "b"]
+        assert second.ok and second.response == {"ok": True}
+
+    def test_derived_idempotency_keys(self):
+        async def scenario():
+            keys = []
+            for _ in range(2):
+                async with StubServer() as server:
+                    await self._send(
+                        server,
+                        ["a", "b", "c"],
+                        chunk_size=1,
+                        concurrency=1,
+                        payload={"idempotency_key": "campaign-1"},
+                    )
+                keys.append([r["json"]["idempotency_key"] for r in server.requests])
+            return keys
+
+        first, second = _run(scenario())
+        assert first == second
+        assert len(set(first)) == 3
+
+    def test_concurrency_bounded(self):
+        async def scenario():
+            async with StubServer(delay=0.02) as server:
+                await self._send(server, [str(i) for i in range(10)], chunk_size=1, concurrency=3)
+                return server.max_in_flight
+
+        assert _run(scenario()) <= 3
+
+    def test_invalid_chunk_size(self):
+        async def scenario():
+            async with StubServer() as server:
+                await self._send(server, ["a"], chunk_size=0)
+
+        with pytest.raises(ValueError):
+            _run(scenario())
@@ -0,0 +1,167 @@
+"""Tests for flet_onesignal.router — deep-link routing of click events."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from flet_onesignal.router import DeepLinkRouter, RouteConflictError
+
+
+def noop(match):
+    return None
+
+
+def click(additional_data=None, launch_url=None, as_json=False):
+    notification = {"notificationId": "n1"}
+    if additional_data is not None:
+        notification["additionalData"] = additional_data
+    if launch_url is not None:
+        notification["launchUrl"] = launch_url
+    if as_json:
+        notification = json.dumps(notification)
+    return SimpleNamespace(notification=notification, action_id=None)
+
+
+class TestPathMatching:
+    def test_params_and_query(self):
+        router = DeepLinkRouter()
+        router.route("/orders/{order_id}/items/{item}", noop)
+
+        match = router.match("myapp://orders/42/items/a%20b?ref=push")
+
+        assert match.pattern == "/orders/{order_id}/items/{item}"
+        assert match.params == {"order_id": "42", "item": "a b"}
+        assert match.query == {"ref": "push"}
+
+    def test_http_link_routes_path_only(self):
+        router = DeepLinkRouter()
+        router.route("/orders/{id}", noop)
+
+        assert router.match("https://shop.example.com/orders/7").params == {"id": "7"}
+        assert router.match("myapp://shop/orders/7") is None
+
+    def test_static_beats_param_beats_rest(self):
+        router = DeepLinkRouter()
+        router.route("/docs/{page:path}", noop)
+        router.route("/docs/{name}", noop)
+        router.route("/docs/index", noop)
+
+        assert router.match("/docs/index").pattern == "/docs/index"
+        assert router.match("/docs/intro").pattern == "/docs/{name}"
+        assert router.match("/docs/a/b/c").params == {"page": "a/b/c"}
+
+    def test_backtracks_out_of_dead_static_branch(self):
+        router = DeepLinkRouter()
+        router.route("/a/b/c", noop)
+        router.route("/a/{x}/d", noop)
+
+        assert router.match("/a/b/d").params == {"x": "b"}
+
+    def test_no_match(self):
+        router = DeepLinkRouter()
+        router.route("/orders/{id}", noop)
+
+        assert router.match("/orders") is None
+        assert router.match("/orders/1/extra") is None
+
+
+class TestConflicts:
+    def test_same_shape_different_param_names(self):
+        router = DeepLinkRouter()
+        router.route("/orders/{id}", noop)
+
+        with pytest.raises(RouteConflictError, match="/orders/{id}"):
+            router.route("orders/{order_id}/", noop)
+
+    def test_duplicate_rest(self):
+        router = DeepLinkRouter()
+        router.route("/files/{path:path}", noop)
+
+        with pytest.raises(RouteConflictError):
+            router.route("/files/{rest:path}", noop)
+
+    def test_duplicate_data_route(self):
+        router = DeepLinkRouter()
+        router.data("screen", "cart", noop)
+        router.data("screen", handler=noop)
+
+        with pytest.raises(RouteConflictError):
+            router.data("screen", "cart", noop)
+
+    @pytest.mark.parametrize(
+        "pattern", ["/a/{x}/{x}", "/a/{rest:path}/b", "/a/{bad-name}", "/a/b{c}"]
+    )
+    def test_malformed_patterns(self, pattern):
+        with pytest.raises(ValueError):
+            DeepLinkRouter().route(pattern, noop)
+
+
+class TestDataRoutes:
+    def test_value_beats_any_value(self):
+        router = DeepLinkRouter()
+        router.data("screen", handler=noop)
+        router.data("screen", "cart", noop)
+
+        assert router.match(data={"screen": "cart"}).pattern == "data:screen=cart"
+        assert router.match(data={"screen": "home"}).pattern == "data:screen"
+
+    def test_earliest_registered_key_wins(self):
+        router = DeepLinkRouter()
+        router.data("promo", handler=noop)
+        router.data("order_id", handler=noop)
+
+        match = router.match(data={"order_id": 1, "promo": "x"})
+
+        assert match.pattern == "data:promo"
+
+
+class TestDispatch:
+    def test_notification_deep_link_key(self):
+        router = DeepLinkRouter()
+        seen = []
+
+        @router.route("/orders/{id}")
+        async def open_order(match):
+            seen.append((match.params, match.data, match.event))
+
+        event = click({"deep_link": "myapp://orders/9", "x": 1}, as_json=True)
+
+        assert asyncio.run(router.dispatch(event)) is True
+        assert seen == [({"id": "9"}, {"deep_link": "myapp://orders/9", "x": 1}, event)]
+
+    def test_launch_url_then_data_then_fallback(self):
+        router = DeepLinkRouter()
+        seen = []
+        router.route("/news/{slug}", lambda m: seen.append(m.pattern))
+        router.data("promo", handler=lambda m: seen.append(m.pattern))
+        router.fallback(lambda m: seen.append("fallback"))
+
+        asyncio.run(router.dispatch(click(launch_url="https://example.com/news/hello")))
+        asyncio.run(router.dispatch(click({"promo": "summer"}, "https://example.com/other")))
+        asyncio.run(router.dispatch(click({"other": 1})))
+
+        assert seen == ["/news/{slug}", "data:promo", "fallback"]
+
+    def test_android_raw_payload(self):
+        router = DeepLinkRouter(link_key="route")
+        seen = []
+        router.route("/chat/{room}", lambda m: seen.append(m.params))
+        event = SimpleNamespace(notification={"custom": json.dumps({"a": {"route": "/chat/7"}})})
+
+        asyncio.run(router.dispatch(event))
+
+        assert seen == [{"room": "7"}]
+
+    def test_iam_click_url(self):
+        router = DeepLinkRouter()
+        seen = []
+        router.route("/store/{sku}", lambda m: seen.append(m.params))
+        event = SimpleNamespace(url="myapp://store/abc", action_id="buy")
+
+        assert asyncio.run(router.dispatch(event)) is True
+        assert seen == [{"sku": "abc"}]
+
+    def test_unhandled_without_fallback(self):
+        assert asyncio.run(DeepLinkRouter().dispatch(click({"x": 1}))) is False
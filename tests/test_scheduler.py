@@ -0,0 +1,107 @@
+"""Tests for flet_onesignal.scheduler — priority admission of bridge calls."""
+
+import asyncio
+
+import pytest
+
+from flet_onesignal.scheduler import BridgeScheduler
+from flet_onesignal.types import OSCallPriority
+
+INTERACTIVE = OSCallPriority.INTERACTIVE
+NORMAL = OSCallPriority.NORMAL
+BACKGROUND = OSCallPriority.BACKGROUND
+
+
+async def run_calls(scheduler, calls, hold=0.01):
+    """Start ``calls`` [(name, priority)] behind a blocker; return the start order."""
+    started = []
+    gate = asyncio.Event()
+
+    async def call(name, priority):
+        async with scheduler.slot(priority):
+            started.append(name)
+            await asyncio.sleep(hold)
+
+    async def blocker():
+        async with scheduler.slot(NORMAL):
+            await gate.wait()
+
+    blockers = [asyncio.create_task(blocker()) for _ in range(scheduler.max_in_flight)]
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(call(name, priority)) for name, priority in calls]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*blockers, *tasks)
+    return started
+
+
+class TestBridgeScheduler:
+    def test_interactive_jumps_queue(self):
+        scheduler = BridgeScheduler(max_in_flight=1)
+        calls = [("bg1", BACKGROUND), ("n1", NORMAL), ("ui", INTERACTIVE)]
+
+        started = asyncio.run(run_calls(scheduler, calls))
+
+        assert started == ["ui", "n1", "bg1"]
+
+    def test_background_gets_a_turn_after_fairness_normals(self):
+        scheduler = BridgeScheduler(max_in_flight=1, fairness=2)
+        calls = [("bg1", BACKGROUND), ("bg2", BACKGROUND)] + [(f"n{i}", NORMAL) for i in range(5)]
+
+        started = asyncio.run(run_calls(scheduler, calls))
+
+        assert started == ["n0", "n1", "bg1", "n2", "n3", "bg2", "n4"]
+
+    def test_background_limited_to_its_share(self):
+        scheduler = BridgeScheduler(max_in_flight=4)
+        peak = 0
+
+        async def background():
+            nonlocal peak
+            async with scheduler.slot(BACKGROUND):
+                peak = max(peak, scheduler._running[BACKGROUND])
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(*(background() for _ in range(10)))
+
+        asyncio.run(scenario())
+        assert peak == 2
+        assert scheduler.in_flight == 0
+
+    def test_max_in_flight(self):
+        scheduler = BridgeScheduler(max_in_flight=3)
+        peak = 0
+
+        async def call(priority):
+            nonlocal peak
+            async with scheduler.slot(priority):
+                peak = max(peak, scheduler.in_flight)
+                await asyncio.sleep(0.005)
+
+        async def scenario():
+            await asyncio.gather(*(call(p) for p in list(OSCallPriority) * 5))
+
+        asyncio.run(scenario())
+        assert peak == 3
+
+    def test_cancelled_waiter_frees_its_place(self):
+        scheduler = BridgeScheduler(max_in_flight=1)
+
+        async def scenario():
+            await scheduler.acquire(NORMAL)
+            waiter = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+            await asyncio.sleep(0)
+            assert scheduler.waiting() == 1
+            waiter.cancel()
+            await asyncio.sleep(0)
+            assert scheduler.waiting() == 0
+            scheduler.release(NORMAL)
+            await asyncio.wait_for(scheduler.acquire(BACKGROUND), 1)
+            assert scheduler.in_flight == 1
+
+        asyncio.run(scenario())
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError):
+            BridgeScheduler(max_in_flight=0)
@@ -0,0 +1,137 @@
+"""Tests for flet_onesignal.size — component classification and manifest diffing."""
+
+import zipfile
+
+from flet_onesignal.size import (
+    OTHER_COMPONENT,
+    ComponentSize,
+    analyze_artifact,
+    classify,
+    compare_with_previous,
+    find_artifacts,
+    manifest_path,
+)
+
+
+def _make_archive(path, entries):
+    """Create a ZIP archive with the given {name: bytes} entries."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# classify
+# ---------------------------------------------------------------------------
+
+
+class TestClassify:
+    def test_apk_entries(self):
+        assert classify("lib/arm64-v8a/libflutter.so") == "Flutter engine"
+        assert classify("lib/arm64-v8a/libapp.so") == "Dart app code"
+        assert classify("lib/arm64-v8a/libpython3.12.so") == "Python runtime"
+        assert classify("lib/arm64-v8a/libpythonsitepackages.so") == "Python site-packages"
+        assert classify("assets/flutter_assets/app/app.zip") == "Python app"
+        assert classify("lib/arm64-v8a/libc++_shared.so") == "Native libraries"
+        assert classify("classes2.dex") == "Dex bytecode"
+        assert classify("res/drawable/icon.png") == "Assets"
+        assert classify("AndroidManifest.xml") == OTHER_COMPONENT
+
+    def test_onesignal_entries(self):
+        assert classify("META-INF/com.onesignal_core.version") == "OneSignal native"
+        assert classify("res/drawable/ic_onesignal_large_icon.png") == "OneSignal native"
+        assert classify("lib/arm64-v8a/libonesignal.so") == "OneSignal native"
+        assert classify("com/onesignal/core/version.properties") == "OneSignal native"
+
+    def test_plugin_packages_are_not_onesignal_native(self):
+        assert classify("assets/flutter_assets/packages/flet_onesignal/icon.png") == "Assets"
+        assert classify("assets/flutter_assets/packages/onesignal_flutter/LICENSE") == "Assets"
+        assert classify("lib/arm64-v8a/libpythonsitepackages.so") == "Python site-packages"
+        assert classify("site-packages/flet_onesignal/__init__.py") == "Python site-packages"
+
+    def test_aab_module_prefix(self):
+        assert classify("base/lib/x86_64/libflutter.so") == "Flutter engine"
+        assert classify("base/dex/classes.dex") == "Dex bytecode"
+
+    def test_ipa_entries(self):
+        app = "Payload/Runner.app/"
+        assert classify(app + "Frameworks/Flutter.framework/Flutter") == "Flutter engine"
+        assert classify(app + "Frameworks/App.framework/App") == "Dart app code"
+        assert classify(app + "Frameworks/OneSignalCore.framework/OneSignalCore") == (
+            "OneSignal native"
+        )
+
+
+# ---------------------------------------------------------------------------
+# ComponentSize
+# ---------------------------------------------------------------------------
+
+
+class TestComponentSize:
+    def test_no_previous(self):
+        c = ComponentSize("x", compressed=100)
+        assert c.delta is None
+        assert c.grew_over(5) is False
+
+    def test_growth_over_threshold(self):
+        c = ComponentSize("x", compressed=110, previous=100)
+        assert c.delta == 10
+        assert c.grew_over(5) is True
+        assert c.grew_over(10) is False
+
+    def test_shrink(self):
+        assert ComponentSize("x", compressed=90, previous=100).grew_over(0) is False
+
+    def test_new_component(self):
+        assert ComponentSize("x", compressed=1, previous=0).grew_over(50) is True
+
+
+# ---------------------------------------------------------------------------
+# analyze_artifact / compare_with_previous
+# ---------------------------------------------------------------------------
+
+
+class TestAnalyzeArtifact:
+    def test_sums_by_component(self, tmp_path):
+        apk = _make_archive(
+            tmp_path / "app.apk",
+            {
+                "lib/arm64-v8a/libflutter.so": b"\0" * 1000,
+                "lib/armeabi-v7a/libflutter.so": b"\0" * 500,
+                "classes.dex": b"dex",
+            },
+        )
+        components = analyze_artifact(apk)
+        assert set(components) == {"Flutter engine", "Dex bytecode"}
+        assert components["Flutter engine"].uncompressed == 1500
+        assert components["Dex bytecode"].uncompressed == 3
+
+    def test_first_build_has_no_delta(self, tmp_path):
+        apk = _make_archive(tmp_path / "build" / "apk" / "app.apk", {"classes.dex": b"a"})
+        components = compare_with_previous(tmp_path, apk)
+        assert [c.delta for c in components] == [None]
+        assert manifest_path(tmp_path, apk).exists()
+
+    def test_diff_against_previous_build(self, tmp_path):
+        apk_path = tmp_path / "build" / "apk" / "app.apk"
+        _make_archive(apk_path, {"classes.dex": b"a", "lib/x86/libflutter.so": b"f"})
+        compare_with_previous(tmp_path, apk_path)
+
+        _make_archive(apk_path, {"classes.dex": bytes(range(256)) * 8, "res/a.png": b"p"})
+        components = {c.name: c for c in compare_with_previous(tmp_path, apk_path)}
+
+        assert components["Dex bytecode"].grew_over(5)
+        assert components["Assets"].previous == 0
+        assert components["Flutter engine"].compressed == 0
+        assert components["Flutter engine"].delta < 0
+
+    def test_find_artifacts(self, tmp_path):
+        assert find_artifacts(tmp_path, "apk") == []
+        _make_archive(tmp_path / "build" / "apk" / "app-arm64-v8a-release.apk", {"a": b""})
+        _make_archive(tmp_path / "build" / "apk" / "app-x86_64-release.apk", {"a": b""})
+        assert [p.name for p in find_artifacts(tmp_path, "apk")] == [
+            "app-arm64-v8a-release.apk",
+            "app-x86_64-release.apk",
+        ]
@@ -0,0 +1,95 @@
+"""Tests for flet_onesignal.tracing — span breakdown, sampling and Chrome export."""
+
+import json
+
+import pytest
+
+from flet_onesignal.tracing import BridgeSpan, BridgeTracer
+
+
+def envelope(trace_id, received, started, finished, **extra):
+    trace = {"id": trace_id, "received_us": received, "started_us": started}
+    return {"v": 1, "trace": {**trace, "finished_us": finished}, **extra}
+
+
+class TestBridgeSpan:
+    def test_breakdown(self):
+        # Dart clock is 5s ahead; durations must not depend on it
+        span = BridgeSpan(
+            "t", "user_add_tags", "background",
+            queued_us=1_000, sent_us=3_000, returned_us=13_000,
+            dart_received_us=5_006_000, dart_started_us=5_007_000, dart_finished_us=5_010_000,
+        )  # fmt: skip
+
+        assert span.total_ms == 12
+        assert span.queue_ms == 2
+        assert span.dart_queue_ms == 1
+        assert span.sdk_ms == 3
+        assert span.transport_ms == 6
+
+    def test_without_dart_times(self):
+        span = BridgeSpan("t", "logout", "normal", 0, 1_000, 4_000)
+
+        assert span.transport_ms == 3
+        assert span.sdk_ms is None
+
+
+class TestBridgeTracer:
+    def test_sampling(self):
+        assert BridgeTracer(sample_rate=0).start() is None
+        tracer = BridgeTracer()
+        assert tracer.start() != tracer.start()
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            BridgeTracer(sample_rate=1.5)
+
+    def test_record_reads_envelope(self):
+        tracer = BridgeTracer()
+        span = tracer.record(
+            "a-1", "logout", "interactive", 0, 10, 100,
+            envelope("a-1", 20, 30, 60, error={"type": "PlatformException"}),
+        )  # fmt: skip
+
+        assert (span.dart_received_us, span.dart_finished_us) == (20, 60)
+        assert span.error == "PlatformException"
+
+    def test_record_ignores_other_trace(self):
+        span = BridgeTracer().record("a-1", "logout", "normal", 0, 10, 100, envelope("b", 1, 2, 3))
+        assert not span.has_dart_times
+
+    def test_max_spans(self):
+        tracer = BridgeTracer(max_spans=2)
+        for i in range(3):
+            tracer.record(str(i), "logout", "normal", 0, 0, 0)
+        assert [s.trace_id for s in tracer.spans] == ["1", "2"]
+
+    def test_summary(self):
+        tracer = BridgeTracer()
+        tracer.record("1", "logout", "normal", 0, 1_000, 5_000, envelope("1", 0, 0, 2_000))
+        tracer.record("2", "logout", "normal", 0, 3_000, 5_000)
+
+        summary = tracer.summary()["logout"]
+
+        assert summary["calls"] == 2
+        assert summary["queue_ms"] == 2
+        assert summary["sdk_ms"] == 2
+
+    def test_chrome_trace(self, tmp_path):
+        tracer = BridgeTracer()
+        tracer.record(
+            "1", "user_add_tags", "normal", 0, 1_000, 11_000, envelope("1", 0, 1_000, 5_000)
+        )
+        # Overlaps the first call, so it goes to a second lane
+        tracer.record("2", "logout", "normal", 2_000, 2_000, 4_000)
+
+        path = tracer.export(tmp_path / "trace.json")
+        events = json.loads(path.read_text())["traceEvents"]
+
+        slices = [e for e in events if e["ph"] == "X"]
+        dart = {e["name"]: e for e in slices if e["pid"] == 2}
+        assert dart["sdk"]["dur"] == 4_000
+        # Dart part centred in the 5ms of transport: starts 2.5ms after the send
+        assert dart["user_add_tags"]["ts"] == 3_500
+        assert {e["tid"] for e in slices if e["name"] == "logout"} == {1}
+        assert {e["name"] for e in events if e["ph"] == "M"} == {"process_name"}
@@ -1,7 +1,14 @@
 """Tests for flet_onesignal.types — enums, dataclasses, and computed properties."""
 
+import pytest
+
 from flet_onesignal.types import (
+    COALESCIBLE_EVENTS,
+    OSCoalescePolicy,
     OSErrorEvent,
+    OSEventCoalescing,
+    OSForegroundAction,
+    OSForegroundRule,
     OSInAppMessageClickEvent,
     OSInAppMessageClickResult,
     OSLogLevel,
@@ -62,6 +69,12 @@ class TestEventDataclasses:
         evt = OSPermissionChangeEvent(**_EVT)
         assert evt.permission is False
 
+    def test_coalesced_states(self):
+        states = [{"permission": False}, {"permission": True}]
+        evt = OSPermissionChangeEvent(**_EVT, permission=True, states=states)
+        assert evt.states == states
+        assert OSPermissionChangeEvent(**_EVT).states is None
+
     def test_error_event(self):
         evt = OSErrorEvent(**_EVT, method="login", message="fail", stack_trace="line1")
         assert evt.method == "login"
@@ -101,3 +114,51 @@ class TestComputedProperties:
         assert result.url == "https://example.com"
         assert result.url_target == "_blank"
         assert result.closing_message is True
+
+
+# ---------------------------------------------------------------------------
+# Event coalescing
+# ---------------------------------------------------------------------------
+
+
+class TestEventCoalescing:
+    def test_defaults(self):
+        config = OSEventCoalescing()
+        assert config.policy is OSCoalescePolicy.LATEST
+        assert config.window_ms == 200
+
+    def test_policy_values(self):
+        assert {p.value for p in OSCoalescePolicy} == {"none", "latest", "list"}
+
+    def test_coalescible_events(self):
+        assert COALESCIBLE_EVENTS == {
+            "permission_change",
+            "user_change",
+            "push_subscription_change",
+        }
+
+
+# ---------------------------------------------------------------------------
+# Foreground rules
+# ---------------------------------------------------------------------------
+
+
+class TestForegroundRule:
+    def test_action_coerced_from_string(self):
+        assert OSForegroundRule("suppress").action is OSForegroundAction.SUPPRESS
+
+    def test_invalid_action_rejected(self):
+        with pytest.raises(ValueError):
+            OSForegroundRule("hide")
+
+    def test_to_dict_omits_unset_conditions(self):
+        rule = OSForegroundRule(OSForegroundAction.DEFER, data_key="kind", data_value=3)
+        assert rule.to_dict() == {"action": "defer", "data_key": "kind", "data_value": "3"}
+
+    def test_data_value_requires_data_key(self):
+        with pytest.raises(ValueError, match="data_key"):
+            OSForegroundRule(OSForegroundAction.SUPPRESS, data_value="x")
+
+    def test_invalid_title_pattern_rejected(self):
+        with pytest.raises(ValueError, match="title_pattern"):
+            OSForegroundRule(OSForegroundAction.SUPPRESS, title_pattern="(")
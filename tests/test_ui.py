@@ -0,0 +1,84 @@
+"""Tests for flet_onesignal.ui — machine-readable output modes."""
+
+import json
+
+import pytest
+
+from flet_onesignal import ui
+
+
+@pytest.fixture
+def output(monkeypatch):
+    """Switch ui to a machine-readable format with fresh event state."""
+
+    def _set(fmt):
+        monkeypatch.setattr(ui, "_events", [])
+        monkeypatch.setattr(ui, "_phase", None)
+        ui.set_output(fmt)
+
+    yield _set
+    ui.set_output("text")
+
+
+class TestNdjsonOutput:
+    def test_streams_events(self, output, capsys):
+        output("ndjson")
+        ui.step(1, "Creating Flutter project...")
+        ui.modified("Injected: a:b:1", dependency="a:b:1")
+        ui.step(2, "Rebuilding...")
+        ui.finish(0)
+
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [e["event"] for e in events] == [
+            "phase_start",
+            "modified",
+            "phase_end",
+            "phase_start",
+            "phase_end",
+            "exit",
+        ]
+        assert events[1]["dependency"] == "a:b:1"
+        assert events[2]["step"] == 1 and events[2]["duration"] >= 0
+        assert events[-1]["status"] == 0
+
+    def test_rebuild_event(self, output, capsys):
+        output("ndjson")
+        ui.step(1, "Rebuilding")
+        ui.rebuild(0, ["src/main.py"])
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [e["event"] for e in events] == ["phase_start", "phase_end", "rebuild"]
+        assert events[-1]["changed"] == ["src/main.py"] and events[-1]["status"] == 0
+
+    def test_failure_closes_phase(self, output, capsys):
+        output("ndjson")
+        ui.step(1, "Building")
+        ui.failure_panel(["tip"])
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [e["event"] for e in events] == ["phase_start", "phase_end", "failure"]
+
+
+class TestJsonOutput:
+    def test_single_document_at_finish(self, output, capsys):
+        output("json")
+        ui.header()
+        ui.artifact("/build/apk/app.apk", 1024)
+        assert capsys.readouterr().out == ""
+
+        ui.finish(1)
+        document = json.loads(capsys.readouterr().out)
+        assert document["status"] == 1
+        assert [e["event"] for e in document["events"]] == ["start", "artifact", "exit"]
+        assert document["events"][1]["size"] == 1024
+
+    def test_subprocess_output_redirected(self, output):
+        output("json")
+        assert ui.subprocess_stdout() is not None
+        ui.set_output("text")
+        assert ui.subprocess_stdout() is None
+
+
+class TestFormatBytes:
+    def test_units(self):
+        assert ui.format_bytes(512) == "512 B"
+        assert ui.format_bytes(2048) == "2.0 KB"
+        assert ui.format_bytes(-3 * 1024 * 1024) == "3.0 MB"
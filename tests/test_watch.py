@@ -0,0 +1,70 @@
+"""Tests for flet_onesignal.watch — change filtering and collection."""
+
+from types import SimpleNamespace
+
+from flet_onesignal.watch import _ChangeCollector, is_watched, needs_reconfigure
+
+
+def _event(src, dest="", is_directory=False):
+    return SimpleNamespace(src_path=str(src), dest_path=str(dest), is_directory=is_directory)
+
+
+# ---------------------------------------------------------------------------
+# is_watched / needs_reconfigure
+# ---------------------------------------------------------------------------
+
+
+class TestIsWatched:
+    def test_python_source(self, tmp_path):
+        assert is_watched(tmp_path / "src" / "main.py", tmp_path) is True
+
+    def test_pyproject(self, tmp_path):
+        assert is_watched(tmp_path / "pyproject.toml", tmp_path) is True
+
+    def test_other_suffix(self, tmp_path):
+        assert is_watched(tmp_path / "src" / "notes.txt", tmp_path) is False
+
+    def test_build_output_ignored(self, tmp_path):
+        assert is_watched(tmp_path / "build" / "flutter" / "main.py", tmp_path) is False
+
+    def test_hidden_dir_ignored(self, tmp_path):
+        assert is_watched(tmp_path / ".venv" / "lib" / "x.py", tmp_path) is False
+
+    def test_outside_project(self, tmp_path):
+        assert is_watched(tmp_path.parent / "other.py", tmp_path) is False
+
+
+class TestNeedsReconfigure:
+    def test_python_only(self, tmp_path):
+        assert needs_reconfigure({tmp_path / "src" / "main.py"}, tmp_path) is False
+
+    def test_pyproject_changed(self, tmp_path):
+        changed = {tmp_path / "src" / "main.py", tmp_path / "pyproject.toml"}
+        assert needs_reconfigure(changed, tmp_path) is True
+
+
+# ---------------------------------------------------------------------------
+# _ChangeCollector
+# ---------------------------------------------------------------------------
+
+
+class TestChangeCollector:
+    def test_collects_and_drains(self, tmp_path):
+        collector = _ChangeCollector(tmp_path)
+        collector.dispatch(_event(tmp_path / "main.py"))
+        collector.dispatch(_event(tmp_path / "main.py"))
+        assert collector.pending.is_set()
+        assert collector.drain() == {tmp_path / "main.py"}
+        assert not collector.pending.is_set()
+        assert collector.drain() == set()
+
+    def test_ignores_directories_and_unwatched(self, tmp_path):
+        collector = _ChangeCollector(tmp_path)
+        collector.dispatch(_event(tmp_path / "src", is_directory=True))
+        collector.dispatch(_event(tmp_path / "build" / "app.py"))
+        assert not collector.pending.is_set()
+
+    def test_move_uses_destination(self, tmp_path):
+        collector = _ChangeCollector(tmp_path)
+        collector.dispatch(_event(tmp_path / "main.py~", tmp_path / "main.py"))
+        assert collector.drain() == {tmp_path / "main.py"}